@@ -7,7 +7,7 @@ class AttendanceFilter(django_filters.FilterSet):
     """Filter for Attendance model"""
     employee_name = django_filters.CharFilter(field_name='employee__name', lookup_expr='icontains')
     employee_email = django_filters.CharFilter(field_name='employee__email', lookup_expr='icontains')
-    department = django_filters.ModelChoiceFilter(queryset=Department.objects.all())
+    department = django_filters.ModelChoiceFilter(field_name='employee__department', queryset=Department.objects.all())
     department_name = django_filters.CharFilter(field_name='employee__department__name', lookup_expr='icontains')
     
     # Date filters
@@ -42,7 +42,7 @@ class PerformanceFilter(django_filters.FilterSet):
     """Filter for Performance model"""
     employee_name = django_filters.CharFilter(field_name='employee__name', lookup_expr='icontains')
     employee_email = django_filters.CharFilter(field_name='employee__email', lookup_expr='icontains')
-    department = django_filters.ModelChoiceFilter(queryset=Department.objects.all())
+    department = django_filters.ModelChoiceFilter(field_name='employee__department', queryset=Department.objects.all())
     department_name = django_filters.CharFilter(field_name='employee__department__name', lookup_expr='icontains')
     
     # Rating filters
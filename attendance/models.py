@@ -1,6 +1,6 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-from employees.models import Employee
+from employees.models import Employee, VersionedQuerySet
 
 class Attendance(models.Model):
     """Attendance model for tracking employee attendance"""
@@ -18,7 +18,9 @@ class Attendance(models.Model):
     date = models.DateField()
     status = models.CharField(max_length=10, choices=STATUS_CHOICES)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = VersionedQuerySet.as_manager()
 
     class Meta:
         ordering = ['-date', 'employee__name']
@@ -50,7 +52,9 @@ class Performance(models.Model):
     review_date = models.DateField()
     comments = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = VersionedQuerySet.as_manager()
 
     class Meta:
         ordering = ['-review_date', 'employee__name']
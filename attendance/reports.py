@@ -0,0 +1,292 @@
+"""
+Company-wide annual attendance report.
+
+For every employee, department, month and the company as a whole, the report
+gives the record count, present/late/absent counts and rates, and absence
+runs. An absence run is a streak of absent records on consecutive calendar
+days. A run belongs to the month it starts in.
+
+build_report() splits the employees into shards: contiguous employee id
+ranges, or departments. Each shard runs in a spawned process. It fetches its
+attendance rows with one query into NumPy arrays and counts everything
+vectorized. The parent merges the per-employee arrays. An employee always
+falls in exactly one shard, so runs never cross a shard boundary.
+
+reference_report() computes the same document in one process, one row at a
+time. The two must agree exactly: the rates of both are derived from integer
+counts by the same function.
+
+This module is imported by spawned processes before Django is set up, so
+models are imported inside the functions.
+"""
+import csv
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+STATUSES = ('present', 'late', 'absent')
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+ABSENT = STATUS_CODES['absent']
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+EMPLOYEE_COLUMNS = [
+    'id', 'name', 'department_id', 'department', 'records', 'present', 'late', 'absent',
+    'attendance_rate', 'lateness_rate', 'absence_rate', 'absence_runs', 'longest_absence_run',
+]
+DEPARTMENT_COLUMNS = [
+    'id', 'name', 'employees', 'records', 'present', 'late', 'absent',
+    'attendance_rate', 'lateness_rate', 'absence_rate', 'absence_runs', 'longest_absence_run',
+    'rank',
+]
+MONTH_COLUMNS = [
+    'month', 'records', 'present', 'late', 'absent',
+    'attendance_rate', 'lateness_rate', 'absence_rate', 'absence_runs', 'longest_absence_run',
+]
+
+
+def year_range(year):
+    return date(year, 1, 1), date(year, 12, 31)
+
+
+def _stats(present, late, absent, runs, longest):
+    """Counts and rates of one row of the report, from plain integers"""
+    present, late, absent = int(present), int(late), int(absent)
+    records = present + late + absent
+
+    def rate(count):
+        return round(count / records * 100, 2) if records else 0.0
+
+    return {
+        'records': records,
+        'present': present,
+        'late': late,
+        'absent': absent,
+        'attendance_rate': rate(present),
+        'lateness_rate': rate(late),
+        'absence_rate': rate(absent),
+        'absence_runs': int(runs),
+        'longest_absence_run': int(longest),
+    }
+
+
+def _employees():
+    """(id, name, department id, department name) of every employee, by id"""
+    from employees.models import Employee
+    return list(
+        Employee.objects.order_by('pk').values_list('pk', 'name', 'department_id', 'department__name')
+    )
+
+
+def _document(start, end, employees, counts, month_counts, meta):
+    """
+    Assemble the report from per-employee counts
+    {id: (present, late, absent, runs, longest)} and per-month counts
+    {month: [present, late, absent, runs, longest]}.
+    """
+    departments = {}
+    employee_rows = []
+    company = [0, 0, 0, 0, 0]
+    for pk, name, department_id, department_name in employees:
+        present, late, absent, runs, longest = counts.get(pk, (0, 0, 0, 0, 0))
+        employee_rows.append({
+            'id': pk, 'name': name, 'department_id': department_id, 'department': department_name,
+            **_stats(present, late, absent, runs, longest),
+        })
+        dept = departments.setdefault(department_id, {'name': department_name, 'employees': 0, 'counts': [0] * 5})
+        dept['employees'] += 1
+        for totals in (dept['counts'], company):
+            totals[0] += present
+            totals[1] += late
+            totals[2] += absent
+            totals[3] += runs
+            totals[4] = max(totals[4], longest)
+
+    department_rows = [
+        {'id': department_id, 'name': dept['name'], 'employees': dept['employees'], **_stats(*dept['counts'])}
+        for department_id, dept in departments.items()
+    ]
+    department_rows.sort(key=lambda row: (-row['attendance_rate'], row['name'] or ''))
+    for rank, row in enumerate(department_rows, start=1):
+        row['rank'] = rank
+
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        **meta,
+        'company': {'employees': len(employees), **_stats(*company)},
+        'months': [{'month': month, **_stats(*month_counts.get(month, [0] * 5))} for month in range(1, 13)],
+        'departments': department_rows,
+        'employees': employee_rows,
+    }
+
+
+# Reference: one process, one row at a time
+
+def reference_report(start, end):
+    """The report computed sequentially from one ordered pass over the rows"""
+    from .models import Attendance
+    counts = {}
+    month_counts = {}
+    rows = (
+        Attendance.objects.filter(date__range=(start, end))
+        .order_by('employee_id', 'date')
+        .values_list('employee_id', 'date', 'status')
+        .iterator(chunk_size=10000)
+    )
+    previous = None  # (employee_id, date) of the previous absent record
+    for employee_id, day, status in rows:
+        entry = counts.setdefault(employee_id, [0, 0, 0, 0, 0, 0])  # + current run length
+        month = month_counts.setdefault(day.month, [0, 0, 0, 0, 0])
+        code = STATUS_CODES[status]
+        entry[code] += 1
+        month[code] += 1
+        if code != ABSENT:
+            continue
+        if previous == (employee_id, day.toordinal() - 1):
+            entry[5] += 1
+        else:
+            entry[5] = 1
+            entry[3] += 1
+            month[3] += 1
+            run_month = month
+        entry[4] = max(entry[4], entry[5])
+        run_month[4] = max(run_month[4], entry[5])
+        previous = (employee_id, day.toordinal())
+    counts = {pk: tuple(entry[:5]) for pk, entry in counts.items()}
+    return _document(start, end, _employees(), counts, month_counts, {'engine': 'reference', 'shards': 1})
+
+
+# Parallel: NumPy per shard in a process pool
+
+def _setup_django():
+    import django
+    django.setup()
+
+
+def fetch_shard(start, end, low=None, high=None, department_id=None):
+    """
+    One query for a shard's attendance, as arrays sorted by (employee, day):
+    employee ids, day numbers (days since 1970-01-01) and status codes.
+    """
+    from .models import Attendance
+    queryset = Attendance.objects.filter(date__range=(start, end))
+    if department_id is not None:
+        queryset = queryset.filter(employee__department_id=department_id)
+    else:
+        queryset = queryset.filter(employee_id__gte=low, employee_id__lte=high)
+    rows = list(queryset.order_by('employee_id', 'date').values_list('employee_id', 'date', 'status'))
+    employee = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    day = np.fromiter((row[1].toordinal() - _EPOCH_ORDINAL for row in rows), dtype=np.int32, count=len(rows))
+    status = np.fromiter((STATUS_CODES[row[2]] for row in rows), dtype=np.int8, count=len(rows))
+    return employee, day, status
+
+
+def shard_metrics(employee, day, status):
+    """
+    Vectorized counts of one shard: per employee (ids, [n, 5] counts) and
+    per month ([12, 5] counts); columns are present, late, absent, runs, longest run.
+    """
+    ids, index = np.unique(employee, return_inverse=True)
+    n = len(ids)
+    per_employee = np.zeros((n, 5), dtype=np.int64)
+    per_employee[:, :3] = np.bincount(index * 3 + status, minlength=n * 3).reshape(n, 3)
+
+    month = day.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64) % 12  # 0-11
+    per_month = np.zeros((12, 5), dtype=np.int64)
+    per_month[:, :3] = np.bincount(month * 3 + status, minlength=36).reshape(12, 3)
+
+    absent = status == ABSENT
+    if absent.any():
+        # A run continues when the previous row is the same employee's absence the day before
+        continues = np.zeros(len(status), dtype=bool)
+        continues[1:] = absent[:-1] & (employee[1:] == employee[:-1]) & (day[1:] == day[:-1] + 1)
+        starts = absent & ~continues
+        run_id = np.cumsum(starts) - 1  # run number of each absent row
+        lengths = np.bincount(run_id[absent])
+        run_employee = index[starts]
+        run_month = month[starts]
+        per_employee[:, 3] = np.bincount(run_employee, minlength=n)
+        np.maximum.at(per_employee[:, 4], run_employee, lengths)
+        per_month[:, 3] = np.bincount(run_month, minlength=12)
+        np.maximum.at(per_month[:, 4], run_month, lengths)
+    return ids, per_employee, per_month
+
+
+def run_shard(task):
+    start, end, spec = task
+    return shard_metrics(*fetch_shard(start, end, **spec))
+
+
+def plan_shards(employees, shard_by, shards):
+    """Shard specs: contiguous employee id ranges of similar size, or one per department"""
+    if shard_by == 'department':
+        return [{'department_id': pk} for pk in sorted({row[2] for row in employees})]
+    ids = [row[0] for row in employees]
+    if not ids:
+        return []
+    size = -(-len(ids) // max(1, shards))
+    return [{'low': ids[i], 'high': ids[min(i + size, len(ids)) - 1]} for i in range(0, len(ids), size)]
+
+
+def build_report(start, end, workers=None, shard_by='employee', shards=None):
+    """The report computed shard by shard in `workers` processes"""
+    workers = max(1, workers or os.cpu_count() or 1)
+    employees = _employees()
+    specs = plan_shards(employees, shard_by, shards or workers * 4)
+    tasks = [(start, end, spec) for spec in specs]
+
+    if workers == 1:
+        results = map(run_shard, tasks)
+        pool = None
+    else:
+        # spawn, not fork: children must not share the parent's DB connections
+        pool = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn'), initializer=_setup_django,
+        )
+        results = pool.map(run_shard, tasks)
+    try:
+        counts = {}
+        per_month = np.zeros((12, 5), dtype=np.int64)
+        for ids, per_employee, months in results:
+            counts.update(zip(ids.tolist(), map(tuple, per_employee.tolist())))
+            per_month[:, :4] += months[:, :4]
+            per_month[:, 4] = np.maximum(per_month[:, 4], months[:, 4])
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    month_counts = {month + 1: per_month[month].tolist() for month in range(12)}
+    meta = {'engine': 'numpy', 'shards': len(specs), 'shard_by': shard_by, 'workers': workers}
+    return _document(start, end, employees, counts, month_counts, meta)
+
+
+def comparable(report):
+    """The report without the fields that describe how it was computed"""
+    return {key: value for key, value in report.items() if key not in ('engine', 'shards', 'shard_by', 'workers')}
+
+
+def write_json(report, path):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def write_csv(report, directory):
+    """employees.csv, departments.csv and months.csv in `directory`; returns their paths"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, columns in (
+        ('employees', EMPLOYEE_COLUMNS), ('departments', DEPARTMENT_COLUMNS), ('months', MONTH_COLUMNS),
+    ):
+        path = directory / f'{name}.csv'
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(report[name])
+        paths.append(path)
+    return paths
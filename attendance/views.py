@@ -5,7 +5,7 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db.models import Count, Avg, Q
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 
 from .models import Attendance, Performance
 from .serializers import (
@@ -14,22 +14,35 @@ from .serializers import (
 )
 from .filters import AttendanceFilter, PerformanceFilter
 from .permissions import AttendancePermission, PerformancePermission
+from employees.conditional import ConditionalGetMixin
+from employees.caching import cached_stats
+from employees.exports import ExportMixin
+from employee_project.tracing import TracingMixin
+from employees.models import Department, Employee
+from jobs.views import submit_job, wants_async
 
 # Create your views here.
 
-class AttendanceViewSet(viewsets.ModelViewSet):
+class AttendanceViewSet(TracingMixin, ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet for Attendance model with CRUD operations"""
     queryset = Attendance.objects.select_related('employee', 'employee__department').all()
     serializer_class = AttendanceSerializer
     permission_classes = [AttendancePermission]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # ?search= is handled by AttendanceFilter.search_filter
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = AttendanceFilter
-    search_fields = ['employee__name', 'employee__email', 'employee__department__name']
     ordering_fields = [
         'date', 'status', 'created_at', 'employee__name', 
         'employee__department__name'
     ]
     ordering = ['-date', 'employee__name']
+    conditional_models = [Attendance, Employee, Department]
+    export_fields = [
+        ('id', 'id'), ('employee', 'employee_id'), ('employee_name', 'employee__name'),
+        ('department_name', 'employee__department__name'), ('date', 'date'), ('status', 'status'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+    export_job_kind = 'attendance-export'
     
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -48,12 +61,24 @@ class AttendanceViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get attendance statistics"""
-        from datetime import date, timedelta
+        """Get attendance statistics (?async=1 computes them as a background job)"""
+        from datetime import date
         
         # Get date range from query params
         days = int(request.query_params.get('days', 30))
+        if wants_async(request):
+            return submit_job(request, 'attendance-statistics', {'days': days})
         end_date = date.today()
+        data = cached_stats(
+            'attendance-statistics', [Attendance, Employee, Department],
+            lambda: self._statistics_data(days, end_date),
+            params={'days': days, 'end_date': end_date.isoformat()}
+        )
+        return Response(data)
+    
+    def _statistics_data(self, days, end_date):
+        from datetime import timedelta
+        
         start_date = end_date - timedelta(days=days)
         
         # Filter attendance records for the date range
@@ -78,7 +103,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             late=Count('id', filter=Q(status='late'))
         )
         
-        return Response({
+        return {
             'period': f'{days} days',
             'start_date': start_date,
             'end_date': end_date,
@@ -88,7 +113,7 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             'late_count': late_count,
             'attendance_rate': round(attendance_rate, 2),
             'department_statistics': list(dept_stats)
-        })
+        }
     
     @action(detail=False, methods=['get'])
     def employee_summary(self, request):
@@ -135,21 +160,27 @@ class AttendanceViewSet(viewsets.ModelViewSet):
             }
         })
 
-class PerformanceViewSet(viewsets.ModelViewSet):
+class PerformanceViewSet(TracingMixin, ConditionalGetMixin, ExportMixin, viewsets.ModelViewSet):
     """ViewSet for Performance model with CRUD operations"""
     queryset = Performance.objects.select_related('employee', 'employee__department').all()
     serializer_class = PerformanceSerializer
     permission_classes = [PerformancePermission]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # ?search= is handled by PerformanceFilter.search_filter
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = PerformanceFilter
-    search_fields = [
-        'employee__name', 'employee__email', 'employee__department__name', 'comments'
-    ]
     ordering_fields = [
         'rating', 'review_date', 'created_at', 'employee__name',
         'employee__department__name'
     ]
     ordering = ['-review_date', 'employee__name']
+    conditional_models = [Performance, Employee, Department]
+    export_fields = [
+        ('id', 'id'), ('employee', 'employee_id'), ('employee_name', 'employee__name'),
+        ('department_name', 'employee__department__name'), ('rating', 'rating'),
+        ('review_date', 'review_date'), ('comments', 'comments'),
+        ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]
+    export_job_kind = 'performance-export'
     
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -159,7 +190,16 @@ class PerformanceViewSet(viewsets.ModelViewSet):
     
     @action(detail=False, methods=['get'])
     def statistics(self, request):
-        """Get performance statistics"""
+        """Get performance statistics (?async=1 computes them as a background job)"""
+        if wants_async(request):
+            return submit_job(request, 'performance-statistics', {})
+        data = cached_stats(
+            'performance-statistics', [Performance, Employee, Department],
+            self._statistics_data
+        )
+        return Response(data)
+    
+    def _statistics_data(self):
         # Overall statistics
         total_reviews = self.queryset.count()
         avg_rating = self.queryset.aggregate(avg_rating=Avg('rating'))['avg_rating'] or 0
@@ -179,7 +219,7 @@ class PerformanceViewSet(viewsets.ModelViewSet):
         top_performers = self.queryset.filter(rating__gte=4).select_related('employee')[:10]
         top_performers_data = PerformanceSerializer(top_performers, many=True).data
         
-        return Response({
+        return {
             'overall_statistics': {
                 'total_reviews': total_reviews,
                 'average_rating': round(avg_rating, 2)
@@ -187,7 +227,7 @@ class PerformanceViewSet(viewsets.ModelViewSet):
             'rating_distribution': list(rating_distribution),
             'department_ratings': list(dept_ratings),
             'top_performers': top_performers_data
-        })
+        }
     
     @action(detail=False, methods=['get'])
     def employee_performance(self, request):
@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import ChangeLog
+
+@admin.register(ChangeLog)
+class ChangeLogAdmin(admin.ModelAdmin):
+    list_display = ['id', 'model', 'object_id', 'action', 'changed_at']
+    list_filter = ['model', 'action']
+    search_fields = ['object_id']
+    ordering = ['-id']
+    readonly_fields = ['id', 'model', 'object_id', 'action', 'changed_at']
@@ -0,0 +1,165 @@
+"""
+Incremental change feed for downstream sync.
+
+A consumer keeps one integer: the id of the last ChangeLog entry it has
+processed. It pages through /api/changes/?cursor=<id>, applies each entry
+and stores the returned cursor. Each page is one indexed range scan, so a
+sync costs O(changes), not O(table).
+
+Each entry carries the current state of its row (`data`), read with one
+query per model per page. The data is null when the row has since been
+deleted. In that case a later `delete` entry follows. Applying entries in
+order as upserts and deletes converges on the current table.
+
+Ids are handed out when an entry is inserted, but entries become visible
+when their transaction commits, and commits can happen out of id order. The
+feed must never serve an entry while an earlier one can still appear, or a
+consumer's cursor would move past it for good:
+
+- PostgreSQL: every entry stores its transaction id (txid). The feed is
+  ordered by (txid, id) and only serves entries of transactions older than
+  the oldest one still in flight, pg_snapshot_xmin(pg_current_snapshot()).
+  Every transaction that can still commit sorts after everything served.
+  The cursor stays an entry id; its (txid, id) is looked up.
+- SQLite: writers are serialized, so entries commit in id order and are
+  served as soon as they are visible.
+- Other databases: entries younger than SETTLE_SECONDS, measured from their
+  insert, are held back. This is only a heuristic: an entry whose
+  transaction commits later than that can fall behind a cursor and be lost.
+
+A full initial sync: read head() first, copy the tables, then follow the
+feed from that cursor. Entries older than RETENTION_DAYS are pruned
+(`manage.py prune_changelog`). A cursor that points before the oldest
+remaining entry gets 410 Gone: resync the tables and start again from head().
+
+    CHANGEFEED = {
+        'SETTLE_SECONDS': 2,
+        'RETENTION_DAYS': 30,
+        'PAGE_SIZE': 500,
+        'MAX_PAGE_SIZE': 5000,
+    }
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ChangeLog
+from .signals import tracked_models
+
+CHANGEFEED_DEFAULTS = {
+    'SETTLE_SECONDS': 2,
+    'RETENTION_DAYS': 30,
+    'PAGE_SIZE': 500,
+    'MAX_PAGE_SIZE': 5000,
+}
+
+
+def get_changefeed_settings():
+    return {**CHANGEFEED_DEFAULTS, **getattr(settings, 'CHANGEFEED', {})}
+
+
+class CursorExpired(Exception):
+    """The entries after the cursor have been pruned"""
+
+
+def model_labels():
+    return [model._meta.label_lower for model in tracked_models()]
+
+
+def _snapshot_xmin(using):
+    """The id of the oldest transaction still in flight on PostgreSQL"""
+    with connections[using].cursor() as cursor:
+        cursor.execute('SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint')
+        return cursor.fetchone()[0]
+
+
+def _settled(config):
+    """
+    Return (entries, ordering): the entries that no uncommitted entry can still
+    precede, and the order to serve them in (see the module docstring).
+    """
+    queryset = ChangeLog.objects.all()
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql':
+        return queryset.filter(txid__lt=_snapshot_xmin(queryset.db)), ('txid', 'id')
+    if vendor == 'sqlite':
+        return queryset, ('id',)
+    cutoff = timezone.now() - timedelta(seconds=config['SETTLE_SECONDS'])
+    return queryset.filter(changed_at__lte=cutoff), ('id',)
+
+
+def _after(queryset, ordering, cursor):
+    """Entries that come after the `cursor` entry in the feed ordering"""
+    if ordering == ('id',):
+        return queryset.filter(id__gt=cursor)
+    txid = ChangeLog.objects.filter(id=cursor).values_list('txid', flat=True).first()
+    if txid is None:
+        raise CursorExpired(f'Entry {cursor} no longer exists; resync from head')
+    return queryset.filter(Q(txid__gt=txid) | Q(txid=txid, id__gt=cursor))
+
+
+def head(config=None):
+    """The cursor of the newest settled entry (0 when there is none)"""
+    config = config or get_changefeed_settings()
+    queryset, ordering = _settled(config)
+    return queryset.order_by(*(f'-{field}' for field in ordering)).values_list('id', flat=True).first() or 0
+
+
+def _current_state(entries):
+    """{(model label, pk): row values} of the rows that still exist"""
+    wanted = {}
+    for entry in entries:
+        if entry['object_id'] is not None and entry['action'] != ChangeLog.DELETE:
+            wanted.setdefault(entry['model'], set()).add(entry['object_id'])
+    state = {}
+    for label, pks in wanted.items():
+        model = apps.get_model(label)
+        fields = [field.attname for field in model._meta.concrete_fields]
+        for row in model._base_manager.filter(pk__in=pks).order_by().values(*fields):
+            state[label, row[model._meta.pk.attname]] = row
+    return state
+
+
+def read_changes(cursor=0, models=None, limit=None, config=None):
+    """
+    Up to `limit` settled entries after `cursor`, oldest first, each with the
+    current row state. Returns (entries, next cursor, has more).
+    """
+    config = config or get_changefeed_settings()
+    limit = min(limit or config['PAGE_SIZE'], config['MAX_PAGE_SIZE'])
+    if cursor:
+        oldest = ChangeLog.objects.order_by('id').values_list('id', flat=True).first()
+        if oldest is not None and cursor < oldest - 1:
+            raise CursorExpired(f'Entries after cursor {cursor} have been pruned; the oldest is {oldest}')
+
+    queryset, ordering = _settled(config)
+    if cursor:
+        queryset = _after(queryset, ordering, cursor)
+    if models:
+        queryset = queryset.filter(model__in=models)
+    entries = list(
+        queryset.order_by(*ordering).values('id', 'model', 'object_id', 'action', 'changed_at')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    state = _current_state(entries)
+    for entry in entries:
+        entry['data'] = state.get((entry['model'], entry['object_id']))
+    return entries, (entries[-1]['id'] if entries else cursor), has_more
+
+
+def prune(days=None, config=None):
+    """Delete entries older than `days` (default RETENTION_DAYS), always keeping the newest"""
+    config = config or get_changefeed_settings()
+    days = config['RETENTION_DAYS'] if days is None else days
+    newest = ChangeLog.objects.order_by('-id').values_list('id', flat=True).first()
+    if newest is None:
+        return 0
+    deleted, _ = ChangeLog.objects.filter(
+        changed_at__lt=timezone.now() - timedelta(days=days), id__lt=newest
+    ).delete()
+    return deleted
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from changefeed.feed import get_changefeed_settings, prune
+
+
+class Command(BaseCommand):
+    help = 'Delete change feed entries older than the retention period'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help='Keep this many days of changes (default: CHANGEFEED_RETENTION_DAYS, 30)'
+        )
+
+    def handle(self, *args, **options):
+        config = get_changefeed_settings()
+        days = options['days'] if options['days'] is not None else config['RETENTION_DAYS']
+        deleted = prune(days, config)
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log entries older than {days} days'))
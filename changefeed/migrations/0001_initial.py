@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('model', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete'), ('reload', 'Reload')], max_length=10)),
+                ('changed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Change Log Entry',
+                'verbose_name_plural': 'Change Log',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['model', 'id'], name='changefeed_model_id')],
+            },
+        ),
+    ]
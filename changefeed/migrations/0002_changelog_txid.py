@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:23
+
+import changefeed.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('changefeed', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changelog',
+            name='txid',
+            field=models.BigIntegerField(blank=True, db_default=changefeed.models.CurrentTransactionId(), null=True),
+        ),
+        migrations.AddIndex(
+            model_name='changelog',
+            index=models.Index(fields=['txid', 'id'], name='changefeed_txid_id'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from django.db import models
+from django.utils import timezone
+
+
+class CurrentTransactionId(models.Func):
+    """The writing transaction's id (xid8) on PostgreSQL, NULL on other databases"""
+    output_field = models.BigIntegerField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        return 'NULL', []
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return 'pg_current_xact_id()::text::bigint', []
+
+
+class ChangeLog(models.Model):
+    """
+    One write to a tracked model. The id of the last entry a consumer has
+    processed is its feed cursor. On PostgreSQL the feed is ordered by
+    (txid, id), see feed.py.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    RELOAD = 'reload'
+    ACTION_CHOICES = [
+        (CREATE, 'Create'),
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+        # A bulk load whose rows are unknown: re-read the whole table
+        (RELOAD, 'Reload'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
+    # Set by the database on PostgreSQL so the feed can hold back in-flight transactions
+    txid = models.BigIntegerField(null=True, blank=True, db_default=CurrentTransactionId())
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Change Log Entry'
+        verbose_name_plural = 'Change Log'
+        indexes = [
+            # The feed filtered by model: WHERE model IN (...) AND id > cursor ORDER BY id
+            models.Index(fields=['model', 'id'], name='changefeed_model_id'),
+            # The PostgreSQL feed: WHERE txid < xmin AND (txid, id) > cursor ORDER BY txid, id
+            models.Index(fields=['txid', 'id'], name='changefeed_txid_id'),
+        ]
+
+    def __str__(self):
+        return f'{self.id} {self.action} {self.model} {self.object_id}'
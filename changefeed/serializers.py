@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from .models import ChangeLog
+
+
+class ChangeSerializer(serializers.Serializer):
+    """One change feed entry; `data` is the row as it is now, null once deleted"""
+    id = serializers.IntegerField(help_text='The cursor of this entry')
+    model = serializers.CharField()
+    object_id = serializers.IntegerField(allow_null=True)
+    action = serializers.ChoiceField(choices=ChangeLog.ACTION_CHOICES)
+    changed_at = serializers.DateTimeField()
+    data = serializers.DictField(allow_null=True)
+
+
+class ChangePageSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField(help_text='Pass as ?cursor= to get the next page')
+    has_more = serializers.BooleanField()
+    results = ChangeSerializer(many=True)
+
+
+class HeadSerializer(serializers.Serializer):
+    cursor = serializers.IntegerField()
@@ -0,0 +1,56 @@
+"""
+Change log entries written by model signals.
+
+Every save and delete of a tracked model appends a ChangeLog row on the same
+database connection, inside the writing transaction: the change and its entry
+commit or roll back together. Deletes include cascades, because Django sends
+post_delete for every collected row. Bulk writes through VersionedQuerySet
+report their primary keys through `bulk_change`. Raw SQL loads (seed_data
+--bulk, restore_snapshot) report none, so they append a single `reload` entry
+for the table.
+"""
+from django.db.models.signals import post_delete, post_save
+
+from employees.signals import bulk_change
+
+from .models import ChangeLog
+
+BULK_BATCH_SIZE = 1000
+
+
+def tracked_models():
+    from attendance.models import Attendance, Performance
+    from employees.models import Department, Employee
+    return (Department, Employee, Attendance, Performance)
+
+
+def _record_save(sender, instance, created, using=None, **kwargs):
+    ChangeLog.objects.using(using).create(
+        model=sender._meta.label_lower, object_id=instance.pk,
+        action=ChangeLog.CREATE if created else ChangeLog.UPDATE,
+    )
+
+
+def _record_delete(sender, instance, using=None, **kwargs):
+    ChangeLog.objects.using(using).create(
+        model=sender._meta.label_lower, object_id=instance.pk, action=ChangeLog.DELETE,
+    )
+
+
+def _record_bulk(sender, pks=None, created=False, **kwargs):
+    label = sender._meta.label_lower
+    if pks is None:
+        ChangeLog.objects.create(model=label, action=ChangeLog.RELOAD)
+        return
+    action = ChangeLog.CREATE if created else ChangeLog.UPDATE
+    ChangeLog.objects.bulk_create(
+        [ChangeLog(model=label, object_id=pk, action=action) for pk in pks], batch_size=BULK_BATCH_SIZE,
+    )
+
+
+def connect_signals():
+    for model in tracked_models():
+        uid = f'changefeed-{model._meta.label_lower}'
+        post_save.connect(_record_save, sender=model, dispatch_uid=f'{uid}-save')
+        post_delete.connect(_record_delete, sender=model, dispatch_uid=f'{uid}-delete')
+        bulk_change.connect(_record_bulk, sender=model, dispatch_uid=f'{uid}-bulk')
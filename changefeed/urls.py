@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from . import views
+
+router = DefaultRouter()
+router.register(r'changes', views.ChangeFeedViewSet, basename='change')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,77 @@
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from employee_project.tracing import TracingMixin
+
+from .feed import CursorExpired, get_changefeed_settings, head, model_labels, read_changes
+from .serializers import ChangePageSerializer, ChangeSerializer, HeadSerializer
+
+
+def _int_param(request, name, default):
+    value = request.query_params.get(name, '')
+    if value == '':
+        return default
+    if not value.isdigit():
+        raise ValueError(f'{name} must be a non-negative integer')
+    return int(value)
+
+
+class ChangeFeedViewSet(TracingMixin, viewsets.GenericViewSet):
+    """
+    Changes to departments, employees, attendance and performance, in order.
+    Page with ?cursor=<the cursor of the previous page>; start from 0, or
+    from head/ after copying the tables.
+    """
+    serializer_class = ChangeSerializer
+    permission_classes = [IsAuthenticated]
+    # The feed has its own cursor; no page numbers, filters or ordering
+    pagination_class = None
+    filter_backends = []
+
+    @swagger_auto_schema(
+        manual_parameters=[
+            openapi.Parameter(
+                'cursor', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, default=0,
+                description='Return the changes after this cursor',
+            ),
+            openapi.Parameter(
+                'models', openapi.IN_QUERY, type=openapi.TYPE_STRING,
+                description='Comma-separated model labels, e.g. employees.employee,attendance.attendance',
+            ),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER),
+        ],
+        responses={
+            200: ChangePageSerializer,
+            410: openapi.Response('The changes after the cursor have been pruned; resync from head/'),
+        },
+    )
+    def list(self, request):
+        """The changes after ?cursor=, each with the current state of its row"""
+        config = get_changefeed_settings()
+        try:
+            cursor = _int_param(request, 'cursor', 0)
+            limit = _int_param(request, 'limit', config['PAGE_SIZE']) or config['PAGE_SIZE']
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        models = [label for label in request.query_params.get('models', '').split(',') if label]
+        unknown = sorted(set(models) - set(model_labels()))
+        if unknown:
+            return Response(
+                {'error': f"Unknown models {', '.join(unknown)}; choose from {', '.join(model_labels())}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            entries, next_cursor, has_more = read_changes(cursor, models, limit, config)
+        except CursorExpired as e:
+            return Response({'error': str(e), 'head': head(config)}, status=status.HTTP_410_GONE)
+        return Response({'cursor': next_cursor, 'has_more': has_more, 'results': entries})
+
+    @swagger_auto_schema(responses={200: HeadSerializer})
+    @action(detail=False, methods=['get'])
+    def head(self, request):
+        """The cursor to follow the feed from after a full copy of the tables"""
+        return Response({'cursor': head()})
@@ -0,0 +1,312 @@
+"""
+API benchmark suite.
+
+`manage.py run_benchmarks` seeds a deterministic dataset at a named scale into
+a throwaway test database. It then requests every list, filter, detail,
+statistics and chart endpoint through the Django test client and records, per
+endpoint:
+
+* cold_ms: the first request, with every cache cleared
+* median_ms / p95_ms: warm requests after that
+* queries: database queries of a warm request
+* peak_kb: peak Python memory allocated while serving one request
+* bytes: response body size
+
+Results are compared against a stored baseline JSON. The run fails when an
+endpoint regresses by more than the threshold. Timings only compare
+meaningfully on the machine that recorded the baseline. Query counts are
+exact everywhere, and any increase fails.
+"""
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from faker import Faker
+
+from attendance.models import Attendance, Performance
+from employees.models import Department, Employee
+
+
+@dataclass(frozen=True)
+class Scale:
+    employees: int
+    departments: int
+    attendance_years: int
+    # Employees with an attendance history. Capped on the larger scales so the
+    # attendance table stays within what a benchmark machine can seed; 500k x
+    # 5 years of weekdays would be 650M rows.
+    attendance_employees: int
+
+
+SCALES = {
+    'tiny': Scale(employees=60, departments=4, attendance_years=1, attendance_employees=20),
+    'small': Scale(employees=1_000, departments=8, attendance_years=1, attendance_employees=1_000),
+    'medium': Scale(employees=50_000, departments=12, attendance_years=3, attendance_employees=5_000),
+    'large': Scale(employees=500_000, departments=12, attendance_years=5, attendance_employees=20_000),
+}
+
+DEPARTMENT_NAMES = [
+    'Engineering', 'Marketing', 'Human Resources', 'Finance', 'Sales',
+    'Operations', 'Research & Development', 'Customer Support',
+    'Legal', 'Information Technology', 'Product Management', 'Quality Assurance',
+]
+
+DEFAULT_SEED = 42
+DEFAULT_THRESHOLD = 0.25
+BATCH_SIZE = 5_000
+BENCHMARK_USERNAME = 'benchmark'
+
+# (name, path); {department}, {employee} and {day} are filled in after seeding
+ENDPOINTS = [
+    ('departments-list', '/api/departments/'),
+    ('departments-detail', '/api/departments/{department}/'),
+    ('departments-employees', '/api/departments/{department}/employees/'),
+    ('departments-statistics', '/api/departments/statistics/'),
+    ('employees-list', '/api/employees/'),
+    ('employees-filter', '/api/employees/?department={department}&date_joined_after={day}'),
+    ('employees-filter-search', '/api/employees/?search=smith'),
+    ('employees-search', '/api/employees/search/?q=smith'),
+    ('employees-detail', '/api/employees/{employee}/'),
+    ('employees-attendance', '/api/employees/{employee}/attendance/'),
+    ('employees-performance', '/api/employees/{employee}/performance/'),
+    ('employees-statistics', '/api/employees/statistics/'),
+    ('attendance-list', '/api/attendance/'),
+    ('attendance-filter', '/api/attendance/?status=late&department={department}&date_after={day}'),
+    ('attendance-today', '/api/attendance/today/'),
+    ('attendance-statistics', '/api/attendance/statistics/?days=30'),
+    ('attendance-employee-summary', '/api/attendance/employee_summary/?employee_id={employee}'),
+    ('performance-list', '/api/performance/'),
+    ('performance-filter', '/api/performance/?min_rating=4&department={department}'),
+    ('performance-statistics', '/api/performance/statistics/'),
+    ('performance-employee', '/api/performance/employee_performance/?employee_id={employee}'),
+    ('charts-department-stats', '/api/charts/department-stats/'),
+    ('charts-attendance-monthly', '/api/charts/attendance-monthly/'),
+    ('charts-dashboard-stats', '/api/charts/dashboard-stats/'),
+    ('charts-bootstrap', '/api/charts/bootstrap/'),
+]
+
+
+def department_name(index):
+    name = DEPARTMENT_NAMES[index % len(DEPARTMENT_NAMES)]
+    return name if index < len(DEPARTMENT_NAMES) else f'{name} {index}'
+
+
+def seed_dataset(scale, seed=DEFAULT_SEED, today=None, stdout=None):
+    """
+    Insert the dataset for `scale`. The same seed always produces the same
+    rows; dates are relative to `today` so date-windowed endpoints have data.
+    """
+    today = today or date.today()
+    rng = random.Random(seed)
+    fake = Faker()
+    fake.seed_instance(seed)
+
+    def progress(message):
+        if stdout is not None:
+            stdout.write(message)
+
+    with transaction.atomic():
+        departments = Department.objects.bulk_create(
+            Department(name=department_name(i)) for i in range(scale.departments)
+        )
+
+        for start in range(0, scale.employees, BATCH_SIZE):
+            batch = [
+                Employee(
+                    name=fake.name(),
+                    email=f'employee{i}@bench.example.com',
+                    phone_number=f'+1{rng.randint(200, 999)}{rng.randint(200, 999)}{rng.randint(1000, 9999)}',
+                    address=fake.address(),
+                    date_of_joining=today - timedelta(days=rng.randint(0, 10 * 365)),
+                    department=departments[rng.randrange(len(departments))],
+                )
+                for i in range(start, min(start + BATCH_SIZE, scale.employees))
+            ]
+            Employee.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+            progress(f'  employees: {min(start + BATCH_SIZE, scale.employees)}/{scale.employees}')
+        employee_ids = list(Employee.objects.order_by('id').values_list('id', flat=True))
+
+        days = [today - timedelta(days=n) for n in range(scale.attendance_years * 365)]
+        workdays = [day for day in days if day.weekday() < 5]
+        batch = []
+        for employee_id in employee_ids[:scale.attendance_employees]:
+            for day in workdays:
+                roll = rng.random()
+                status = 'present' if roll < 0.85 else 'late' if roll < 0.95 else 'absent'
+                batch.append(Attendance(employee_id=employee_id, date=day, status=status))
+            if len(batch) >= BATCH_SIZE:
+                Attendance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                batch = []
+        Attendance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        progress(f'  attendance: {Attendance.objects.count()} records')
+
+        batch = []
+        for employee_id in employee_ids:
+            for _ in range(rng.randint(1, 3)):
+                batch.append(Performance(
+                    employee_id=employee_id,
+                    rating=rng.choices(range(1, 6), weights=[5, 15, 30, 35, 15])[0],
+                    review_date=today - timedelta(days=rng.randint(30, 730)),
+                    comments='Benchmark review',
+                ))
+            if len(batch) >= BATCH_SIZE:
+                Performance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+                batch = []
+        Performance.objects.bulk_create(batch, batch_size=BATCH_SIZE)
+        progress(f'  performance: {Performance.objects.count()} records')
+
+
+def is_seeded(scale):
+    return Employee.objects.count() == scale.employees and Department.objects.count() == scale.departments
+
+
+def endpoint_paths(today=None):
+    """ENDPOINTS with ids of the seeded data filled in"""
+    today = today or date.today()
+    values = {
+        'department': Department.objects.order_by('id').values_list('id', flat=True).first(),
+        'employee': Attendance.objects.order_by('employee_id').values_list('employee_id', flat=True).first(),
+        'day': (today - timedelta(days=90)).isoformat(),
+    }
+    return [(name, path.format(**values)) for name, path in ENDPOINTS]
+
+
+def _clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def measure_endpoint(client, path, repeat):
+    _clear_caches()
+    start = time.perf_counter()
+    response = client.get(path)
+    cold_ms = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        return {'status': response.status_code}
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(path)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(path)
+    # Read now: the captured list is a view on a log the next request resets
+    query_count = len(queries)
+
+    # Measured on its own request: tracing allocations slows everything down
+    tracemalloc.start()
+    try:
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    return {
+        'status': response.status_code,
+        'cold_ms': round(cold_ms, 2),
+        'median_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(_percentile(timings, 0.95), 2),
+        'queries': query_count,
+        'peak_kb': round(peak / 1024, 1),
+        'bytes': len(body),
+    }
+
+
+def run_suite(repeat=10, only=None, stdout=None):
+    """Measure every endpoint (or those whose name contains `only`) as a superuser"""
+    user, _ = User.objects.get_or_create(
+        username=BENCHMARK_USERNAME, defaults={'is_staff': True, 'is_superuser': True}
+    )
+    client = Client()
+    client.force_login(user)
+    results = {}
+    # The test client talks to the app in-process as 'testserver'; DEBUG stays
+    # off as in production, CaptureQueriesContext records queries regardless
+    with override_settings(ALLOWED_HOSTS=['*']):
+        for name, path in endpoint_paths():
+            if only and only not in name:
+                continue
+            results[name] = {'path': path, **measure_endpoint(client, path, repeat)}
+            if stdout is not None:
+                stdout.write(format_result(name, results[name]))
+    return results
+
+
+def format_result(name, result):
+    if 'median_ms' not in result:
+        return f"{name:30} HTTP {result['status']}"
+    return (
+        f"{name:30} {result['cold_ms']:9.1f} {result['median_ms']:9.1f} {result['p95_ms']:9.1f} "
+        f"{result['queries']:7d} {result['peak_kb']:9.1f} {result['bytes']:9d}"
+    )
+
+
+RESULT_HEADER = (
+    f"{'endpoint':30} {'cold ms':>9} {'median ms':>9} {'p95 ms':>9} "
+    f"{'queries':>7} {'peak KB':>9} {'bytes':>9}"
+)
+
+
+def compare_to_baseline(results, baseline, threshold=DEFAULT_THRESHOLD, min_delta_ms=1.0):
+    """
+    Return a list of regression messages. Timings and memory may grow by
+    `threshold` (a fraction) and, for timings, by at least `min_delta_ms` so
+    sub-millisecond noise never fails a run; query counts may not grow at all.
+    """
+    regressions = []
+    for name, base in baseline.get('results', {}).items():
+        current = results.get(name)
+        if current is None or 'median_ms' not in base:
+            continue
+        if 'median_ms' not in current:
+            regressions.append(f"{name}: HTTP {current['status']} (baseline 200)")
+            continue
+        for metric in ('median_ms', 'p95_ms', 'cold_ms'):
+            allowed = max(base[metric] * (1 + threshold), base[metric] + min_delta_ms)
+            if current[metric] > allowed:
+                regressions.append(f'{name}: {metric} {current[metric]} > {base[metric]} baseline')
+        if current['peak_kb'] > base['peak_kb'] * (1 + threshold):
+            regressions.append(f"{name}: peak_kb {current['peak_kb']} > {base['peak_kb']} baseline")
+        if current['queries'] > base['queries']:
+            regressions.append(f"{name}: queries {current['queries']} > {base['queries']} baseline")
+    return regressions
+
+
+def default_baseline_path(scale_name):
+    return Path(settings.BASE_DIR) / 'benchmarks' / f'baseline-{scale_name}.json'
+
+
+def write_baseline(path, scale_name, seed, results):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        'scale': scale_name,
+        'seed': seed,
+        'database': connection.vendor,
+        'recorded_at': date.today().isoformat(),
+        'results': results,
+    }
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + '\n')
+
+
+def read_baseline(path):
+    return json.loads(Path(path).read_text())
@@ -0,0 +1,309 @@
+"""
+Cache backend shared by every worker process on a host, stored in a local
+SQLite database in WAL mode.
+
+WAL lets readers run concurrently with a writer, so gunicorn workers share one
+cache (and one hit rate) without an external service. Entries are evicted in
+least-recently-used order once MAX_ENTRIES or MAX_SIZE (bytes) is exceeded.
+Keys stored with timeout=None (version and generation counters) are never
+evicted: they count towards the limits but only expiring entries are culled.
+The running totals are kept by triggers, so checking the limits is a single
+row lookup. incr()/decr() run inside BEGIN IMMEDIATE and are atomic across
+processes.
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'employee_project.cache.SQLiteCache',
+            'LOCATION': '/var/tmp/employee_project/cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 10000, 'MAX_SIZE': 64 * 1024 * 1024},
+        }
+    }
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+CREATE TABLE IF NOT EXISTS cache_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    entries INTEGER NOT NULL,
+    bytes INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO cache_stats (id, entries, bytes) VALUES (0, 0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_insert AFTER INSERT ON cache BEGIN
+    UPDATE cache_stats SET entries = entries + 1, bytes = bytes + NEW.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_delete AFTER DELETE ON cache BEGIN
+    UPDATE cache_stats SET entries = entries - 1, bytes = bytes - OLD.size WHERE id = 0;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_update AFTER UPDATE OF size ON cache BEGIN
+    UPDATE cache_stats SET bytes = bytes - OLD.size + NEW.size WHERE id = 0;
+END;
+"""
+
+UPSERT = """
+INSERT INTO cache (key, value, expires, accessed, size) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value, expires = excluded.expires,
+    accessed = excluded.accessed, size = excluded.size
+"""
+
+
+class SQLiteCache(BaseCache):
+    """Cross-process LRU cache backed by a SQLite WAL file"""
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = Path(location)
+        self._max_size = int(options.get('MAX_SIZE', 64 * 1024 * 1024))
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 5.0))
+        # Access times are buffered and written on the next write (or once per
+        # second) so reads never need the write lock.
+        self._touch_interval = float(options.get('TOUCH_INTERVAL', 1.0))
+        self._local = threading.local()
+
+    # Connection handling
+
+    def _connection(self):
+        local = self._local
+        conn = getattr(local, 'conn', None)
+        if conn is None or local.pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(
+                str(self._path), timeout=self._busy_timeout, isolation_level=None
+            )
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            local.conn = conn
+            local.pid = os.getpid()
+            local.touched = {}
+            local.flushed_at = time.monotonic()
+        return conn
+
+    def _write(self, func):
+        """Run func(conn) inside an IMMEDIATE transaction, flushing access times first"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._flush_touched(conn)
+            result = func(conn)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return result
+
+    def _flush_touched(self, conn):
+        touched = self._local.touched
+        if touched:
+            conn.executemany(
+                'UPDATE cache SET accessed = ? WHERE key = ? AND accessed < ?',
+                [(at, key, at) for key, at in touched.items()],
+            )
+            touched.clear()
+        self._local.flushed_at = time.monotonic()
+
+    def _touch_later(self, key):
+        local = self._local
+        local.touched[key] = time.time()
+        if time.monotonic() - local.flushed_at >= self._touch_interval:
+            self._write(lambda conn: None)
+
+    # Serialization
+
+    def _encode(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _decode(self, blob):
+        return pickle.loads(blob)
+
+    # Eviction
+
+    def _cull(self, conn, now):
+        entries, size = conn.execute(
+            'SELECT entries, bytes FROM cache_stats WHERE id = 0'
+        ).fetchone()
+        if entries <= self._max_entries and size <= self._max_size:
+            return
+        conn.execute('DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        while True:
+            entries, size = conn.execute(
+                'SELECT entries, bytes FROM cache_stats WHERE id = 0'
+            ).fetchone()
+            if entries == 0 or (entries <= self._max_entries and size <= self._max_size):
+                return
+            # Free a slice at a time rather than one row per loop
+            batch = max(entries - self._max_entries, entries // (self._cull_frequency or 1), 1)
+            culled = conn.execute(
+                'DELETE FROM cache WHERE key IN '
+                '(SELECT key FROM cache WHERE expires IS NOT NULL ORDER BY accessed LIMIT ?)',
+                (batch,),
+            ).rowcount
+            if not culled:
+                return
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT value, expires FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return default
+        blob, expires = row
+        if expires is not None and expires <= time.time():
+            return default
+        self._touch_later(key)
+        return self._decode(blob)
+
+    def get_many(self, keys, version=None):
+        key_map = {self.make_and_validate_key(key, version=version): key for key in keys}
+        if not key_map:
+            return {}
+        placeholders = ','.join('?' * len(key_map))
+        rows = self._connection().execute(
+            f'SELECT key, value, expires FROM cache WHERE key IN ({placeholders})',
+            list(key_map),
+        ).fetchall()
+        now = time.time()
+        found = {}
+        for db_key, blob, expires in rows:
+            if expires is None or expires > now:
+                found[key_map[db_key]] = self._decode(blob)
+                self._local.touched[db_key] = now
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._set(key, value, timeout)
+
+    def _set(self, key, value, timeout):
+        blob = self._encode(value)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+
+        def write(conn):
+            conn.execute(UPSERT, (key, blob, expires, now, len(blob)))
+            self._cull(conn, now)
+
+        self._write(write)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        rows = []
+        for key, value in data.items():
+            blob = self._encode(value)
+            rows.append((self.make_and_validate_key(key, version=version), blob, expires, now, len(blob)))
+
+        def write(conn):
+            conn.executemany(UPSERT, rows)
+            self._cull(conn, now)
+
+        self._write(write)
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        blob = self._encode(value)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+
+        def write(conn):
+            row = conn.execute('SELECT expires FROM cache WHERE key = ?', (key,)).fetchone()
+            if row is not None and (row[0] is None or row[0] > now):
+                return False
+            conn.execute(UPSERT, (key, blob, expires, now, len(blob)))
+            self._cull(conn, now)
+            return True
+
+        return self._write(write)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+
+        def write(conn):
+            cursor = conn.execute(
+                'UPDATE cache SET expires = ?, accessed = ? '
+                'WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (expires, now, key, now),
+            )
+            return cursor.rowcount > 0
+
+        return self._write(write)
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+
+        def write(conn):
+            row = conn.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or (row[1] is not None and row[1] <= now):
+                raise ValueError("Key '%s' not found" % key)
+            value = self._decode(row[0]) + delta
+            blob = self._encode(value)
+            conn.execute(
+                'UPDATE cache SET value = ?, size = ?, accessed = ? WHERE key = ?',
+                (blob, len(blob), now, key),
+            )
+            return value
+
+        return self._write(write)
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._write(
+            lambda conn: conn.execute('DELETE FROM cache WHERE key = ?', (key,)).rowcount > 0
+        )
+
+    def delete_many(self, keys, version=None):
+        db_keys = [(self.make_and_validate_key(key, version=version),) for key in keys]
+        self._write(lambda conn: conn.executemany('DELETE FROM cache WHERE key = ?', db_keys))
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._write(lambda conn: conn.execute('DELETE FROM cache'))
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests
+        pass
+
+    def stats(self):
+        """Return entry count and stored bytes, for monitoring"""
+        entries, size = self._connection().execute(
+            'SELECT entries, bytes FROM cache_stats WHERE id = 0'
+        ).fetchone()
+        return {
+            'entries': entries, 'bytes': size,
+            'max_entries': self._max_entries, 'max_size': self._max_size,
+        }
@@ -0,0 +1,85 @@
+"""
+Database connection reuse helpers.
+
+Three modes are selected with DB_POOL in settings:
+
+- 'none': a new connection per request (Django's default).
+- 'persistent': each worker thread keeps its connection for CONN_MAX_AGE
+  seconds and checks it is still usable before reusing it.
+- 'psycopg': a psycopg 3 connection pool per worker process (requires the
+  psycopg[pool] package).
+
+Pool sizes are derived from a total connection budget split across worker
+processes, so adding workers does not silently exceed max_connections.
+"""
+import os
+import threading
+import time
+from collections import Counter
+
+from django.db.backends.signals import connection_created
+
+POOL_MODES = ('none', 'persistent', 'psycopg')
+
+_opened = Counter()
+_opened_lock = threading.Lock()
+
+
+def pool_max_size(total_connections, workers, threads=1):
+    """
+    Connections one worker process may hold: its share of the total budget,
+    but never fewer than the number of threads that can query at once.
+    """
+    workers = max(1, workers)
+    threads = max(1, threads)
+    return max(threads, total_connections // workers)
+
+
+def psycopg_pool_options(min_size, max_size, timeout):
+    """OPTIONS['pool'] for the psycopg backend, checking connections on checkout"""
+    options = {'min_size': min(min_size, max_size), 'max_size': max_size, 'timeout': timeout}
+    try:
+        from psycopg_pool import ConnectionPool
+    except ImportError:
+        return options
+    if hasattr(ConnectionPool, 'check_connection'):
+        options['check'] = ConnectionPool.check_connection
+    return options
+
+
+def _count_connection(sender, connection, **kwargs):
+    with _opened_lock:
+        _opened[connection.alias] += 1
+
+
+connection_created.connect(_count_connection, dispatch_uid='db-pool-connection-count')
+
+
+def connections_opened(alias='default'):
+    """New physical connections this process has opened (excludes pool reuse)"""
+    with _opened_lock:
+        return _opened[alias]
+
+
+def pool_stats(alias='default'):
+    """Connection reuse statistics for one database alias in this process"""
+    from django.db import connections
+
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    stats = {
+        'alias': alias,
+        'vendor': connection.vendor,
+        'pid': os.getpid(),
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'health_checks': settings_dict.get('CONN_HEALTH_CHECKS', False),
+        'connected': connection.connection is not None,
+        'connections_opened': connections_opened(alias),
+    }
+    if connection.connection is not None and getattr(connection, 'close_at', None) is not None:
+        stats['seconds_until_recycle'] = round(max(0.0, connection.close_at - time.monotonic()), 1)
+
+    pool = getattr(connection, 'pool', None)
+    if pool is not None:
+        stats['pool'] = {'min_size': pool.min_size, 'max_size': pool.max_size, **pool.get_stats()}
+    return stats
@@ -0,0 +1,311 @@
+"""
+Concurrent load generator for a running deployment.
+
+`manage.py load_test` runs N virtual users, each in its own thread with its
+own keep-alive HTTP connection. Each virtual user repeatedly picks a weighted
+scenario:
+
+    checkin      log in, then record today's attendance for an employee
+    dashboard    poll the chart bootstrap and dashboard statistics
+    search       search employees by a name fragment
+    paging       page through the attendance list
+
+Each HTTP request is recorded with its latency and status. The report covers
+throughput, p50/p95/p99 latency and error rates, per step and per scenario.
+The results can be exported as JSON or CSV. Only the standard library is used,
+so the tool runs wherever the project does.
+"""
+import csv
+import http.client
+import json
+import math
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from urllib.parse import urlencode, urlsplit
+
+DEFAULT_WEIGHTS = {'checkin': 2, 'dashboard': 5, 'search': 2, 'paging': 1}
+
+SEARCH_TERMS = ['smith', 'john', 'an', 'lee', 'mar', 'son', 'eng', 'sales']
+
+
+@dataclass
+class Sample:
+    scenario: str
+    step: str
+    started: float  # seconds since the run started
+    latency_ms: float
+    status: int  # 0 when no response was received
+    error: str = ''
+
+
+@dataclass
+class LoadConfig:
+    base_url: str
+    username: str
+    password: str
+    users: int = 10
+    duration: float = 30.0
+    ramp_up: float = 0.0
+    think_time: float = 0.0
+    weights: dict = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    timeout: float = 30.0
+    seed: int = 1
+
+
+class HttpSession:
+    """One keep-alive connection with a bearer token, recording every request"""
+
+    def __init__(self, base_url, recorder, timeout):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+        self.token = None
+        self._conn = None
+
+    def _connection(self):
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+            self._conn = cls(self.host, self.port, timeout=self.timeout)
+        return self._conn
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def request(self, scenario, step, method, path, params=None, body=None):
+        """Send one request and return (status, parsed JSON or None)"""
+        url = self.prefix + path + (f'?{urlencode(params)}' if params else '')
+        headers = {'Accept': 'application/json', 'Accept-Encoding': 'identity'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            headers['Content-Type'] = 'application/json'
+
+        start = time.perf_counter()
+        try:
+            conn = self._connection()
+            conn.request(method, url, body=payload, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            self.close()  # reconnect on the next request
+            self.recorder.add(scenario, step, start, 0, f'{type(e).__name__}: {e}')
+            return 0, None
+        self.recorder.add(scenario, step, start, response.status)
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = []
+        self._lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.elapsed = 0.0
+
+    def add(self, scenario, step, start, status, error=''):
+        now = time.perf_counter()
+        sample = Sample(scenario, step, round(start - self.origin, 4), round((now - start) * 1000, 3), status, error)
+        with self._lock:
+            self.samples.append(sample)
+
+
+class CheckinPool:
+    """Employees without an attendance record today, each handed out once"""
+
+    def __init__(self, employee_ids):
+        self._ids = list(employee_ids)
+        self._lock = threading.Lock()
+
+    def take(self):
+        with self._lock:
+            return self._ids.pop() if self._ids else None
+
+    def __len__(self):
+        return len(self._ids)
+
+
+def login(session, config, scenario='checkin'):
+    status, data = session.request(
+        scenario, 'login', 'POST', '/api/auth/login/',
+        body={'username': config.username, 'password': config.password},
+    )
+    if status == 200 and data:
+        session.token = data['access_token']
+    return status
+
+
+def scenario_checkin(session, config, state, rng):
+    employee_id = state['checkins'].take()
+    if employee_id is None:
+        state['checkins_exhausted'] = True
+        return
+    if login(session, config) != 200:
+        return
+    session.request('checkin', 'checkin', 'POST', '/api/attendance/', body={
+        'employee': employee_id, 'date': date.today().isoformat(), 'status': 'present',
+    })
+
+
+def scenario_dashboard(session, config, state, rng):
+    session.request('dashboard', 'bootstrap', 'GET', '/api/charts/bootstrap/')
+    session.request('dashboard', 'dashboard-stats', 'GET', '/api/charts/dashboard-stats/')
+
+
+def scenario_search(session, config, state, rng):
+    session.request('search', 'search', 'GET', '/api/employees/search/', {'q': rng.choice(SEARCH_TERMS)})
+
+
+def scenario_paging(session, config, state, rng):
+    for page in range(1, 4):
+        status, data = session.request('paging', 'attendance-page', 'GET', '/api/attendance/', {'page': page})
+        if status != 200 or not data or not data.get('next'):
+            break
+
+
+SCENARIOS = {
+    'checkin': scenario_checkin,
+    'dashboard': scenario_dashboard,
+    'search': scenario_search,
+    'paging': scenario_paging,
+}
+
+
+def prepare(config, max_pages=100):
+    """
+    Check the credentials and collect employees that can still check in today,
+    outside the measured window.
+    """
+    session = HttpSession(config.base_url, Recorder(), config.timeout)
+    try:
+        status = login(session, config, scenario='setup')
+        if status != 200:
+            raise RuntimeError(f'Login as {config.username!r} failed with HTTP {status}')
+        _, today = session.request('setup', 'today', 'GET', '/api/attendance/today/')
+        checked_in = {record['employee'] for record in today or []}
+        employee_ids = []
+        if config.weights.get('checkin'):
+            for page in range(1, max_pages + 1):
+                status, data = session.request('setup', 'employees', 'GET', '/api/employees/', {'page': page})
+                if status != 200 or not data:
+                    break
+                employee_ids.extend(e['id'] for e in data['results'] if e['id'] not in checked_in)
+                if not data.get('next'):
+                    break
+        return {'checkins': CheckinPool(employee_ids), 'checkins_exhausted': False}
+    finally:
+        session.close()
+
+
+def run(config, state=None):
+    """Run the load for config.duration seconds and return the recorder"""
+    state = state or prepare(config)
+    recorder = Recorder()
+    deadline = recorder.origin + config.ramp_up + config.duration
+
+    def virtual_user(index):
+        rng = random.Random(config.seed * 1000 + index)
+        if config.ramp_up and config.users > 1:
+            time.sleep(config.ramp_up * index / config.users)
+        session = HttpSession(config.base_url, recorder, config.timeout)
+        try:
+            # Every virtual user is a signed-in user; checkin logs in again on top
+            login(session, config, scenario='session')
+            while time.perf_counter() < deadline:
+                weights = dict(config.weights)
+                if state['checkins_exhausted']:
+                    weights.pop('checkin', None)
+                names = [name for name, weight in weights.items() if weight > 0]
+                if not names:
+                    break
+                name = rng.choices(names, weights=[weights[n] for n in names])[0]
+                SCENARIOS[name](session, config, state, rng)
+                if config.think_time:
+                    time.sleep(rng.uniform(0, 2 * config.think_time))
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(config.users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.elapsed = time.perf_counter() - recorder.origin
+    return recorder
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(samples, seconds):
+    latencies = sorted(s.latency_ms for s in samples)
+    errors = sum(1 for s in samples if s.status == 0 or s.status >= 500)
+    client_errors = sum(1 for s in samples if 400 <= s.status < 500)
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / seconds, 2) if seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        'client_error_rate': round(client_errors / len(samples), 4) if samples else 0.0,
+        'throttled': sum(1 for s in samples if s.status == 429),
+    }
+
+
+def summarize(recorder):
+    """Totals, per step ('scenario/step') and scenario completions per second"""
+    seconds = recorder.elapsed
+    by_step = defaultdict(list)
+    for sample in recorder.samples:
+        by_step[f'{sample.scenario}/{sample.step}'].append(sample)
+    checkins = [s for s in by_step.get('checkin/checkin', []) if s.status == 201]
+    return {
+        'duration_s': round(seconds, 2),
+        'total': _summarize(recorder.samples, seconds),
+        'steps': {name: _summarize(samples, seconds) for name, samples in sorted(by_step.items())},
+        'checkins_per_second': round(len(checkins) / seconds, 2) if seconds else 0.0,
+        'dashboard_polls_per_second': round(len(by_step.get('dashboard/dashboard-stats', [])) / seconds, 2)
+        if seconds else 0.0,
+    }
+
+
+def write_json(path, config, summary, recorder):
+    document = {
+        'config': {k: v for k, v in asdict(config).items() if k != 'password'},
+        'summary': summary,
+        'samples': [asdict(s) for s in recorder.samples],
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+
+
+def write_csv(path, summary):
+    """One row per step plus a TOTAL row"""
+    columns = ['step', 'requests', 'throughput_rps', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms',
+               'error_rate', 'client_error_rate', 'throttled']
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for step, stats in summary['steps'].items():
+            writer.writerow({'step': step, **stats})
+        writer.writerow({'step': 'TOTAL', **summary['total']})
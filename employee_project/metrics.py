@@ -0,0 +1,243 @@
+"""
+Request metrics shared by every worker process on a host.
+
+Each process accumulates counter increments in memory and adds them to a
+SQLite WAL file at most every FLUSH_INTERVAL seconds (and whenever /metrics is
+scraped), so the hot path never touches the file. /metrics sums the file, which
+gives one Prometheus view across all gunicorn workers without an external
+service or the prometheus_client multiprocess directory.
+
+    METRICS = {
+        'ENABLED': True,
+        'PATH': '/var/tmp/employee_project/metrics.sqlite3',
+        'FLUSH_INTERVAL': 5,
+        'TOKEN': None,   # when set, /metrics requires "Authorization: Bearer <TOKEN>"
+    }
+"""
+import atexit
+import contextvars
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+METRICS_DEFAULTS = {
+    'ENABLED': True,
+    'PATH': None,
+    'FLUSH_INTERVAL': 5.0,
+    'TOKEN': None,
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# name -> (type, help); histograms are stored as their _bucket/_sum/_count series
+METRIC_FAMILIES = {
+    'http_requests_total': ('counter', 'Requests by URL name, method and status code'),
+    'http_request_duration_seconds': ('histogram', 'Request latency by URL name and method'),
+    'http_db_queries_total': ('counter', 'Database queries run while serving requests'),
+    'http_db_query_seconds_total': ('counter', 'Time spent in database queries'),
+    'http_serialize_seconds_total': ('counter', 'Time spent serializing response data (serializer .data, JsonResponse)'),
+    'http_render_seconds_total': ('counter', 'Time spent rendering responses (JSON encoding, templates)'),
+    'http_response_bytes_total': ('counter', 'Response body bytes sent (after compression, streams included)'),
+    'auth_throttle_rejections_total': ('counter', 'Login/registration requests rejected by throttle scope'),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metrics (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (name, labels)
+);
+"""
+
+UPSERT = """
+INSERT INTO metrics (name, labels, value) VALUES (?, ?, ?)
+ON CONFLICT (name, labels) DO UPDATE SET value = value + excluded.value
+"""
+
+
+_request_timings = contextvars.ContextVar('metrics_request_timings', default=None)
+
+
+def get_metrics_settings():
+    config = {**METRICS_DEFAULTS, **getattr(settings, 'METRICS', {})}
+    if config['PATH'] is None:
+        config['PATH'] = str(Path(settings.BASE_DIR) / 'var' / 'metrics.sqlite3')
+    return config
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(labels):
+    """Render label pairs in Prometheus text format: key="value",..."""
+    return ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class MetricsRegistry:
+    """Per-process buffer of increments flushed into the shared metrics file"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)
+        self._last_flush = time.monotonic()
+        self._local = threading.local()
+
+    def inc(self, name, labels=(), value=1.0):
+        key = (name, format_labels(labels))
+        with self._lock:
+            self._pending[key] += value
+
+    def observe(self, name, labels, value, buckets=LATENCY_BUCKETS):
+        """Record one histogram observation (cumulative buckets, _sum and _count)"""
+        base = format_labels(labels)
+        prefix = f'{base},' if base else ''
+        with self._lock:
+            for bound in buckets:
+                if value <= bound:
+                    self._pending[(f'{name}_bucket', f'{prefix}le="{bound}"')] += 1
+            self._pending[(f'{name}_bucket', f'{prefix}le="+Inf"')] += 1
+            self._pending[(f'{name}_sum', base)] += value
+            self._pending[(f'{name}_count', base)] += 1
+
+    def _connection(self):
+        path = get_metrics_settings()['PATH']
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'path', None) != path:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, timeout=5.0, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._local.conn, self._local.path = conn, path
+        return conn
+
+    def flush(self):
+        """Add this process's pending increments to the shared file"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        rows = [(name, labels, value) for (name, labels), value in pending.items()]
+        try:
+            conn = self._connection()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                conn.executemany(UPSERT, rows)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error:
+            # Keep the increments for the next attempt rather than lose them
+            with self._lock:
+                for name, labels, value in rows:
+                    self._pending[(name, labels)] += value
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= get_metrics_settings()['FLUSH_INTERVAL']:
+            self.flush()
+
+    def collect(self):
+        """All series summed across processes, as (name, labels, value) rows"""
+        self.flush()
+        return self._connection().execute(
+            'SELECT name, labels, value FROM metrics ORDER BY name, labels'
+        ).fetchall()
+
+    def reset(self):
+        """Drop every recorded value (tests, or after changing metric definitions)"""
+        with self._lock:
+            self._pending.clear()
+        self._connection().execute('DELETE FROM metrics')
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+
+
+@contextmanager
+def request_timings():
+    """Collect `timed()` durations while serving a request; yields {name: seconds}"""
+    timings = defaultdict(float)
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def collecting_timings():
+    return _request_timings.get() is not None
+
+
+@contextmanager
+def timed(name):
+    """Add the block's duration to the current request's `name` timing; a no-op outside one"""
+    timings = _request_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] += time.perf_counter() - start
+
+
+class TimedJSONEncoder(DjangoJSONEncoder):
+    """JsonResponse encoder whose work counts as serialization time"""
+
+    def encode(self, o):
+        with timed('serialize'):
+            return super().encode(o)
+
+
+def _family(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        base = name[:-len(suffix)]
+        if name.endswith(suffix) and METRIC_FAMILIES.get(base, ('',))[0] == 'histogram':
+            return base
+    return name
+
+
+def _series_order(row):
+    """Sort key keeping histogram buckets in increasing `le` order"""
+    name, labels, _ = row
+    base, _, le = labels.rpartition('le="')
+    if name.endswith('_bucket') and le:
+        bound = le.rstrip('"')
+        return (name, base, float('inf') if bound == '+Inf' else float(bound))
+    return (name, labels, 0.0)
+
+
+def render_prometheus(rows):
+    """Prometheus text exposition (format 0.0.4) for collected rows"""
+    families = defaultdict(list)
+    for name, labels, value in rows:
+        families[_family(name)].append((name, labels, value))
+
+    lines = []
+    for family in sorted(families):
+        metric_type, help_text = METRIC_FAMILIES.get(family, ('untyped', ''))
+        if help_text:
+            lines.append(f'# HELP {family} {help_text}')
+        lines.append(f'# TYPE {family} {metric_type}')
+        for name, labels, value in sorted(families[family], key=_series_order):
+            series = f'{name}{{{labels}}}' if labels else name
+            lines.append(f'{series} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,485 @@
+import time
+import zlib
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from employee_project.metrics import get_metrics_settings, registry, request_timings
+from employee_project.slow_queries import SlowQueryRecorder, get_slow_query_settings
+from employee_project import profiling, tracing
+from employee_project.routers import (
+    begin_request, end_request, get_replica_routing_settings, get_replicas,
+)
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+COMPRESSION_DEFAULTS = {
+    'ENABLED': True,
+    'MIN_SIZE': 1024,
+    'ENCODINGS': ['zstd', 'gzip'],
+    'GZIP_LEVEL': 6,
+    'ZSTD_LEVEL': 3,
+}
+
+# Content types that are already compressed or must be flushed unbuffered
+SKIP_CONTENT_TYPES = (
+    'image/', 'video/', 'audio/', 'application/zip', 'application/gzip',
+    'application/zstd', 'text/event-stream',
+)
+
+
+def get_compression_settings():
+    """Return the RESPONSE_COMPRESSION setting merged over the defaults"""
+    return {**COMPRESSION_DEFAULTS, **getattr(settings, 'RESPONSE_COMPRESSION', {})}
+
+
+def available_encodings(config):
+    """Encodings the server is configured for and able to produce, in preference order"""
+    encodings = []
+    for encoding in config['ENCODINGS']:
+        if encoding == 'zstd' and zstandard is None:
+            continue
+        if encoding in ('zstd', 'gzip'):
+            encodings.append(encoding)
+    return encodings
+
+
+def parse_accept_encoding(header):
+    """Parse an Accept-Encoding header into a {coding: qvalue} dict"""
+    accepted = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        qvalue = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip() == 'q':
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        accepted[coding] = qvalue
+    return accepted
+
+
+def negotiate_encoding(header, encodings):
+    """Pick the best encoding acceptable to the client, honouring q-values"""
+    accepted = parse_accept_encoding(header)
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        qvalue = accepted.get(encoding, accepted.get('*', 0.0))
+        if qvalue > best_q:
+            best, best_q = encoding, qvalue
+    return best
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 produces a gzip container rather than a raw zlib stream
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk):
+        return self._compressor.compress(chunk) + self._compressor.flush(
+            zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        )
+
+    def finish(self):
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+def compressor_for(encoding, config):
+    """Return a streaming compressor for the given content coding"""
+    if encoding == 'zstd':
+        return _ZstdStream(config['ZSTD_LEVEL'])
+    return _GzipStream(config['GZIP_LEVEL'])
+
+
+def compress_bytes(data, encoding, config):
+    """Compress a complete body in one go"""
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=config['ZSTD_LEVEL']).compress(data)
+    compressor = zlib.compressobj(config['GZIP_LEVEL'], zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(iterator, compressor):
+    """Compress a streaming body chunk by chunk, flushing after every chunk"""
+    for chunk in iterator:
+        if chunk:
+            yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+async def acompress_stream(iterator, compressor):
+    async for chunk in iterator:
+        if chunk:
+            yield compressor.compress(chunk)
+    yield compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compress responses with zstd or gzip, negotiated against Accept-Encoding.
+    Configured through the RESPONSE_COMPRESSION setting; bodies below
+    MIN_SIZE are sent as-is and streaming responses are compressed per chunk.
+    """
+
+    def process_response(self, request, response):
+        config = get_compression_settings()
+        if not config['ENABLED'] or request.method == 'HEAD':
+            return response
+        if response.status_code in (204, 304) or response.has_header('Content-Encoding'):
+            return response
+        if response.get('Content-Type', '').startswith(SKIP_CONTENT_TYPES):
+            return response
+        if not response.streaming and len(response.content) < config['MIN_SIZE']:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        encoding = negotiate_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', ''), available_encodings(config)
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            compressor = compressor_for(encoding, config)
+            if response.is_async:
+                response.streaming_content = acompress_stream(response.streaming_content, compressor)
+            else:
+                response.streaming_content = compress_stream(response.streaming_content, compressor)
+            # The compressed size is unknown until the stream has been sent
+            del response.headers['Content-Length']
+        else:
+            compressed = compress_bytes(response.content, encoding, config)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # A strong ETag no longer describes the transformed bytes
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Allow replica reads for safe requests (see employee_project/routers.py)
+    and pin a client to the primary for a few seconds after it writes.
+    """
+    sync_capable = True
+    async_capable = True
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = self._begin(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request()
+        return self._finish(request, response, state)
+
+    async def __acall__(self, request):
+        state = self._begin(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request()
+        return self._finish(request, response, state)
+
+    def _begin(self, request):
+        config = get_replica_routing_settings()
+        try:
+            pinned = float(request.COOKIES.get(config['COOKIE_NAME'], 0)) > time.time()
+        except ValueError:
+            pinned = False
+        return begin_request(request.method in self.safe_methods and not pinned)
+
+    def _finish(self, request, response, state):
+        if not get_replicas():
+            return response
+        if state.wrote or request.method not in self.safe_methods:
+            config = get_replica_routing_settings()
+            response.set_cookie(
+                config['COOKIE_NAME'], str(time.time() + config['STICKY_SECONDS']),
+                max_age=config['STICKY_SECONDS'], httponly=True, samesite='Lax',
+            )
+        return response
+
+
+class _QueryTimer:
+    """connection.execute_wrapper that counts queries and their time"""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - start
+
+
+@contextmanager
+def _timing_queries(timer):
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(timer))
+        yield
+
+
+def _record_stream(labels, sent, timer):
+    registry.inc('http_response_bytes_total', labels, sent)
+    registry.inc('http_db_queries_total', labels, timer.count)
+    registry.inc('http_db_query_seconds_total', labels, timer.seconds)
+    registry.maybe_flush()
+
+
+_END = object()
+
+
+def _metered_stream(iterator, labels):
+    """Pass a streaming body through, counting its bytes and the queries run to produce it"""
+    timer, sent = _QueryTimer(), 0
+    iterator = iter(iterator)
+    try:
+        while True:
+            with _timing_queries(timer):
+                chunk = next(iterator, _END)
+            if chunk is _END:
+                break
+            sent += len(chunk)
+            yield chunk
+    finally:
+        _record_stream(labels, sent, timer)
+
+
+async def _ametered_stream(iterator, labels):
+    timer, sent = _QueryTimer(), 0
+    try:
+        while True:
+            with _timing_queries(timer):
+                try:
+                    chunk = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+            sent += len(chunk)
+            yield chunk
+    finally:
+        _record_stream(labels, sent, timer)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, DB query count and time, serialization and render time and
+    response size per URL name and method into employee_project.metrics
+    (served at /metrics). Streamed bodies and the queries run while streaming
+    them are counted when the stream ends.
+    Must be first in MIDDLEWARE so it sees the full request and the final bytes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not get_metrics_settings()['ENABLED']:
+            return self.get_response(request)
+
+        timer = _QueryTimer()
+        request._metrics_render_seconds = 0.0
+        start = time.perf_counter()
+        with request_timings() as timings, _timing_queries(timer):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name or match._func_path) if match else 'unresolved'
+        labels = (('view', view), ('method', request.method))
+        registry.inc('http_requests_total', labels + (('status', response.status_code),))
+        registry.observe('http_request_duration_seconds', labels, elapsed)
+        registry.inc('http_db_queries_total', labels, timer.count)
+        registry.inc('http_db_query_seconds_total', labels, timer.seconds)
+        registry.inc('http_serialize_seconds_total', labels, timings['serialize'])
+        registry.inc('http_render_seconds_total', labels, request._metrics_render_seconds)
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = _ametered_stream(aiter(response.streaming_content), labels)
+            else:
+                response.streaming_content = _metered_stream(response.streaming_content, labels)
+        else:
+            registry.inc('http_response_bytes_total', labels, len(response.content))
+        registry.maybe_flush()
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before DRF/template responses are rendered
+        start = time.perf_counter()
+
+        def finished(rendered):
+            request._metrics_render_seconds += time.perf_counter() - start
+
+        response.add_post_render_callback(finished)
+        return response
+
+
+class SlowQueryMiddleware:
+    """Capture queries slower than SLOW_QUERY_LOG['THRESHOLD_MS'] (opt-in)"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = get_slow_query_settings()
+        if not config['ENABLED']:
+            return self.get_response(request)
+        recorder = SlowQueryRecorder(request, config)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            return self.get_response(request)
+
+
+class TracingMiddleware:
+    """
+    Trace sampled requests (see employee_project/tracing.py): a server span for
+    the request, a span per SQL query and one for rendering the response.
+    Place it right after MetricsMiddleware so the span covers the whole stack.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not tracing.get_tracing_settings()['ENABLED']:
+            return self.get_response(request)
+        root = tracing.start_trace(
+            f'{request.method} {request.path}',
+            request.META.get('HTTP_TRACEPARENT'),
+            {'http.method': request.method, 'url.path': request.path},
+        )
+        if root is None:
+            return self.get_response(request)
+
+        with ExitStack() as stack:
+            stack.enter_context(tracing.activate(root))
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(tracing.db_span_wrapper))
+            try:
+                response = self.get_response(request)
+            except BaseException as e:
+                root.record_error(e)
+                root.end()
+                tracing.export(root.trace)
+                raise
+
+        match = getattr(request, 'resolver_match', None)
+        if match:
+            route = match.view_name or match._func_path
+            root.name = f'{request.method} {route}'
+            root.set_attribute('http.route', route)
+        root.set_attribute('http.status_code', response.status_code)
+        if response.status_code >= 500:
+            root.status = tracing.STATUS_ERROR
+        root.end()
+        tracing.export(root.trace)
+        response['traceparent'] = root.traceparent
+        return response
+
+    def process_template_response(self, request, response):
+        parent = tracing.current_span()
+        if parent is None:
+            return response
+        # Rendering happens after the view returns, outside any span context
+        render = parent.child('render', attributes={'renderer': type(getattr(
+            response, 'accepted_renderer', None)).__name__})
+        response.add_post_render_callback(lambda rendered: render.end())
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Staff-only `?profile=1` / `?profile=sample` request profiling (see
+    employee_project/profiling.py). Goes last in MIDDLEWARE so the session
+    user is known; the profile covers the view and response rendering.
+    """
+
+    def __init__(self, get_response):
+        if not profiling.get_profiling_settings()['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = profiling.requested_mode(request)
+        if mode is None or not profiling.is_staff_request(request):
+            return self.get_response(request)
+
+        config = profiling.get_profiling_settings()
+        breakdown = profiling.SQLBreakdown(config['MAX_SQL_LENGTH'])
+        profiler = profiling.PROFILERS[mode](config)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(breakdown))
+            start = time.perf_counter()
+            try:
+                profiler.start()
+            except profiling.ProfilerBusy as e:
+                return JsonResponse({'error': str(e)}, status=409)
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.stop()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        profile_id = profiling.new_profile_id(request)
+        report = profiling.store_report(config, profile_id, profiler, {
+            'id': profile_id,
+            'profiler': mode,
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.get_full_path(),
+            'status': response.status_code,
+            'duration_ms': round(elapsed_ms, 3),
+            'sql': breakdown.report(),
+            **profiler.summary(),
+        })
+        profiled = JsonResponse(report)
+        profiled['X-Profile-Id'] = profile_id
+        profiled['Cache-Control'] = 'no-store'
+        return profiled
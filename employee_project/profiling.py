@@ -0,0 +1,230 @@
+"""
+On-demand request profiling for staff users.
+
+With PROFILING['ENABLED'], a staff user can add `?profile=<mode>` (or an
+`X-Profile: <mode>` header) to any API or chart request:
+
+    ?profile=1 / cprofile   deterministic call tree (cProfile)
+    ?profile=sample         sampling profiler, flame-graph collapsed stacks
+
+The view runs normally under the profiler. The response is then replaced by a
+JSON report: status, timing, the top functions or collapsed stacks, and every
+SQL statement grouped with count, time and the project line that issued it.
+The raw profile is also stored under PROFILING['DIRECTORY'] as a .prof file
+(snakeviz, pstats) or a .collapsed file (flamegraph.pl, speedscope).
+
+cProfile can only run once per process. On Python 3.12+ it is built on
+sys.monitoring, which is process-wide: the profile also records calls made by
+other threads serving requests at the same time, and a second profiler cannot
+start while one is active. One cProfile request therefore runs at a time per
+process; a concurrent one gets 409 and can use `?profile=sample` instead, which
+samples only its own thread.
+
+When ENABLED is false the middleware removes itself from the stack at
+startup. Requests from non-staff users, or without the parameter, skip it
+after a substring check on the query string.
+
+    PROFILING = {
+        'ENABLED': False,
+        'DIRECTORY': 'var/profiles',
+        'SAMPLE_INTERVAL_MS': 1,
+        'TOP_FUNCTIONS': 40,
+    }
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from rest_framework.exceptions import AuthenticationFailed
+
+from employee_project.slow_queries import query_fingerprint, query_origin
+
+PROFILING_DEFAULTS = {
+    'ENABLED': False,
+    'DIRECTORY': None,
+    'SAMPLE_INTERVAL_MS': 1.0,
+    'TOP_FUNCTIONS': 40,
+    'MAX_SQL_LENGTH': 2000,
+}
+
+PARAM = 'profile'
+HEADER = 'HTTP_X_PROFILE'
+MODES = {'1': 'cprofile', 'true': 'cprofile', 'cprofile': 'cprofile', 'sample': 'sample'}
+
+# cProfile is process-wide (sys.monitoring on 3.12+): one at a time per process
+_cprofile_lock = threading.Lock()
+
+
+def get_profiling_settings():
+    config = {**PROFILING_DEFAULTS, **getattr(settings, 'PROFILING', {})}
+    if config['DIRECTORY'] is None:
+        config['DIRECTORY'] = str(Path(settings.BASE_DIR) / 'var' / 'profiles')
+    return config
+
+
+def requested_mode(request):
+    """The profiler mode asked for by the request, or None"""
+    value = request.META.get(HEADER)
+    if value is None:
+        if PARAM + '=' not in request.META.get('QUERY_STRING', ''):
+            return None
+        value = request.GET.get(PARAM)
+    return MODES.get((value or '').lower())
+
+
+def is_staff_request(request):
+    """Staff session, or a staff user behind the request's bearer token"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    from employees.authentication import CachedJWTAuthentication
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return bool(result and result[0].is_staff)
+
+
+class SQLBreakdown:
+    """connection.execute_wrapper grouping every query by its SQL text"""
+
+    def __init__(self, max_sql_length):
+        self.max_sql_length = max_sql_length
+        self.groups = defaultdict(lambda: {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            group = self.groups[query_fingerprint(sql)]
+            if not group['count']:
+                group['sql'] = sql[:self.max_sql_length]
+                group['alias'] = context['connection'].alias
+                group['origin'] = query_origin()
+            group['count'] += 1
+            group['total_ms'] += elapsed_ms
+            group['max_ms'] = max(group['max_ms'], elapsed_ms)
+
+    def report(self):
+        queries = sorted(self.groups.values(), key=lambda g: -g['total_ms'])
+        for group in queries:
+            group['total_ms'] = round(group['total_ms'], 3)
+            group['max_ms'] = round(group['max_ms'], 3)
+        return {
+            'count': sum(g['count'] for g in queries),
+            'total_ms': round(sum(g['total_ms'] for g in queries), 3),
+            'duplicates': sum(g['count'] - 1 for g in queries),
+            'queries': queries,
+        }
+
+
+class ProfilerBusy(Exception):
+    """Another profiler is already active in this process"""
+
+
+class CProfileProfiler:
+    extension = 'prof'
+
+    def __init__(self, config):
+        self.config = config
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        if not _cprofile_lock.acquire(blocking=False):
+            raise ProfilerBusy('Another cProfile request is running in this process; retry or use profile=sample')
+        try:
+            self.profile.enable()
+        except ValueError as e:
+            # "Another profiling tool is already active" (sys.monitoring on 3.12+)
+            _cprofile_lock.release()
+            raise ProfilerBusy(str(e)) from e
+
+    def stop(self):
+        try:
+            self.profile.disable()
+        finally:
+            _cprofile_lock.release()
+
+    def summary(self):
+        out = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=out)
+        stats.sort_stats('cumulative').print_stats(self.config['TOP_FUNCTIONS'])
+        return {'functions': out.getvalue()}
+
+    def save(self, path):
+        self.profile.dump_stats(path)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{os.path.basename(code.co_filename)}:{code.co_name}'
+
+
+class SamplingProfiler:
+    """Samples the request thread's stack from a helper thread (collapsed-stack output)"""
+    extension = 'collapsed'
+
+    def __init__(self, config):
+        self.interval = config['SAMPLE_INTERVAL_MS'] / 1000
+        self.stacks = Counter()
+        self._target = threading.get_ident()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+    def summary(self):
+        return {'samples': sum(self.stacks.values()), 'collapsed': self.collapsed()}
+
+    def save(self, path):
+        Path(path).write_text(self.collapsed(), encoding='utf-8')
+
+
+PROFILERS = {'cprofile': CProfileProfiler, 'sample': SamplingProfiler}
+
+
+def store_report(config, profile_id, profiler, report):
+    """Write the raw profile and the JSON report; return their paths"""
+    directory = Path(config['DIRECTORY'])
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_path = directory / f'{profile_id}.{profiler.extension}'
+    profiler.save(profile_path)
+    report_path = directory / f'{profile_id}.json'
+    report['files'] = {'profile': str(profile_path), 'report': str(report_path)}
+    report_path.write_text(json.dumps(report, indent=2, default=str), encoding='utf-8')
+    return report
+
+
+def new_profile_id(request):
+    match = getattr(request, 'resolver_match', None)
+    view = (match.view_name if match else '') or 'request'
+    return f"{time.strftime('%Y%m%dT%H%M%S')}-{view.replace(':', '-')}-{uuid.uuid4().hex[:8]}"
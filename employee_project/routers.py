@@ -0,0 +1,116 @@
+"""
+Read-replica routing.
+
+Reads go to a replica only while a request explicitly allows it: the
+ReplicaRoutingMiddleware enables replicas for safe (GET/HEAD/OPTIONS) requests
+unless the client is pinned to the primary. Everything else (writes,
+management commands, background threads, reads inside a transaction on the
+primary) uses the primary.
+
+Read-your-writes: once a request writes, its later reads go to the primary and
+the response pins the client to the primary for STICKY_SECONDS through a
+cookie, which covers the replication lag for the next few requests of that
+browser or session.
+"""
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_ROUTING_DEFAULTS = {
+    'STICKY_SECONDS': 5,
+    'COOKIE_NAME': 'db_pin',
+    # Cached payloads computed within this many seconds of a write are read
+    # from the primary, so a lagging replica is never cached for the full TTL
+    'LAG_SECONDS': 5,
+    'LAST_WRITE_CACHE_ALIAS': 'default',
+}
+
+LAST_WRITE_KEY = 'db:last-write'
+
+_routing = contextvars.ContextVar('replica_routing', default=None)
+_force_primary = contextvars.ContextVar('replica_force_primary', default=False)
+
+
+def get_replica_routing_settings():
+    return {**REPLICA_ROUTING_DEFAULTS, **getattr(settings, 'REPLICA_ROUTING', {})}
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+class RoutingState:
+    """Per-request routing decision, shared by every query in the request"""
+
+    def __init__(self, replicas_allowed):
+        self.replicas_allowed = replicas_allowed
+        self.wrote = False
+
+
+def begin_request(replicas_allowed):
+    state = RoutingState(replicas_allowed)
+    _routing.set(state)
+    return state
+
+
+def end_request():
+    _routing.set(None)
+
+
+@contextmanager
+def use_primary():
+    """Send every read in the block to the primary"""
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+def mark_write():
+    """Record that the primary has just committed a write (see LAG_SECONDS)"""
+    if not get_replicas():
+        return
+    config = get_replica_routing_settings()
+    caches[config['LAST_WRITE_CACHE_ALIAS']].set(LAST_WRITE_KEY, time.time(), timeout=config['LAG_SECONDS'])
+
+
+def recently_written():
+    if not get_replicas():
+        return False
+    config = get_replica_routing_settings()
+    last_write = caches[config['LAST_WRITE_CACHE_ALIAS']].get(LAST_WRITE_KEY)
+    return last_write is not None and time.time() - last_write < config['LAG_SECONDS']
+
+
+class ReplicaRouter:
+    """Route reads to DATABASE_REPLICAS when the current request allows it"""
+
+    def db_for_read(self, model, **hints):
+        state = _routing.get()
+        if state is None or not state.replicas_allowed or state.wrote or _force_primary.get():
+            return None
+        replicas = get_replicas()
+        if not replicas or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _routing.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in get_replicas():
+            return False
+        return None
@@ -0,0 +1,199 @@
+"""
+Precomputed OpenAPI schema.
+
+drf-yasg introspects every viewset and serializer to build the schema, which
+takes hundreds of milliseconds. The schema only changes when the code does, so
+it is generated once per code version, written to OPENAPI_SCHEMA_CACHE['DIRECTORY']
+(by `manage.py generate_openapi_schema` at deploy time, or by the first request)
+and then served from memory with an ETag.
+
+The code version is CODE_VERSION when set (e.g. the git commit of the build),
+otherwise a hash of the project's Python sources and the installed Django,
+DRF and drf-yasg versions.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import django
+import drf_yasg
+import rest_framework
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.renderers import SwaggerYAMLRenderer, _SpecRenderer
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+OPENAPI_SCHEMA_CACHE_DEFAULTS = {
+    'DIRECTORY': None,
+    'CODE_VERSION': None,
+}
+
+# Directories never part of the code version. Virtualenvs (setup.sh creates
+# venv/ in the project root) are also skipped under any name, by their pyvenv.cfg.
+SKIP_DIRS = {
+    'var', 'staticfiles', 'tests', 'migrations', '__pycache__', 'node_modules',
+    'venv', 'env', 'site-packages',
+}
+
+API_INFO = openapi.Info(
+    title="Employee Management System API",
+    default_version='v1',
+    description="A comprehensive API for managing employees, departments, attendance, and performance",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@example.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=[permissions.AllowAny],
+)
+
+_lock = threading.Lock()
+_code_version = None
+_schema = None
+
+
+def get_schema_cache_settings():
+    config = {**OPENAPI_SCHEMA_CACHE_DEFAULTS, **getattr(settings, 'OPENAPI_SCHEMA_CACHE', {})}
+    if config['DIRECTORY'] is None:
+        config['DIRECTORY'] = os.path.join(settings.BASE_DIR, 'var', 'openapi')
+    return config
+
+
+def compute_code_version(base_dir=None):
+    """Hash of every project .py file plus the versions of the schema toolchain"""
+    base_dir = Path(base_dir or settings.BASE_DIR)
+    digest = hashlib.sha256()
+    for package in (django, rest_framework, drf_yasg):
+        digest.update(f'{package.__name__}={package.__version__};'.encode())
+    for root, dirs, files in os.walk(base_dir):
+        dirs[:] = sorted(
+            d for d in dirs
+            if d not in SKIP_DIRS and not d.startswith('.') and not Path(root, d, 'pyvenv.cfg').exists()
+        )
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = Path(root, name)
+                digest.update(str(path.relative_to(base_dir)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def get_code_version():
+    global _code_version
+    if _code_version is None:
+        _code_version = get_schema_cache_settings()['CODE_VERSION'] or compute_code_version()
+    return _code_version
+
+
+class CachedSchema:
+    """Encoded schema documents for one code version"""
+
+    def __init__(self, version, documents):
+        self.version = version
+        self.documents = documents  # {'json': bytes, 'yaml': bytes}
+        self.etags = {
+            kind: '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+            for kind, body in documents.items()
+        }
+
+
+def generate_documents():
+    """Introspect the API once and encode the schema as JSON and YAML"""
+    generator = schema_view.generator_class(API_INFO)
+    swagger = generator.get_schema(request=None, public=True)
+    return {
+        'json': OpenAPICodecJson(validators=[]).encode(swagger),
+        'yaml': OpenAPICodecYaml(validators=[]).encode(swagger),
+    }
+
+
+def schema_paths(version):
+    directory = get_schema_cache_settings()['DIRECTORY']
+    return {kind: os.path.join(directory, f'openapi-{version}.{kind}') for kind in ('json', 'yaml')}
+
+
+def write_schema(version, documents):
+    """Atomically store the documents so concurrent workers never read a partial file"""
+    for kind, path in schema_paths(version).items():
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(documents[kind])
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+
+def remove_stale_schemas(version):
+    """Delete documents stored for other code versions"""
+    directory = get_schema_cache_settings()['DIRECTORY']
+    current = {os.path.basename(path) for path in schema_paths(version).values()}
+    for path in Path(directory).glob('openapi-*'):
+        if path.name not in current and not path.name.endswith('.tmp'):
+            path.unlink(missing_ok=True)
+
+
+def read_schema(version):
+    documents = {}
+    for kind, path in schema_paths(version).items():
+        try:
+            with open(path, 'rb') as f:
+                documents[kind] = f.read()
+        except FileNotFoundError:
+            return None
+    return documents
+
+
+def get_schema(regenerate=False):
+    """Return the CachedSchema for the running code, from memory, file or a fresh build"""
+    global _schema
+    version = get_code_version()
+    schema = _schema
+    if schema is not None and schema.version == version and not regenerate:
+        return schema
+    with _lock:
+        if _schema is not None and _schema.version == version and not regenerate:
+            return _schema
+        documents = None if regenerate else read_schema(version)
+        if documents is None:
+            documents = generate_documents()
+            write_schema(version, documents)
+            remove_stale_schemas(version)
+        _schema = CachedSchema(version, documents)
+        return _schema
+
+
+class CachedSchemaView(schema_view):
+    """
+    Serves the precomputed schema for spec formats (JSON, YAML, ?format=openapi).
+    The Swagger UI and ReDoc pages themselves need no introspection and are
+    rendered as before.
+    """
+
+    def get(self, request, version='', format=None):
+        renderer = request.accepted_renderer
+        if not isinstance(renderer, _SpecRenderer):
+            return super().get(request, version, format)
+
+        schema = get_schema()
+        kind = 'yaml' if isinstance(renderer, SwaggerYAMLRenderer) else 'json'
+        etag = schema.etags[kind]
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            content_type = f'{renderer.media_type}; charset=utf-8'
+            response = HttpResponse(schema.documents[kind], content_type=content_type)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'no-cache'
+        return response
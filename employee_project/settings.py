@@ -14,6 +14,10 @@ from pathlib import Path
 import environ
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
+from employee_project.db import POOL_MODES, pool_max_size, psycopg_pool_options
+
 # Initialize django-environ
 env = environ.Env()
 
@@ -49,16 +53,25 @@ INSTALLED_APPS = [
     'drf_yasg',
     'employees',
     'attendance',
+    'jobs',
+    'changefeed',
+    'outbox',
 ]
 
 MIDDLEWARE = [
+    'employee_project.middleware.MetricsMiddleware',
+    'employee_project.middleware.TracingMiddleware',
+    'employee_project.middleware.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'employee_project.middleware.CompressionMiddleware',
+    'employee_project.middleware.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'employee_project.middleware.ProfilingMiddleware',
 ]
 
 ROOT_URLCONF = 'employee_project.urls'
@@ -95,6 +108,103 @@ DATABASES = {
     }
 }
 
+# Connection reuse (see employee_project/db.py). DB_POOL is 'none',
+# 'persistent' (CONN_MAX_AGE + health checks) or 'psycopg' (psycopg 3 pool).
+# DB_POOL_TOTAL_CONNECTIONS is the budget for all WEB_CONCURRENCY workers.
+DB_POOL = env('DB_POOL', default='persistent')
+if DB_POOL not in POOL_MODES:
+    raise ImproperlyConfigured(f'DB_POOL must be one of {", ".join(POOL_MODES)}')
+WEB_CONCURRENCY = env.int('WEB_CONCURRENCY', default=3)
+WEB_THREADS = env.int('WEB_THREADS', default=1)
+
+if DB_POOL == 'persistent':
+    DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_POOL == 'psycopg':
+    DATABASES['default']['OPTIONS'] = {
+        'pool': psycopg_pool_options(
+            min_size=env.int('DB_POOL_MIN_SIZE', default=2),
+            max_size=pool_max_size(
+                env.int('DB_POOL_TOTAL_CONNECTIONS', default=30), WEB_CONCURRENCY, WEB_THREADS,
+            ),
+            timeout=env.float('DB_POOL_TIMEOUT', default=10.0),
+        ),
+    }
+
+# Read replicas (see employee_project/routers.py): DB_REPLICA_HOSTS is a
+# comma-separated list of host[:port] serving copies of the primary.
+DATABASE_REPLICAS = []
+for number, replica in enumerate(env.list('DB_REPLICA_HOSTS', default=[]), start=1):
+    host, _, port = replica.partition(':')
+    alias = f'replica{number}'
+    DATABASES[alias] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['employee_project.routers.ReplicaRouter']
+
+# Clients that wrote are pinned to the primary for STICKY_SECONDS
+REPLICA_ROUTING = {
+    'STICKY_SECONDS': env.int('DB_REPLICA_STICKY_SECONDS', default=5),
+    'LAG_SECONDS': env.int('DB_REPLICA_LAG_SECONDS', default=5),
+}
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# By default every worker on the host shares one SQLite WAL cache file;
+# set CACHE_URL (e.g. redis://...) to use an external cache instead.
+if env('CACHE_URL', default=None):
+    CACHES = {'default': env.cache('CACHE_URL')}
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'employee_project.cache.SQLiteCache',
+            'LOCATION': env('SHARED_CACHE_PATH', default=os.path.join(BASE_DIR, 'var', 'cache.sqlite3')),
+            'TIMEOUT': 300,
+            'OPTIONS': {
+                'MAX_ENTRIES': env.int('SHARED_CACHE_MAX_ENTRIES', default=10000),
+                'MAX_SIZE': env.int('SHARED_CACHE_MAX_SIZE', default=64 * 1024 * 1024),
+            },
+        }
+    }
+
+# Process-local cache for login/registration throttle counters: rejecting a
+# burst must not cost a round trip to the shared cache.
+CACHES['throttle'] = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'auth-throttle',
+    'OPTIONS': {'MAX_ENTRIES': 50000},
+}
+
+# Login/registration throttles (see employees/throttling.py)
+AUTH_THROTTLE = {
+    'CACHE_ALIAS': 'throttle',
+    'RATES': {
+        'login_ip': env('LOGIN_THROTTLE_IP_RATE', default='20/min'),
+        'login_username': env('LOGIN_THROTTLE_USERNAME_RATE', default='10/min'),
+        'register_ip': env('REGISTER_THROTTLE_IP_RATE', default='5/min'),
+    },
+    # Shared by every worker using the default cache (see employees/throttling.py)
+    'MAX_CONCURRENT_HASHING': env.int('AUTH_MAX_CONCURRENT_HASHING', default=4),
+}
+
+# Chart and statistics payload cache (see employees/caching.py).
+# TIMEOUT is the TTL fallback; TIMEOUTS overrides it per payload name.
+STATS_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': env.int('STATS_CACHE_TIMEOUT', default=300),
+    'TIMEOUTS': {
+        'attendance-statistics': env.int('STATS_CACHE_ATTENDANCE_TIMEOUT', default=120),
+    },
+    'LOCK_TIMEOUT': 30,
+    'WAIT_TIMEOUT': 10,
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -149,12 +259,15 @@ REST_FRAMEWORK = {
         'rest_framework.filters.OrderingFilter',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'employees.authentication.CachedJWTAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Reverse proxies in front of the app whose X-Forwarded-For entries are
+    # trusted for client addresses (throttling); 0 uses REMOTE_ADDR only
+    'NUM_PROXIES': env.int('NUM_PROXIES', default=0),
 }
 
 # JWT Configuration
@@ -185,6 +298,28 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_EXP_CLAIM': 'refresh_exp',
     'SLIDING_TOKEN_LIFETIME': timedelta(hours=1),
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
+
+    'TOKEN_REFRESH_SERIALIZER': 'employees.auth.RevocationCheckingTokenRefreshSerializer',
+}
+
+# Token revocation list (employees/revocation.py): workers check the shared
+# cache for new revocations every CHECK_INTERVAL seconds.
+JWT_REVOCATION = {
+    'ALIAS': 'default',
+    'CHECK_INTERVAL': env.float('JWT_REVOCATION_CHECK_INTERVAL', default=1.0),
+    'RELOAD_INTERVAL': 3600.0,
+    # Re-read revocations this far behind the newest seen (late commits, clock skew)
+    'RESCAN_MARGIN': 60.0,
+    'CAPACITY': 10000,
+    'ERROR_RATE': 0.001,
+}
+
+# Cached user resolution for JWT requests (employees/authentication.py).
+# STATELESS trusts the token claims and never loads the user from the database.
+JWT_AUTH_CACHE = {
+    'ALIAS': 'default',
+    'TIMEOUT': env.int('JWT_AUTH_CACHE_TIMEOUT', default=300),
+    'STATELESS': env.bool('JWT_AUTH_STATELESS', default=False),
 }
 
 # Swagger Documentation Settings
@@ -211,3 +346,84 @@ SWAGGER_SETTINGS = {
 }
 
 SWAGGER_USE_COMPAT_RENDERERS = False
+
+# Per-endpoint request metrics, aggregated across workers in a SQLite file and
+# exposed at /metrics (see employee_project/metrics.py)
+METRICS = {
+    'ENABLED': env.bool('METRICS_ENABLED', default=True),
+    'PATH': env('METRICS_DB_PATH', default=os.path.join(BASE_DIR, 'var', 'metrics.sqlite3')),
+    'FLUSH_INTERVAL': env.float('METRICS_FLUSH_INTERVAL', default=5.0),
+    'TOKEN': env('METRICS_TOKEN', default=None),
+}
+
+# Slow-query capture with EXPLAIN plans (see employee_project/slow_queries.py)
+SLOW_QUERY_LOG = {
+    'ENABLED': env.bool('SLOW_QUERY_LOG_ENABLED', default=False),
+    'THRESHOLD_MS': env.int('SLOW_QUERY_THRESHOLD_MS', default=200),
+    'PATH': env('SLOW_QUERY_LOG_PATH', default=os.path.join(BASE_DIR, 'var', 'slow_queries.jsonl')),
+    'EXPLAIN': env.bool('SLOW_QUERY_EXPLAIN', default=True),
+    'ANALYZE': env.bool('SLOW_QUERY_EXPLAIN_ANALYZE', default=True),
+}
+
+# Request tracing exported as OTLP/JSON lines (see employee_project/tracing.py)
+TRACING = {
+    'ENABLED': env.bool('TRACING_ENABLED', default=False),
+    'SAMPLE_RATE': env.float('TRACING_SAMPLE_RATE', default=0.1),
+    'EXPORTER': env('TRACING_EXPORTER', default='file'),
+    'PATH': env('TRACING_PATH', default=os.path.join(BASE_DIR, 'var', 'traces.jsonl')),
+    'SERVICE_NAME': env('OTEL_SERVICE_NAME', default='employee-project'),
+}
+
+# Staff-only ?profile=1 request profiling (see employee_project/profiling.py)
+PROFILING = {
+    'ENABLED': env.bool('PROFILING_ENABLED', default=False),
+    'DIRECTORY': env('PROFILING_DIR', default=os.path.join(BASE_DIR, 'var', 'profiles')),
+}
+
+# Background jobs run by `manage.py runworker` (see jobs/queue.py)
+JOBS = {
+    'RESULT_DIR': env('JOBS_RESULT_DIR', default=os.path.join(BASE_DIR, 'var', 'jobs')),
+    'POLL_INTERVAL': env.float('JOBS_POLL_INTERVAL', default=1.0),
+    'STALE_AFTER': env.int('JOBS_STALE_AFTER', default=120),
+    'RESULT_TTL_DAYS': env.int('JOBS_RESULT_TTL_DAYS', default=7),
+}
+
+# Change feed for downstream sync (see changefeed/feed.py)
+CHANGEFEED = {
+    # Only used on databases other than PostgreSQL and SQLite
+    'SETTLE_SECONDS': env.float('CHANGEFEED_SETTLE_SECONDS', default=2),
+    'RETENTION_DAYS': env.int('CHANGEFEED_RETENTION_DAYS', default=30),
+}
+
+# Webhook delivery of employee/attendance/performance changes by
+# `manage.py dispatch_outbox` (see outbox/dispatcher.py)
+OUTBOX = {
+    'ENDPOINTS': [
+        {'url': url, 'secret': env('OUTBOX_WEBHOOK_SECRET', default='')}
+        for url in env.list('OUTBOX_WEBHOOK_URLS', default=[])
+    ],
+    'BATCH_SIZE': env.int('OUTBOX_BATCH_SIZE', default=100),
+    'MAX_ATTEMPTS': env.int('OUTBOX_MAX_ATTEMPTS', default=10),
+    'RETENTION_DAYS': env.int('OUTBOX_RETENTION_DAYS', default=7),
+}
+
+# Compressed table snapshots of seeded datasets (see employees/snapshots.py)
+SNAPSHOTS = {
+    'DIRECTORY': env('SNAPSHOT_DIR', default=os.path.join(BASE_DIR, 'var', 'snapshots')),
+}
+
+# Precomputed OpenAPI schema (see employee_project/schema.py). CODE_VERSION
+# (e.g. the git commit baked into the image) skips hashing the sources.
+OPENAPI_SCHEMA_CACHE = {
+    'DIRECTORY': env('OPENAPI_SCHEMA_DIR', default=os.path.join(BASE_DIR, 'var', 'openapi')),
+    'CODE_VERSION': env('CODE_VERSION', default=None),
+}
+
+# Response compression (zstd is used only when the `zstandard` package is installed)
+RESPONSE_COMPRESSION = {
+    'ENABLED': env.bool('RESPONSE_COMPRESSION_ENABLED', default=True),
+    'MIN_SIZE': env.int('RESPONSE_COMPRESSION_MIN_SIZE', default=1024),
+    'ENCODINGS': env.list('RESPONSE_COMPRESSION_ENCODINGS', default=['zstd', 'gzip']),
+    'GZIP_LEVEL': env.int('RESPONSE_COMPRESSION_GZIP_LEVEL', default=6),
+    'ZSTD_LEVEL': env.int('RESPONSE_COMPRESSION_ZSTD_LEVEL', default=3),
+}
@@ -0,0 +1,230 @@
+"""
+Slow-query capture (opt-in).
+
+SlowQueryMiddleware wraps every database connection while a request is served.
+A query slower than THRESHOLD_MS is queued with its SQL, parameters, view and
+the line of project code that issued it. A background thread then runs
+EXPLAIN on it and appends one JSON line to a rotating log file, so the plan
+never delays the request. `manage.py slow_queries_report` summarizes the file.
+
+    SLOW_QUERY_LOG = {
+        'ENABLED': False,
+        'THRESHOLD_MS': 200,
+        'PATH': 'var/slow_queries.jsonl',
+        'MAX_BYTES': 10 * 1024 * 1024,
+        'BACKUP_COUNT': 5,
+        'EXPLAIN': True,
+        # PostgreSQL only: EXPLAIN (ANALYZE, BUFFERS) runs SELECTs a second time,
+        # inside a rolled-back transaction with a statement timeout
+        'ANALYZE': True,
+        'EXPLAIN_TIMEOUT_MS': 5000,
+    }
+"""
+import hashlib
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections, transaction
+
+SLOW_QUERY_LOG_DEFAULTS = {
+    'ENABLED': False,
+    'THRESHOLD_MS': 200,
+    'PATH': None,
+    'MAX_BYTES': 10 * 1024 * 1024,
+    'BACKUP_COUNT': 5,
+    'EXPLAIN': True,
+    'ANALYZE': True,
+    'EXPLAIN_TIMEOUT_MS': 5000,
+    'QUEUE_SIZE': 100,
+    'MAX_PARAM_LENGTH': 200,
+}
+
+# Frames from these paths are skipped when looking for the query's origin
+# (the other execute wrappers, which sit on every stack, live in these modules)
+_LIBRARY_MARKERS = (
+    'site-packages', 'dist-packages', '/django/', '/rest_framework/',
+    __file__, 'employee_project/middleware.py', 'employee_project/tracing.py',
+    'employee_project/profiling.py',
+)
+
+
+def get_slow_query_settings():
+    config = {**SLOW_QUERY_LOG_DEFAULTS, **getattr(settings, 'SLOW_QUERY_LOG', {})}
+    if config['PATH'] is None:
+        config['PATH'] = str(Path(settings.BASE_DIR) / 'var' / 'slow_queries.jsonl')
+    return config
+
+
+def query_fingerprint(sql):
+    """Django SQL keeps parameters out of the text, so the text itself identifies the query"""
+    return hashlib.md5(' '.join(sql.split()).encode()).hexdigest()[:12]
+
+
+def query_origin():
+    """The innermost stack frame in project code, as 'path:line in function'"""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(base_dir) and not any(m in frame.filename for m in _LIBRARY_MARKERS):
+            return f'{Path(frame.filename).relative_to(base_dir)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+def _format_params(params, max_length):
+    if params is None:
+        return None
+    text = repr(params)
+    return text if len(text) <= max_length else text[:max_length] + '...'
+
+
+def explain(alias, sql, params, config):
+    """Return the query plan as text, or None when it cannot be obtained"""
+    connection = connections[alias]
+    is_select = sql.lstrip().upper().startswith(('SELECT', 'WITH'))
+    if connection.vendor == 'postgresql':
+        if config['ANALYZE'] and is_select:
+            prefix = 'EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) '
+        else:
+            prefix = 'EXPLAIN '
+        with transaction.atomic(using=alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(config['EXPLAIN_TIMEOUT_MS'])}")
+                cursor.execute(prefix + sql, params)
+                rows = cursor.fetchall()
+            # Never keep side effects of an analyzed statement
+            transaction.set_rollback(True, using=alias)
+        return '\n'.join(row[0] for row in rows)
+    if connection.vendor == 'sqlite' and is_select:
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            return '\n'.join(str(row[-1]) for row in cursor.fetchall())
+    if connection.vendor == 'mysql' and is_select:
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN ' + sql, params)
+            return '\n'.join(' | '.join(str(col) for col in row) for row in cursor.fetchall())
+    return None
+
+
+class SlowQueryLog:
+    """Queue of slow queries drained by one background thread per process"""
+
+    def __init__(self):
+        self._queue = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._logger = None
+        self._logger_path = None
+        self.dropped = 0
+
+    def submit(self, sample):
+        config = get_slow_query_settings()
+        self._ensure_worker(config)
+        try:
+            self._queue.put_nowait(sample)
+        except queue.Full:
+            self.dropped += 1
+
+    def drain(self, timeout=10.0):
+        """Wait until every queued sample has been written (tests, shutdown)"""
+        if self._queue is None:
+            return True
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return not self._queue.unfinished_tasks
+
+    def _ensure_worker(self, config):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._queue = queue.Queue(maxsize=config['QUEUE_SIZE'])
+                self._thread = threading.Thread(target=self._run, name='slow-query-log', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            sample = self._queue.get()
+            try:
+                self._write(sample)
+            except Exception:
+                logging.getLogger(__name__).exception('Could not record slow query')
+            finally:
+                self._queue.task_done()
+
+    def _write(self, sample):
+        config = get_slow_query_settings()
+        if config['EXPLAIN'] and not sample['many']:
+            try:
+                sample['plan'] = explain(sample['alias'], sample['sql'], sample.pop('_params'), config)
+            except Exception as e:
+                sample['plan'] = None
+                sample['plan_error'] = str(e)
+            finally:
+                connections[sample['alias']].close_if_unusable_or_obsolete()
+        sample.pop('_params', None)
+        self._get_logger(config).info(json.dumps(sample, default=str))
+
+    def _get_logger(self, config):
+        if self._logger is None or self._logger_path != config['PATH']:
+            Path(config['PATH']).parent.mkdir(parents=True, exist_ok=True)
+            logger = logging.getLogger('employee_project.slow_queries.file')
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+                handler.close()
+            handler = logging.handlers.RotatingFileHandler(
+                config['PATH'], maxBytes=config['MAX_BYTES'], backupCount=config['BACKUP_COUNT'],
+                encoding='utf-8',
+            )
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            self._logger, self._logger_path = logger, config['PATH']
+        return self._logger
+
+
+slow_query_log = SlowQueryLog()
+
+
+class SlowQueryRecorder:
+    """connection.execute_wrapper that submits queries above the threshold"""
+
+    def __init__(self, request, config):
+        self.request = request
+        self.threshold = config['THRESHOLD_MS'] / 1000
+        self.max_param_length = config['MAX_PARAM_LENGTH']
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            if elapsed >= self.threshold:
+                self._record(sql, params, many, context, elapsed)
+
+    def _record(self, sql, params, many, context, elapsed):
+        match = getattr(self.request, 'resolver_match', None)
+        slow_query_log.submit({
+            'time': datetime.now(timezone.utc).isoformat(),
+            'duration_ms': round(elapsed * 1000, 2),
+            'fingerprint': query_fingerprint(sql),
+            'sql': sql,
+            'params': _format_params(params, self.max_param_length),
+            'many': many,
+            'alias': context['connection'].alias,
+            'view': match.view_name if match else None,
+            'method': self.request.method,
+            'path': self.request.path,
+            'origin': query_origin(),
+            # Raw parameters are only kept for EXPLAIN; executemany has no single plan
+            '_params': None if many else params,
+        })
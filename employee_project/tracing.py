@@ -0,0 +1,296 @@
+"""
+Lightweight request tracing.
+
+TracingMiddleware starts a trace for a sampled request, TracingMixin adds spans
+for the DRF phases (authentication, permissions, throttles, filter backends,
+serialization) and every SQL query gets its own span. Finished traces are
+written as OTLP/JSON (one ExportTraceServiceRequest per line) to a file or to
+stdout, which an OpenTelemetry collector can ingest with its file receiver.
+
+W3C `traceparent` headers are honoured: a request whose caller sampled it is
+always traced under the caller's trace id, and every response carries the
+traceparent of its server span. When tracing is disabled, or a request is not
+sampled, `span()` is a context-variable lookup and nothing else.
+
+    TRACING = {
+        'ENABLED': False,
+        'SAMPLE_RATE': 0.1,
+        'EXPORTER': 'file',   # or 'stdout'
+        'PATH': 'var/traces.jsonl',
+        'SERVICE_NAME': 'employee-project',
+    }
+"""
+import contextvars
+import json
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+from employee_project.metrics import collecting_timings, timed
+
+TRACING_DEFAULTS = {
+    'ENABLED': False,
+    'SAMPLE_RATE': 0.1,
+    'EXPORTER': 'file',
+    'PATH': None,
+    'SERVICE_NAME': 'employee-project',
+    'MAX_STATEMENT_LENGTH': 1000,
+}
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+TRACEPARENT_RE = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+
+_current_span = contextvars.ContextVar('tracing_current_span', default=None)
+_export_lock = threading.Lock()
+
+
+def get_tracing_settings():
+    config = {**TRACING_DEFAULTS, **getattr(settings, 'TRACING', {})}
+    if config['PATH'] is None:
+        config['PATH'] = str(Path(settings.BASE_DIR) / 'var' / 'traces.jsonl')
+    return config
+
+
+def _new_id(bits):
+    return f'{random.getrandbits(bits):0{bits // 4}x}'
+
+
+def parse_traceparent(header):
+    """Return (trace_id, parent_span_id, sampled) from a traceparent header, or None"""
+    match = TRACEPARENT_RE.match((header or '').strip().lower())
+    if not match:
+        return None
+    trace_id, span_id, flags = match.groups()
+    if trace_id == '0' * 32 or span_id == '0' * 16:
+        return None
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def format_traceparent(trace_id, span_id, sampled):
+    return f"00-{trace_id}-{span_id}-{'01' if sampled else '00'}"
+
+
+class Trace:
+    """Spans of one sampled request, exported together when the root span ends"""
+
+    def __init__(self, trace_id):
+        self.trace_id = trace_id
+        self.spans = []
+
+
+class Span:
+    def __init__(self, trace, name, parent_id=None, kind=KIND_INTERNAL, attributes=None):
+        self.trace = trace
+        self.name = name
+        self.span_id = _new_id(64)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.status = STATUS_UNSET
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_error(self, exc):
+        self.status = STATUS_ERROR
+        self.attributes['exception.type'] = type(exc).__name__
+        self.attributes['exception.message'] = str(exc)
+
+    def end(self):
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.spans.append(self)
+
+    def child(self, name, kind=KIND_INTERNAL, attributes=None):
+        return Span(self.trace, name, self.span_id, kind, attributes)
+
+    @property
+    def traceparent(self):
+        return format_traceparent(self.trace.trace_id, self.span_id, True)
+
+
+def current_span():
+    return _current_span.get()
+
+
+@contextmanager
+def span(name, kind=KIND_INTERNAL, **attributes):
+    """Time the block as a child of the current span; a no-op outside a sampled trace"""
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, kind, attributes)
+    token = _current_span.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        child.end()
+
+
+def start_trace(name, traceparent=None, attributes=None):
+    """
+    Begin the server span for a request, or return None when it is not sampled.
+    A sampled caller (traceparent flag 01) is always followed; otherwise
+    SAMPLE_RATE decides.
+    """
+    config = get_tracing_settings()
+    parent = parse_traceparent(traceparent)
+    if parent is not None:
+        trace_id, parent_id, sampled = parent
+        if not sampled:
+            return None
+    else:
+        if random.random() >= config['SAMPLE_RATE']:
+            return None
+        trace_id, parent_id = _new_id(128), None
+    return Span(Trace(trace_id), name, parent_id, KIND_SERVER, attributes)
+
+
+@contextmanager
+def activate(root):
+    token = _current_span.set(root)
+    try:
+        yield root
+    finally:
+        _current_span.reset(token)
+
+
+def db_span_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper giving each query a client span"""
+    parent = _current_span.get()
+    if parent is None:
+        return execute(sql, params, many, context)
+    connection = context['connection']
+    statement = sql[:get_tracing_settings()['MAX_STATEMENT_LENGTH']]
+    with span('db.query', KIND_CLIENT, **{
+        'db.system': connection.vendor,
+        'db.name': connection.alias,
+        'db.operation': sql.lstrip().split(' ', 1)[0].upper(),
+        'db.statement': statement,
+    }):
+        return execute(sql, params, many, context)
+
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp_attributes(attributes):
+    return [{'key': key, 'value': _otlp_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(trace, service_name):
+    """OTLP/JSON ExportTraceServiceRequest for one trace"""
+    spans = []
+    for item in sorted(trace.spans, key=lambda s: s.start_ns):
+        otlp_span = {
+            'traceId': trace.trace_id,
+            'spanId': item.span_id,
+            'name': item.name,
+            'kind': item.kind,
+            'startTimeUnixNano': str(item.start_ns),
+            'endTimeUnixNano': str(item.end_ns),
+            'attributes': _otlp_attributes(item.attributes),
+            'status': {'code': item.status},
+        }
+        if item.parent_id:
+            otlp_span['parentSpanId'] = item.parent_id
+        spans.append(otlp_span)
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _otlp_attributes({'service.name': service_name})},
+            'scopeSpans': [{'scope': {'name': __name__}, 'spans': spans}],
+        }]
+    }
+
+
+def export(trace):
+    config = get_tracing_settings()
+    line = json.dumps(to_otlp(trace, config['SERVICE_NAME']), separators=(',', ':')) + '\n'
+    with _export_lock:
+        if config['EXPORTER'] == 'stdout':
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            return
+        path = Path(config['PATH'])
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One write() per trace keeps lines whole when several workers append
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+
+class TracingMixin:
+    """APIView mixin adding spans for the DRF request phases"""
+
+    def perform_authentication(self, request):
+        with span('drf.authenticate'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with span('drf.permissions'):
+            super().check_permissions(request)
+
+    def check_throttles(self, request):
+        with span('drf.throttles'):
+            super().check_throttles(request)
+
+    def filter_queryset(self, queryset):
+        with span('drf.filter'):
+            return super().filter_queryset(queryset)
+
+    def paginate_queryset(self, queryset):
+        with span('drf.paginate'):
+            return super().paginate_queryset(queryset)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        # Schema generation inspects the serializer class itself
+        if getattr(self, 'swagger_fake_view', False):
+            return serializer
+        if _current_span.get() is not None or collecting_timings():
+            serializer.__class__ = _traced_serializer_class(serializer.__class__)
+        return serializer
+
+
+_traced_classes = {}
+
+
+def _traced_serializer_class(cls):
+    """Subclass of a serializer class whose .data is timed as a span and for request metrics"""
+    if getattr(cls, '_traced', False):
+        return cls
+    traced = _traced_classes.get(cls)
+    if traced is None:
+        def data(self):
+            with timed('serialize'), span('drf.serialize', serializer=cls.__name__):
+                return super(traced, self).data
+
+        traced = type(cls.__name__, (cls,), {'data': property(data), '_traced': True, '__module__': cls.__module__})
+        _traced_classes[cls] = traced
+    return traced
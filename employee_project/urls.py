@@ -11,51 +11,67 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import time
+
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
-from rest_framework import permissions
-from django.http import JsonResponse
+from rest_framework_simplejwt.views import TokenRefreshView
+from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+from employee_project.db import pool_stats
+from employee_project.metrics import get_metrics_settings, registry, render_prometheus
+from employee_project.schema import CachedSchemaView
 
 # Import charts views directly
 from employees.charts_views import charts_dashboard
-
-# Swagger Schema View
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Employee Management System API",
-        default_version='v1',
-        description="A comprehensive API for managing employees, departments, attendance, and performance",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@example.com"),
-        license=openapi.License(name="MIT License"),
-    ),
-    public=True,
-    permission_classes=[permissions.AllowAny],
-)
+from employees.auth import ThrottledTokenObtainPairView
 
 def health_view(request):
     return JsonResponse({'status': 'ok'})
 
+def db_health_view(request):
+    """Database liveness plus connection reuse statistics for this worker"""
+    start = time.perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Exception as e:
+        return JsonResponse({'status': 'error', 'error': str(e), 'stats': pool_stats()}, status=503)
+    return JsonResponse({
+        'status': 'ok',
+        'query_ms': round((time.perf_counter() - start) * 1000, 2),
+        'stats': pool_stats(),
+    })
+
+def metrics_view(request):
+    """Prometheus text exposition of the request metrics of every worker"""
+    token = get_metrics_settings()['TOKEN']
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(
+        render_prometheus(registry.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('employees.urls')),
     path('api/', include('attendance.urls')),
+    path('api/', include('jobs.urls')),
+    path('api/', include('changefeed.urls')),
     path('api-auth/', include('rest_framework.urls')),
     
     # JWT Token endpoints
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/token/', ThrottledTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     
     # Swagger Documentation
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    # The spec is precomputed per code version and served with an ETag
+    path('swagger/', CachedSchemaView.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    path('redoc/', CachedSchemaView.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+    path('swagger.json', CachedSchemaView.without_ui(cache_timeout=0), {'format': 'json'}, name='schema-json'),
     
     # Charts Dashboard - Direct view import (no DRF authentication)
     path('charts/', charts_dashboard, name='charts_dashboard'),
@@ -63,4 +79,8 @@ urlpatterns = [
     # Health
     path('health', health_view, name='health'),
     path('health/', health_view, name='health-slash'),
+    path('health/db/', db_health_view, name='health-db'),
+
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
 ]
@@ -1,8 +1,12 @@
+import os
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework import serializers
 from rest_framework.views import APIView
@@ -11,6 +15,15 @@ from drf_yasg import openapi
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 
+from .revocation import is_token_revoked, revoke_token
+from .throttling import (
+    LoginIPRateThrottle, LoginUsernameRateThrottle, RegisterIPRateThrottle,
+    get_rejection_counts, hashing_slot,
+)
+
+LOGIN_THROTTLES = [LoginIPRateThrottle, LoginUsernameRateThrottle]
+REGISTER_THROTTLES = [RegisterIPRateThrottle]
+
 # Simple serializers for Swagger schemas
 class LoginSerializer(serializers.Serializer):
     username = serializers.CharField()
@@ -27,6 +40,24 @@ class RefreshSerializer(serializers.Serializer):
 class AccessTokenResponseSerializer(serializers.Serializer):
     access_token = serializers.CharField()
 
+class LogoutSerializer(serializers.Serializer):
+    refresh_token = serializers.CharField(required=False)
+
+class MessageResponseSerializer(serializers.Serializer):
+    message = serializers.CharField()
+
+class RevocationCheckingTokenRefreshSerializer(TokenRefreshSerializer):
+    """TokenRefreshSerializer that refuses revoked refresh tokens"""
+
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs['refresh'])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        if is_token_revoked(refresh):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
+
 class RegisterSerializer(serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField(write_only=True)
@@ -43,6 +74,7 @@ class RegisterResponseSerializer(serializers.Serializer):
 # APIView wrappers with explicit schemas so Swagger shows bodies
 class LoginAPIView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = LOGIN_THROTTLES
 
     @swagger_auto_schema(
         request_body=LoginSerializer,
@@ -53,7 +85,8 @@ class LoginAPIView(APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data['username']
         password = serializer.validated_data['password']
-        user = authenticate(username=username, password=password)
+        with hashing_slot():
+            user = authenticate(username=username, password=password)
         if user is None:
             return Response({'error': 'Invalid credentials'}, status=status.HTTP_401_UNAUTHORIZED)
         refresh = RefreshToken.for_user(user)
@@ -81,12 +114,39 @@ class RefreshAPIView(APIView):
         serializer.is_valid(raise_exception=True)
         try:
             refresh = RefreshToken(serializer.validated_data['refresh_token'])
+            if is_token_revoked(refresh):
+                return Response({'error': 'Refresh token has been revoked'}, status=status.HTTP_401_UNAUTHORIZED)
             return Response({'access_token': str(refresh.access_token)})
         except Exception:
             return Response({'error': 'Invalid refresh token'}, status=status.HTTP_401_UNAUTHORIZED)
 
+class LogoutAPIView(APIView):
+    """Revoke the access token used for this request and, if given, its refresh token"""
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        request_body=LogoutSerializer,
+        responses={200: MessageResponseSerializer}
+    )
+    def post(self, request):
+        serializer = LogoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh_token = serializer.validated_data.get('refresh_token')
+        if refresh_token:
+            try:
+                refresh = RefreshToken(refresh_token)
+            except TokenError:
+                return Response({'error': 'Invalid refresh token'}, status=status.HTTP_400_BAD_REQUEST)
+            if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(getattr(request.user, api_settings.USER_ID_FIELD)):
+                return Response({'error': 'Refresh token belongs to another user'}, status=status.HTTP_400_BAD_REQUEST)
+            revoke_token(refresh)
+        if request.auth is not None:
+            revoke_token(request.auth)
+        return Response({'message': 'Logged out successfully'})
+
 class RegisterAPIView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = REGISTER_THROTTLES
 
     @swagger_auto_schema(
         request_body=RegisterSerializer,
@@ -100,13 +160,14 @@ class RegisterAPIView(APIView):
             return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
         if data.get('email') and User.objects.filter(email=data['email']).exists():
             return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
-        user = User.objects.create_user(
-            username=data['username'],
-            password=data['password'],
-            email=data.get('email') or '',
-            first_name=data.get('first_name') or '',
-            last_name=data.get('last_name') or ''
-        )
+        with hashing_slot():
+            user = User.objects.create_user(
+                username=data['username'],
+                password=data['password'],
+                email=data.get('email') or '',
+                first_name=data.get('first_name') or '',
+                last_name=data.get('last_name') or ''
+            )
         refresh = RefreshToken.for_user(user)
         return Response({
             'message': 'User created successfully',
@@ -121,6 +182,22 @@ class RegisterAPIView(APIView):
             }
         }, status=status.HTTP_201_CREATED)
 
+class ThrottleStatsAPIView(APIView):
+    """Throttle rejections per scope, counted by the worker serving this request"""
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(responses={200: openapi.Response('Rejections per throttle scope')})
+    def get(self, request):
+        return Response({'pid': os.getpid(), 'rejections': get_rejection_counts()})
+
+class ThrottledTokenObtainPairView(TokenObtainPairView):
+    """simplejwt's token endpoint with the same throttles as LoginAPIView"""
+    throttle_classes = LOGIN_THROTTLES
+
+    def post(self, request, *args, **kwargs):
+        with hashing_slot():
+            return super().post(request, *args, **kwargs)
+
 # Backward-compatible function views (kept)
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from employee_project.routers import use_primary
+
+from .revocation import is_token_revoked
+
+JWT_AUTH_CACHE_DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'STATELESS': False,
+}
+
+# The password hash is never written to the cache; it stays deferred and is
+# only loaded (with a query) if something actually reads it.
+UNCACHED_FIELDS = {'password'}
+
+
+def get_jwt_auth_cache_settings():
+    return {**JWT_AUTH_CACHE_DEFAULTS, **getattr(settings, 'JWT_AUTH_CACHE', {})}
+
+
+def user_cache_key(user_id):
+    return f'jwt-auth:user:{user_id}'
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Signal receiver: drop a user from the auth cache on save or delete"""
+    config = get_jwt_auth_cache_settings()
+    caches[config['ALIAS']].delete(user_cache_key(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that resolves users from a short-TTL cache instead of
+    querying auth_user on every request. Cached entries are dropped whenever the
+    user is saved (including deactivation) or deleted.
+
+    With JWT_AUTH_CACHE['STATELESS'] the user is built from the token claims
+    alone (a TokenUser) and the database is never consulted; deactivation then
+    only takes effect when the access token expires.
+
+    Revoked tokens (see revocation.py) are rejected in either mode.
+    """
+
+    def get_validated_token(self, raw_token):
+        validated_token = super().get_validated_token(raw_token)
+        if is_token_revoked(validated_token):
+            raise InvalidToken(_('Token has been revoked'))
+        return validated_token
+
+    def get_user(self, validated_token):
+        config = get_jwt_auth_cache_settings()
+        if config['STATELESS']:
+            return api_settings.TOKEN_USER_CLASS(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        cache = caches[config['ALIAS']]
+        key = user_cache_key(user_id)
+        cached = cache.get(key)
+        if cached is None:
+            # Cached for TIMEOUT seconds, so never fill it from a lagging replica
+            with use_primary():
+                user = super().get_user(validated_token)
+            cache.set(key, self._dump(user), timeout=config['TIMEOUT'])
+            return user
+
+        user = self._load(cached)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Needs the password hash, which is not cached
+            return super().get_user(validated_token)
+        return user
+
+    def _dump(self, user):
+        return {
+            field.attname: getattr(user, field.attname)
+            for field in self.user_model._meta.concrete_fields
+            if field.name not in UNCACHED_FIELDS
+        }
+
+    def _load(self, values):
+        return self.user_model.from_db('default', list(values), list(values.values()))
@@ -0,0 +1,129 @@
+"""
+Server-side cache for chart and statistics payloads.
+
+Every cached payload is keyed by its name, its parameters and the current
+generation of each model it reads. Model signals bump the generations, so a
+write makes every dependent key unreachable at once; entries that are no longer
+reachable simply age out. Each entry also has a TTL as a fallback for writes
+that bypass the ORM entirely.
+"""
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from employee_project.routers import recently_written, use_primary
+
+STATS_CACHE_DEFAULTS = {
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
+    'TIMEOUTS': {},
+    'LOCK_TIMEOUT': 30,
+    'WAIT_TIMEOUT': 10,
+}
+
+_MISSING = object()
+
+# Striped in-process locks: concurrent misses for one key inside a worker
+# wait for a single computation instead of all recomputing it.
+_LOCKS = [threading.Lock() for _ in range(64)]
+
+
+def get_stats_cache_settings():
+    return {**STATS_CACHE_DEFAULTS, **getattr(settings, 'STATS_CACHE', {})}
+
+
+def get_stats_cache():
+    return caches[get_stats_cache_settings()['ALIAS']]
+
+
+def _generation_key(model):
+    return f'stats:gen:{model._meta.label_lower}'
+
+
+def get_generations(models):
+    """Return the current generation number of each model"""
+    cache = get_stats_cache()
+    keys = [_generation_key(model) for model in models]
+    found = cache.get_many(keys)
+    generations = []
+    for key in keys:
+        if key not in found:
+            # Seed from the clock so a lost counter never reuses an old generation
+            cache.add(key, time.time_ns(), timeout=None)
+            found[key] = cache.get(key)
+        generations.append(found[key])
+    return generations
+
+
+def invalidate_models(*models):
+    """Make every cached payload that depends on any of `models` stale"""
+    cache = get_stats_cache()
+    for model in models:
+        key = _generation_key(model)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def _on_primary(compute):
+    def wrapper():
+        with use_primary():
+            return compute()
+    return wrapper
+
+
+def make_cache_key(name, models, params=None):
+    params = sorted((params or {}).items())
+    generations = get_generations(models)
+    raw = repr((params, generations))
+    return f'stats:{name}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def cached_stats(name, models, compute, params=None, timeout=None):
+    """
+    Return the cached result of `compute()` for `name` and `params`, computing
+    it at most once per key across threads and, through a cache lock, across
+    workers sharing the cache.
+    """
+    config = get_stats_cache_settings()
+    cache = get_stats_cache()
+    if timeout is None:
+        timeout = config['TIMEOUTS'].get(name, config['TIMEOUT'])
+
+    key = make_cache_key(name, models, params)
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+
+    if recently_written():
+        # A replica may not have the write yet; don't cache its view for the TTL
+        compute = _on_primary(compute)
+
+    with _LOCKS[hash(key) % len(_LOCKS)]:
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock_key = f'{key}:lock'
+        if cache.add(lock_key, 1, timeout=config['LOCK_TIMEOUT']):
+            try:
+                value = compute()
+                cache.set(key, value, timeout=timeout)
+            finally:
+                cache.delete(lock_key)
+            return value
+
+        # Another worker holds the lock: wait for its result rather than pile on
+        deadline = time.monotonic() + config['WAIT_TIMEOUT']
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            value = cache.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if cache.get(lock_key) is None:
+                break
+        return compute()
@@ -1,148 +1,279 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
-from django.http import JsonResponse
-from django.db.models import Count, Avg
+from django.http import JsonResponse, StreamingHttpResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Count, Avg, Q
+from django.db.models.functions import TruncMonth
 from datetime import date, timedelta
+import asyncio
 import calendar
 
+from employee_project.metrics import TimedJSONEncoder
 from .models import Department, Employee
+from .conditional import conditional_view
+from .caching import cached_stats
+from .live import DashboardBroadcaster, sse_event
 from attendance.models import Attendance, Performance
 
+SSE_HEARTBEAT_SECONDS = 15
+
+@conditional_view(Employee, Department, Attendance, Performance, daily=True)
 def charts_dashboard(request):
     """
     Charts dashboard view with employee and attendance analytics
     Public access allowed for the main dashboard page
+    The chart data is embedded in the page so first paint needs no extra requests
     """
+    dashboard_data = dashboard_bootstrap_payload()
     context = {
         'page_title': 'Analytics Dashboard',
-        'total_employees': Employee.objects.count(),
-        'total_departments': Department.objects.count(),
+        'total_employees': dashboard_data['stats']['total_employees'],
+        'total_departments': dashboard_data['stats']['total_departments'],
+        'dashboard_data': dashboard_data,
     }
     
     return render(request, 'charts.html', context)
 
+def department_stats_data():
+    """Employees per department, largest first"""
+    departments = Department.objects.annotate(
+        employee_count=Count('employees')
+    ).values('name', 'employee_count').order_by('-employee_count')
+    
+    return {
+        'results': list(departments),
+        'total': len(departments)
+    }
+
+@conditional_view(Department, Employee)
 def api_department_stats(request):
     """
     API endpoint for department statistics (for Chart.js)
     Public access for chart data
     """
     try:
-        departments = Department.objects.annotate(
-            employee_count=Count('employees')
-        ).values('name', 'employee_count').order_by('-employee_count')
-        
-        return JsonResponse({
-            'results': list(departments),
-            'total': len(departments)
-        })
+        data = cached_stats('department-stats', [Department, Employee], department_stats_data)
+        return JsonResponse(data, encoder=TimedJSONEncoder)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def last_six_months(today):
+    """(month_start, month_end) pairs for the 6 months up to `today`, oldest first"""
+    months = []
+    for i in range(6):
+        # Calculate month start and end
+        if today.month - i <= 0:
+            year = today.year - 1
+            month = 12 + (today.month - i)
+        else:
+            year = today.year
+            month = today.month - i
+        
+        month_start = date(year, month, 1)
+        if month == 12:
+            month_end = date(year + 1, 1, 1) - timedelta(days=1)
+        else:
+            month_end = date(year, month + 1, 1) - timedelta(days=1)
+        months.append((month_start, month_end))
+    
+    months.reverse()
+    return months
+
+def attendance_summary_data(today):
+    """
+    Monthly attendance percentages for the last 6 months and the 30-day
+    attendance rate, from a single grouped query
+    """
+    months = last_six_months(today)
+    thirty_days_ago = today - timedelta(days=30)
+    
+    rows = Attendance.objects.filter(
+        date__gte=min(months[0][0], thirty_days_ago)
+    ).annotate(month=TruncMonth('date')).order_by().values('month', 'status').annotate(
+        total=Count('id'),
+        recent=Count('id', filter=Q(date__gte=thirty_days_ago))
+    )
+    
+    by_month = {}
+    recent_total = recent_present = 0
+    for row in rows:
+        by_month.setdefault(row['month'], {})[row['status']] = row['total']
+        recent_total += row['recent']
+        if row['status'] == 'present':
+            recent_present += row['recent']
+    
+    monthly = {'months': [], 'present': [], 'absent': [], 'late': []}
+    for month_start, month_end in months:
+        counts = by_month.get(month_start, {})
+        total_records = sum(counts.values())
+        monthly['months'].append(month_start.strftime('%b %y'))
+        for status in ('present', 'absent', 'late'):
+            if total_records > 0:
+                monthly[status].append(round((counts.get(status, 0) / total_records) * 100, 1))
+            else:
+                monthly[status].append(0)
+    
+    attendance_rate = round((recent_present / recent_total) * 100, 1) if recent_total else 0
+    return monthly, attendance_rate
+
+def attendance_monthly_data(today):
+    """Present/absent/late percentages for the 6 months up to `today`"""
+    monthly, _ = attendance_summary_data(today)
+    return monthly
+
+@conditional_view(Attendance, daily=True)
 def api_attendance_monthly(request):
     """
     API endpoint for monthly attendance statistics (for Chart.js)
     Public access for chart data
     """
     try:
-        # Get the last 6 months
-        months = []
-        present_data = []
-        absent_data = []
-        late_data = []
-        
-        current_date = date.today()
-        
-        for i in range(6):
-            # Calculate month start and end
-            if current_date.month - i <= 0:
-                year = current_date.year - 1
-                month = 12 + (current_date.month - i)
-            else:
-                year = current_date.year
-                month = current_date.month - i
-            
-            month_start = date(year, month, 1)
-            if month == 12:
-                month_end = date(year + 1, 1, 1) - timedelta(days=1)
-            else:
-                month_end = date(year, month + 1, 1) - timedelta(days=1)
-            
-            # Get attendance data for this month
-            month_attendance = Attendance.objects.filter(
-                date__range=[month_start, month_end]
-            )
-            
-            total_records = month_attendance.count()
-            
-            if total_records > 0:
-                present_count = month_attendance.filter(status='present').count()
-                absent_count = month_attendance.filter(status='absent').count()
-                late_count = month_attendance.filter(status='late').count()
-                
-                # Calculate percentages
-                present_pct = round((present_count / total_records) * 100, 1)
-                absent_pct = round((absent_count / total_records) * 100, 1)
-                late_pct = round((late_count / total_records) * 100, 1)
-            else:
-                present_pct = absent_pct = late_pct = 0
-            
-            months.append(month_start.strftime('%b %y'))
-            present_data.append(present_pct)
-            absent_data.append(absent_pct)
-            late_data.append(late_pct)
-        
-        # Reverse to show oldest to newest
-        months.reverse()
-        present_data.reverse()
-        absent_data.reverse()
-        late_data.reverse()
-        
-        return JsonResponse({
-            'months': months,
-            'present': present_data,
-            'absent': absent_data,
-            'late': late_data
-        })
+        today = date.today()
+        data = cached_stats(
+            'attendance-monthly', [Attendance],
+            lambda: attendance_monthly_data(today),
+            params={'today': today.isoformat()}
+        )
+        return JsonResponse(data, encoder=TimedJSONEncoder)
         
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
 
+def dashboard_stats_data(today):
+    """Headline counts, 30-day attendance rate and average rating"""
+    # Employee statistics
+    total_employees = Employee.objects.count()
+    total_departments = Department.objects.count()
+    
+    # Attendance statistics (last 30 days)
+    thirty_days_ago = today - timedelta(days=30)
+    attendance_records = Attendance.objects.filter(date__gte=thirty_days_ago)
+    
+    total_attendance = attendance_records.count()
+    if total_attendance > 0:
+        present_count = attendance_records.filter(status='present').count()
+        attendance_rate = round((present_count / total_attendance) * 100, 1)
+    else:
+        attendance_rate = 0
+    
+    # Performance statistics
+    performance_records = Performance.objects.all()
+    if performance_records.exists():
+        avg_performance = round(
+            performance_records.aggregate(avg_rating=Avg('rating'))['avg_rating'], 1
+        )
+    else:
+        avg_performance = 0
+    
+    return {
+        'total_employees': total_employees,
+        'total_departments': total_departments,
+        'attendance_rate': attendance_rate,
+        'avg_performance': avg_performance
+    }
+
+DASHBOARD_MODELS = [Employee, Department, Attendance, Performance]
+
+def dashboard_stats_payload():
+    """Cached dashboard statistics for today"""
+    today = date.today()
+    return cached_stats(
+        'dashboard-stats', DASHBOARD_MODELS,
+        lambda: dashboard_stats_data(today),
+        params={'today': today.isoformat()}
+    )
+
+@conditional_view(*DASHBOARD_MODELS, daily=True)
 def api_dashboard_stats(request):
     """
     API endpoint for dashboard statistics
     Public access for chart data
     """
     try:
-        # Employee statistics
-        total_employees = Employee.objects.count()
-        total_departments = Department.objects.count()
-        
-        # Attendance statistics (last 30 days)
-        thirty_days_ago = date.today() - timedelta(days=30)
-        attendance_records = Attendance.objects.filter(date__gte=thirty_days_ago)
-        
-        total_attendance = attendance_records.count()
-        if total_attendance > 0:
-            present_count = attendance_records.filter(status='present').count()
-            attendance_rate = round((present_count / total_attendance) * 100, 1)
-        else:
-            attendance_rate = 0
-        
-        # Performance statistics
-        performance_records = Performance.objects.all()
-        if performance_records.exists():
-            avg_performance = round(
-                performance_records.aggregate(avg_rating=Avg('rating'))['avg_rating'], 1
-            )
-        else:
-            avg_performance = 0
+        return JsonResponse(dashboard_stats_payload(), encoder=TimedJSONEncoder)
         
-        return JsonResponse({
-            'total_employees': total_employees,
-            'total_departments': total_departments,
+    except Exception as e:
+        return JsonResponse({'error': str(e)}, status=500)
+
+def dashboard_bootstrap_data(today):
+    """
+    Everything the dashboard page renders, in three queries:
+    department counts, one grouped attendance query and the rating average
+    """
+    departments = department_stats_data()
+    monthly, attendance_rate = attendance_summary_data(today)
+    avg_rating = Performance.objects.aggregate(avg_rating=Avg('rating'))['avg_rating']
+    
+    return {
+        'stats': {
+            # Every employee belongs to exactly one department
+            'total_employees': sum(dept['employee_count'] for dept in departments['results']),
+            'total_departments': departments['total'],
             'attendance_rate': attendance_rate,
-            'avg_performance': avg_performance
-        })
-        
+            'avg_performance': round(avg_rating, 1) if avg_rating is not None else 0
+        },
+        'department_stats': departments,
+        'attendance_monthly': monthly
+    }
+
+def dashboard_bootstrap_payload():
+    """Cached combined dashboard payload for today"""
+    today = date.today()
+    return cached_stats(
+        'dashboard-bootstrap', DASHBOARD_MODELS,
+        lambda: dashboard_bootstrap_data(today),
+        params={'today': today.isoformat()}
+    )
+
+@conditional_view(*DASHBOARD_MODELS, daily=True)
+def api_dashboard_bootstrap(request):
+    """
+    API endpoint returning stats, department and monthly attendance chart data
+    in one response (the same payload charts_dashboard embeds in the page)
+    Public access for chart data
+    """
+    try:
+        return JsonResponse(dashboard_bootstrap_payload(), encoder=TimedJSONEncoder)
     except Exception as e:
         return JsonResponse({'error': str(e)}, status=500)
+
+dashboard_broadcaster = DashboardBroadcaster(dashboard_stats_payload, DASHBOARD_MODELS)
+
+async def api_dashboard_stream(request):
+    """
+    Server-Sent Events stream of dashboard statistics
+    Sends a `snapshot` event on connect, then `delta` events with only the
+    changed fields whenever employees, attendance or performance change.
+    Requires the ASGI server; under WSGI clients should poll dashboard-stats.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'Live updates require the ASGI server; poll dashboard-stats instead'},
+            status=503
+        )
+    
+    queue = dashboard_broadcaster.subscribe()
+    try:
+        snapshot = await dashboard_broadcaster.current_snapshot()
+    except Exception:
+        dashboard_broadcaster.unsubscribe(queue)
+        raise
+    
+    async def events():
+        try:
+            yield b'retry: 5000\n' + sse_event('snapshot', snapshot)
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield b': keepalive\n\n'
+                    continue
+                yield sse_event(event, data)
+        finally:
+            dashboard_broadcaster.unsubscribe(queue)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
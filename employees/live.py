@@ -0,0 +1,97 @@
+"""
+In-process fan-out of live dashboard updates for Server-Sent Event streams.
+
+One broadcaster per worker process polls the model generations kept by the
+statistics cache (see caching.py), which signals bump on every write. When a
+generation moves it recomputes the payload once, through the shared cache,
+and pushes only the changed fields to every connected client's queue.
+"""
+import asyncio
+import json
+import logging
+from datetime import date
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .caching import get_generations
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event, data):
+    """Encode one Server-Sent Event"""
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f'event: {event}\ndata: {payload}\n\n'.encode()
+
+
+class DashboardBroadcaster:
+    """Shares one computation per change among all subscribers in this process"""
+
+    def __init__(self, compute, models, interval=1.0, queue_size=100):
+        self.compute = compute
+        self.models = models
+        self.interval = interval
+        self.queue_size = queue_size
+        self.subscribers = set()
+        self.snapshot = None
+        self._version = None
+        self._task = None
+        self._loop = None
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers.add(queue)
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._task = loop.create_task(self._run())
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+        if not self.subscribers and self._task is not None:
+            # Nobody is listening: stop polling until the next subscriber
+            self._task.cancel()
+            self._task = None
+            self._version = None
+
+    async def current_snapshot(self):
+        if self.snapshot is None:
+            self.snapshot = await sync_to_async(self.compute)()
+        return self.snapshot
+
+    async def _run(self):
+        while self.subscribers:
+            try:
+                await self.poll_once()
+            except Exception:
+                logger.exception('Dashboard broadcaster poll failed')
+            await asyncio.sleep(self.interval)
+
+    async def poll_once(self):
+        """Recompute and publish a delta if any watched model changed"""
+        generations = await sync_to_async(get_generations)(self.models)
+        version = (tuple(generations), date.today())
+        if version == self._version:
+            return
+        self._version = version
+
+        previous = self.snapshot
+        snapshot = await sync_to_async(self.compute)()
+        self.snapshot = snapshot
+        if previous is None:
+            return
+        delta = {key: value for key, value in snapshot.items() if previous.get(key) != value}
+        if delta:
+            self.publish('delta', delta)
+
+    def publish(self, event, data):
+        for queue in list(self.subscribers):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # A slow client missed deltas: replace its backlog with a full snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(('snapshot', self.snapshot))
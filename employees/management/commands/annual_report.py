@@ -0,0 +1,90 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date
+import time
+
+from attendance.reports import build_report, comparable, reference_report, write_csv, write_json, year_range
+
+
+class Command(BaseCommand):
+    help = 'Company-wide annual attendance report computed in parallel shards'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--year',
+            type=int,
+            default=date.today().year,
+            help='Calendar year to report on (default: the current year)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Processes computing shards (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--shard-by',
+            choices=['employee', 'department'],
+            default='employee',
+            help='Split by contiguous employee id ranges or by department (default: employee)'
+        )
+        parser.add_argument(
+            '--shards',
+            type=int,
+            help='Employee id ranges to split into (default: 4 per worker)'
+        )
+        parser.add_argument('--json', help='Write the full report to this JSON file')
+        parser.add_argument('--csv-dir', help='Write employees.csv, departments.csv and months.csv here')
+        parser.add_argument(
+            '--reference',
+            action='store_true',
+            help='Use the sequential single-process implementation instead'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Also run the reference implementation and fail if the numbers differ'
+        )
+
+    def handle(self, *args, **options):
+        start, end = year_range(options['year'])
+        started = time.perf_counter()
+        if options['reference']:
+            report = reference_report(start, end)
+        else:
+            report = build_report(
+                start, end, workers=options['workers'], shard_by=options['shard_by'], shards=options['shards']
+            )
+        elapsed = time.perf_counter() - started
+        self._summary(report, elapsed)
+
+        if options['verify'] and not options['reference']:
+            started = time.perf_counter()
+            reference = reference_report(start, end)
+            self.stdout.write(f'Reference implementation: {time.perf_counter() - started:.2f}s')
+            if comparable(reference) != comparable(report):
+                raise CommandError('The parallel report differs from the reference implementation')
+            self.stdout.write(self.style.SUCCESS('Parallel and reference reports match'))
+
+        if options['json']:
+            write_json(report, options['json'])
+            self.stdout.write(f"Report written to {options['json']}")
+        if options['csv_dir']:
+            for path in write_csv(report, options['csv_dir']):
+                self.stdout.write(f'Written {path}')
+
+    def _summary(self, report, elapsed):
+        company = report['company']
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['start']} to {report['end']}: {company['records']} records for "
+            f"{company['employees']} employees in {elapsed:.2f}s ({report['engine']}, {report['shards']} shard(s))"
+        ))
+        self.stdout.write(
+            f"Attendance {company['attendance_rate']}%, late {company['lateness_rate']}%, "
+            f"absent {company['absence_rate']}%, {company['absence_runs']} absence runs "
+            f"(longest {company['longest_absence_run']} days)"
+        )
+        self.stdout.write(f"{'rank':>4} {'department':24} {'employees':>9} {'attend %':>9} {'late %':>7} {'absent %':>9}")
+        for row in report['departments']:
+            self.stdout.write(
+                f"{row['rank']:4d} {(row['name'] or '-')[:24]:24} {row['employees']:9d} "
+                f"{row['attendance_rate']:9.2f} {row['lateness_rate']:7.2f} {row['absence_rate']:9.2f}"
+            )
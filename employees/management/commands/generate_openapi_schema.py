@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+import time
+
+from employee_project.schema import get_schema, schema_paths
+
+
+class Command(BaseCommand):
+    help = 'Generate and store the OpenAPI schema for the current code version'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Regenerate even if a schema for this code version is already stored'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        schema = get_schema(regenerate=options['force'])
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        for kind, path in schema_paths(schema.version).items():
+            self.stdout.write(f'{kind:5} {len(schema.documents[kind]):8d} B  {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Schema for code version {schema.version} ready in {elapsed_ms:.0f} ms'
+        ))
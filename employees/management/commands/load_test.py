@@ -0,0 +1,186 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+import importlib.util
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+from employee_project.loadtest import (
+    DEFAULT_WEIGHTS, SCENARIOS, LoadConfig, prepare, run, summarize, write_csv, write_json,
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Command(BaseCommand):
+    help = 'Replay weighted user scenarios concurrently against a server and report latency percentiles'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            default='http://127.0.0.1:8000',
+            help='Base URL of the server under test (default: http://127.0.0.1:8000)'
+        )
+        parser.add_argument(
+            '--start-server',
+            action='store_true',
+            help='Start a local server for the run (gunicorn when installed, else runserver)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='gunicorn workers for --start-server (default: 3)'
+        )
+        parser.add_argument('--username', required=True, help='User the virtual users log in as')
+        parser.add_argument('--password', required=True, help='Password of that user')
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=10,
+            help='Concurrent virtual users, one thread each (default: 10)'
+        )
+        parser.add_argument(
+            '--duration',
+            type=float,
+            default=30.0,
+            help='Seconds of load after ramp-up (default: 30)'
+        )
+        parser.add_argument(
+            '--ramp-up',
+            type=float,
+            default=0.0,
+            help='Seconds over which virtual users are started (default: 0)'
+        )
+        parser.add_argument(
+            '--think-time',
+            type=float,
+            default=0.0,
+            help='Mean pause between scenarios per user, in seconds (default: 0)'
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            metavar='NAME=WEIGHT',
+            help=(
+                f"Scenario weight, repeatable (default: "
+                f"{' '.join(f'{k}={v}' for k, v in DEFAULT_WEIGHTS.items())}); "
+                f"scenarios: {', '.join(SCENARIOS)}"
+            )
+        )
+        parser.add_argument('--seed', type=int, default=1, help='Random seed of the scenario mix (default: 1)')
+        parser.add_argument('--json', help='Write the summary and every sample to this JSON file')
+        parser.add_argument('--csv', help='Write per-step statistics to this CSV file')
+
+    def handle(self, *args, **options):
+        weights = self._parse_weights(options['scenario'])
+        server = None
+        base_url = options['url']
+        if options['start_server']:
+            base_url, server = self._start_server(options['workers'])
+        try:
+            config = LoadConfig(
+                base_url=base_url,
+                username=options['username'],
+                password=options['password'],
+                users=max(1, options['users']),
+                duration=options['duration'],
+                ramp_up=options['ramp_up'],
+                think_time=options['think_time'],
+                weights=weights,
+                seed=options['seed'],
+            )
+            try:
+                state = prepare(config)
+            except (RuntimeError, OSError) as e:
+                raise CommandError(f'Cannot start the load test against {base_url}: {e}')
+            self.stdout.write(
+                f'{config.users} users for {config.duration:.0f}s against {base_url} '
+                f"({len(state['checkins'])} employees can check in today)"
+            )
+            recorder = run(config, state)
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+
+        summary = summarize(recorder)
+        self._report(summary, state)
+        if options['json']:
+            write_json(options['json'], config, summary, recorder)
+            self.stdout.write(f"Samples written to {options['json']}")
+        if options['csv']:
+            write_csv(options['csv'], summary)
+            self.stdout.write(f"Statistics written to {options['csv']}")
+
+    def _parse_weights(self, values):
+        if not values:
+            return dict(DEFAULT_WEIGHTS)
+        weights = {}
+        for value in values:
+            name, _, weight = value.partition('=')
+            if name not in SCENARIOS:
+                raise CommandError(f"Unknown scenario '{name}' (choose from {', '.join(SCENARIOS)})")
+            try:
+                weights[name] = float(weight or 1)
+            except ValueError:
+                raise CommandError(f"Invalid weight in '{value}'")
+        return weights
+
+    def _start_server(self, workers):
+        port = _free_port()
+        base_url = f'http://127.0.0.1:{port}'
+        if importlib.util.find_spec('gunicorn'):
+            command = [
+                sys.executable, '-m', 'gunicorn', 'employee_project.wsgi:application',
+                '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+            ]
+        else:
+            self.stdout.write(self.style.WARNING('gunicorn not installed; using runserver'))
+            command = [sys.executable, 'manage.py', 'runserver', f'127.0.0.1:{port}', '--noreload']
+        server = subprocess.Popen(command, cwd=settings.BASE_DIR)
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f'Server exited with code {server.returncode}')
+            try:
+                urllib.request.urlopen(f'{base_url}/health', timeout=1).close()
+                return base_url, server
+            except OSError:
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError('Server did not become healthy within 30s')
+
+    def _report(self, summary, state):
+        total = summary['total']
+        self.stdout.write(
+            f"\n{total['requests']} requests in {summary['duration_s']}s: "
+            f"{total['throughput_rps']} req/s, {summary['checkins_per_second']} check-ins/s, "
+            f"{summary['dashboard_polls_per_second']} dashboard polls/s"
+        )
+        self.stdout.write(
+            f"{'step':28} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'errors':>7} {'4xx':>7}"
+        )
+        for step, stats in list(summary['steps'].items()) + [('TOTAL', total)]:
+            self.stdout.write(
+                f"{step:28} {stats['requests']:8d} {stats['throughput_rps']:8.1f} {stats['p50_ms']:8.1f} "
+                f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['error_rate']:7.2%} "
+                f"{stats['client_error_rate']:7.2%}"
+            )
+        throttled = sum(stats['throttled'] for stats in summary['steps'].values())
+        if throttled:
+            self.stdout.write(self.style.WARNING(
+                f'{throttled} requests were throttled (HTTP 429). Raise LOGIN_THROTTLE_IP_RATE and '
+                f'LOGIN_THROTTLE_USERNAME_RATE on the server under test to measure capacity rather than the rate limits.'
+            ))
+        if state['checkins_exhausted']:
+            self.stdout.write(self.style.WARNING(
+                'Every employee had checked in today; the checkin scenario stopped early.'
+            ))
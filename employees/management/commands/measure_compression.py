@@ -0,0 +1,150 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.test import Client
+from django.test.utils import override_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+import time
+import urllib.error
+import urllib.request
+
+from employee_project.middleware import available_encodings, get_compression_settings
+
+DEFAULT_PATHS = [
+    '/api/employees/',
+    '/api/departments/',
+    '/api/attendance/',
+    '/api/performance/',
+    '/api/attendance/statistics/',
+    '/api/charts/department-stats/',
+    '/api/charts/attendance-monthly/',
+    '/api/charts/dashboard-stats/',
+    '/api/attendance/export/',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure bytes and time saved by response compression on typical endpoints, '
+        'in-process or over HTTP against a running server (--base-url)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'paths',
+            nargs='*',
+            help='Paths to measure (default: list, statistics and chart endpoints)'
+        )
+        parser.add_argument(
+            '--username',
+            help='Log in as this user so authenticated endpoints can be measured'
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Time full downloads from this running server (e.g. http://127.0.0.1:8000) '
+                 'instead of calling the app in-process'
+        )
+        parser.add_argument(
+            '--bandwidth-kbps',
+            type=float,
+            default=1000.0,
+            help='Link speed used for the estimated transfer saving (default: 1000 kbit/s)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Requests per measurement; the median time is reported (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or DEFAULT_PATHS
+        bytes_per_second = options['bandwidth_kbps'] * 1000 / 8
+        repeat = max(1, options['repeat'])
+
+        user = None
+        if options['username']:
+            try:
+                user = User.objects.get(username=options['username'])
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['username']}' does not exist")
+
+        if options['base_url']:
+            fetch = self._http_fetcher(options['base_url'].rstrip('/'), user)
+            where = f"over HTTP from {options['base_url']}"
+        else:
+            client = Client()
+            if user is not None:
+                client.force_login(user)
+            fetch = self._client_fetcher(client)
+            where = 'in-process'
+
+        encodings = available_encodings(get_compression_settings())
+        self.stdout.write(
+            f"Encodings: {', '.join(encodings)} | timed {where} | "
+            f"estimate for a {options['bandwidth_kbps']:.0f} kbit/s link"
+        )
+        self.stdout.write(
+            f"{'path':40} {'enc':8} {'raw B':>9} {'sent B':>9} {'ratio':>6} "
+            f"{'ms':>9} {'saved ms':>9} {'est. ms':>8}"
+        )
+
+        # The test client talks to the app in-process as 'testserver'
+        with override_settings(ALLOWED_HOSTS=['*']):
+            for path in paths:
+                self._report(fetch, path, encodings, repeat, bytes_per_second)
+
+    def _report(self, fetch, path, encodings, repeat, bytes_per_second):
+        raw_size, raw_ms, status = self._measure(fetch, path, 'identity', repeat)
+        if status != 200:
+            self.stdout.write(self.style.WARNING(f'{path:40} skipped (HTTP {status})'))
+            return
+        self.stdout.write(f'{path:40} {"identity":8} {raw_size:9d} {raw_size:9d} {1:6.2f} {raw_ms:9.2f}')
+        for encoding in encodings:
+            size, ms, _ = self._measure(fetch, path, encoding, repeat)
+            # saved ms is measured; est. ms adds the transfer time the smaller body
+            # would save on a --bandwidth-kbps link
+            saved_ms = raw_ms - ms
+            estimated_ms = saved_ms + (raw_size - size) / bytes_per_second * 1000
+            ratio = size / raw_size if raw_size else 1
+            self.stdout.write(
+                f'{path:40} {encoding:8} {raw_size:9d} {size:9d} {ratio:6.2f} '
+                f'{ms:9.2f} {saved_ms:9.2f} {estimated_ms:8.1f}'
+            )
+
+    def _client_fetcher(self, client):
+        def fetch(path, encoding):
+            response = client.get(path, HTTP_ACCEPT_ENCODING=encoding)
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            return response.status_code, body
+        return fetch
+
+    def _http_fetcher(self, base_url, user):
+        headers = {}
+        if user is not None:
+            headers['Authorization'] = f'Bearer {RefreshToken.for_user(user).access_token}'
+
+        def fetch(path, encoding):
+            request = urllib.request.Request(
+                base_url + path, headers={**headers, 'Accept-Encoding': encoding}
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    return response.status, response.read()
+            except urllib.error.HTTPError as e:
+                return e.code, b''
+            except urllib.error.URLError as e:
+                raise CommandError(f'Cannot reach {base_url}: {e.reason}')
+        return fetch
+
+    def _measure(self, fetch, path, encoding, repeat):
+        """Return (body bytes, median time to the last byte in ms, status) for one encoding"""
+        timings = []
+        size = 0
+        status = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            status, body = fetch(path, encoding)
+            timings.append((time.perf_counter() - start) * 1000)
+            size = len(body)
+        timings.sort()
+        return size, timings[len(timings) // 2], status
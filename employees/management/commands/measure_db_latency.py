@@ -0,0 +1,88 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+from django.test import Client
+from django.test.utils import override_settings
+import time
+
+from employee_project.db import connections_opened
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare request latency with a new database connection per request '
+        'against the configured connection reuse (DB_POOL)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path',
+            nargs='?',
+            default='/api/employees/',
+            help='Path to request (default: /api/employees/)'
+        )
+        parser.add_argument(
+            '--username',
+            help='Log in as this user so authenticated endpoints can be measured'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Requests per mode (default: 200)'
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options['requests'])
+        client = Client()
+        if options['username']:
+            try:
+                client.force_login(User.objects.get(username=options['username']))
+            except User.DoesNotExist:
+                raise CommandError(f"User '{options['username']}' does not exist")
+
+        settings_dict = connection.settings_dict
+        configured_max_age = settings_dict['CONN_MAX_AGE']
+        pooled = bool(settings_dict.get('OPTIONS', {}).get('pool'))
+        if pooled:
+            modes = [('pool', configured_max_age)]
+        else:
+            modes = [('new per request', 0), ('persistent', configured_max_age or 60)]
+
+        self.stdout.write(f"{options['path']} | {connection.vendor} | {count} requests per mode")
+        self.stdout.write(
+            f"{'mode':16} {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'opened':>7}"
+        )
+        try:
+            # The test client talks to the app in-process as 'testserver'
+            with override_settings(ALLOWED_HOSTS=['*']):
+                for label, max_age in modes:
+                    self._report(client, options['path'], label, max_age, count)
+        finally:
+            settings_dict['CONN_MAX_AGE'] = configured_max_age
+            connection.close()
+
+    def _report(self, client, path, label, max_age, count):
+        # CONN_MAX_AGE is read when a connection is opened, so start afresh
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        opened_before = connections_opened(connection.alias)
+        timings = []
+        for _ in range(count):
+            start = time.perf_counter()
+            response = client.get(path)
+            # The test client skips the request_finished cleanup a real handler runs
+            close_old_connections()
+            timings.append((time.perf_counter() - start) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{path} returned HTTP {response.status_code}')
+        timings.sort()
+
+        def percentile(p):
+            return timings[min(len(timings) - 1, int(len(timings) * p))]
+
+        self.stdout.write(
+            f'{label:16} {sum(timings) / len(timings):8.2f} {percentile(0.5):8.2f} '
+            f'{percentile(0.95):8.2f} {percentile(0.99):8.2f} '
+            f'{connections_opened(connection.alias) - opened_before:7d}'
+        )
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+
+from employees.snapshots import SnapshotError, restore_snapshot, snapshot_path
+
+
+class Command(BaseCommand):
+    help = 'Load a snapshot written by snapshot_data into the database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Snapshot name (e.g. e5000-d365-dep8-s42) or .snap path')
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete the existing rows of the four tables first (default: the tables must be empty)'
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Database alias to restore into (default: default)'
+        )
+
+    def handle(self, *args, **options):
+        path = snapshot_path(options['name'])
+        if not path.exists():
+            raise CommandError(f'No snapshot at {path}; create it with snapshot_data')
+        try:
+            manifest = restore_snapshot(path, using=options['database'], replace=options['replace'])
+        except SnapshotError as e:
+            raise CommandError(str(e))
+        rows = ', '.join(f"{t['rows']} {t['model'].split('.')[1]}" for t in manifest['tables'])
+        self.stdout.write(self.style.SUCCESS(f"Restored {path} in {manifest['seconds']}s: {rows}"))
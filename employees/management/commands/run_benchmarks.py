@@ -0,0 +1,97 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import setup_databases, teardown_databases
+from pathlib import Path
+import time
+
+from employee_project.benchmark import (
+    DEFAULT_SEED, DEFAULT_THRESHOLD, RESULT_HEADER, SCALES,
+    compare_to_baseline, default_baseline_path, is_seeded, read_baseline,
+    run_suite, seed_dataset, write_baseline,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a deterministic dataset in a test database and benchmark every API '
+        'endpoint against a stored baseline'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale',
+            choices=sorted(SCALES),
+            default='small',
+            help='Dataset size (default: small = 1k employees, 1 year of attendance)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=DEFAULT_SEED,
+            help=f'Random seed of the dataset (default: {DEFAULT_SEED})'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10,
+            help='Warm requests per endpoint (default: 10)'
+        )
+        parser.add_argument(
+            '--only',
+            help='Only run endpoints whose name contains this text (e.g. statistics)'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Baseline JSON to compare with (default: benchmarks/baseline-<scale>.json)'
+        )
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Write the results as the new baseline instead of comparing'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help=f'Allowed slowdown as a fraction (default: {DEFAULT_THRESHOLD} = 25%%)'
+        )
+        parser.add_argument(
+            '--keepdb',
+            action='store_true',
+            help='Keep the test database, and reuse it when it already holds this scale'
+        )
+
+    def handle(self, *args, **options):
+        scale = SCALES[options['scale']]
+        baseline_path = Path(options['baseline'] or default_baseline_path(options['scale']))
+        if not options['save_baseline'] and not baseline_path.exists():
+            self.stdout.write(self.style.WARNING(
+                f'No baseline at {baseline_path}; run with --save-baseline to record one'
+            ))
+
+        # Never touch the configured database: benchmark in its test database
+        old_config = setup_databases(verbosity=0, interactive=False, keepdb=options['keepdb'])
+        try:
+            if not (options['keepdb'] and is_seeded(scale)):
+                self.stdout.write(f"Seeding '{options['scale']}' dataset (seed {options['seed']})...")
+                start = time.perf_counter()
+                seed_dataset(scale, seed=options['seed'], stdout=self.stdout)
+                self.stdout.write(f'Seeded in {time.perf_counter() - start:.1f}s')
+
+            self.stdout.write(RESULT_HEADER)
+            results = run_suite(repeat=max(1, options['repeat']), only=options['only'], stdout=self.stdout)
+        finally:
+            teardown_databases(old_config, verbosity=0, keepdb=options['keepdb'])
+
+        if options['save_baseline']:
+            write_baseline(baseline_path, options['scale'], options['seed'], results)
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+        if not baseline_path.exists():
+            return
+
+        regressions = compare_to_baseline(results, read_baseline(baseline_path), options['threshold'])
+        if regressions:
+            for regression in regressions:
+                self.stdout.write(self.style.ERROR(regression))
+            raise CommandError(f'{len(regressions)} regression(s) against {baseline_path}')
+        self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
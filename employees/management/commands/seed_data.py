@@ -1,12 +1,26 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
 from django.utils import timezone
 from faker import Faker
 from datetime import date, timedelta
+import csv
+import io
 import random
+import time
 
 from employees.models import Department, Employee
+from employees.seeding import (
+    generate_attendance, generate_employees, generate_performance, run_chunks,
+)
+from employees.signals import bulk_change
 from attendance.models import Attendance, Performance
 
+DEPARTMENT_NAMES = [
+    'Engineering', 'Marketing', 'Human Resources', 'Finance', 'Sales',
+    'Operations', 'Research & Development', 'Customer Support',
+    'Legal', 'Information Technology', 'Product Management', 'Quality Assurance'
+]
+
 class Command(BaseCommand):
     help = 'Seed the database with fake employee data using Faker'
 
@@ -34,8 +48,43 @@ class Command(BaseCommand):
             action='store_true',
             help='Clear existing data before seeding'
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help='Generate rows in memory in chunks and load them in bulk (much faster)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Bulk mode: employees per generated chunk (default: 500)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Bulk mode: processes generating chunks in parallel (default: 1)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Bulk mode: random seed; the same seed gives the same data for any --workers (default: 42)'
+        )
+        parser.add_argument(
+            '--loader',
+            choices=['auto', 'copy', 'insert', 'bulk_create'],
+            default='auto',
+            help=(
+                'Bulk mode: PostgreSQL COPY, multi-row INSERT through executemany, or '
+                'Model.objects.bulk_create (default: COPY on PostgreSQL, else insert)'
+            )
+        )
 
     def handle(self, *args, **options):
+        if options['bulk']:
+            return self._handle_bulk(options)
+
         fake = Faker()
         Faker.seed(42)  # For reproducible results
         
@@ -62,15 +111,9 @@ class Command(BaseCommand):
         # Create departments
         self.stdout.write('Creating departments...')
         departments = []
-        department_names = [
-            'Engineering', 'Marketing', 'Human Resources', 'Finance', 'Sales',
-            'Operations', 'Research & Development', 'Customer Support',
-            'Legal', 'Information Technology', 'Product Management', 'Quality Assurance'
-        ]
-        
-        for i in range(min(num_departments, len(department_names))):
+        for i in range(min(num_departments, len(DEPARTMENT_NAMES))):
             dept, created = Department.objects.get_or_create(
-                name=department_names[i]
+                name=DEPARTMENT_NAMES[i]
             )
             departments.append(dept)
             if created:
@@ -209,3 +252,142 @@ class Command(BaseCommand):
                 f'\nYou can now run the development server and test the API endpoints!'
             )
         )
+
+    def _handle_bulk(self, options):
+        num_employees = options['employees']
+        num_days = options['days']
+        chunk_size = max(1, options['chunk_size'])
+        workers = max(1, options['workers'])
+        seed = options['seed']
+        today = date.today()
+        loader = options['loader']
+        vendor = connections[DEFAULT_DB_ALIAS].vendor
+        if loader == 'auto':
+            loader = 'copy' if vendor == 'postgresql' else 'insert'
+        elif loader == 'copy' and vendor != 'postgresql':
+            raise CommandError('--loader copy needs PostgreSQL')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Bulk seeding {num_employees} employees and {num_days} days of data '
+            f'({workers} worker(s), {loader}, seed {seed})...'
+        ))
+        started = time.perf_counter()
+
+        if options['clear']:
+            self.stdout.write('Clearing existing data...')
+            for model in (Performance, Attendance, Employee, Department):
+                # No per-row signals or cascade collection; caches are told below
+                model.objects.all()._raw_delete(DEFAULT_DB_ALIAS)
+                bulk_change.send(sender=model)
+
+        departments = [
+            Department.objects.get_or_create(name=name)[0]
+            for name in DEPARTMENT_NAMES[:options['departments']]
+        ]
+        if not departments:
+            raise CommandError('--departments must be at least 1')
+
+        # Employees: bulk_create returns the new primary keys needed below.
+        # Numbering continues after existing rows so emails stay unique.
+        offset = Employee.objects.count()
+        chunks = [
+            (seed, index, offset + start, min(chunk_size, num_employees - start), today, len(departments))
+            for index, start in enumerate(range(0, num_employees, chunk_size))
+        ]
+        employees = []
+        for rows in run_chunks(generate_employees, chunks, workers):
+            created = Employee.objects.bulk_create([
+                Employee(
+                    name=name, email=email, phone_number=phone, address=address,
+                    date_of_joining=joined, department=departments[dept_index],
+                )
+                for name, email, phone, address, joined, dept_index in rows
+            ], batch_size=1000)
+            employees.extend((e.pk, e.name) for e in created)
+        self.stdout.write(f'  Created {len(employees)} employees')
+
+        employee_chunks = [employees[i:i + chunk_size] for i in range(0, len(employees), chunk_size)]
+        attendance_count = 0
+        tasks = [(seed, index, [pk for pk, _ in chunk], today, num_days) for index, chunk in enumerate(employee_chunks)]
+        for rows in run_chunks(generate_attendance, tasks, workers):
+            attendance_count += self._load(
+                Attendance, ['employee_id', 'date', 'status'], rows, loader
+            )
+            self.stdout.write(f'  Created {attendance_count} attendance records...')
+
+        performance_count = 0
+        tasks = [(seed, index, chunk, today) for index, chunk in enumerate(employee_chunks)]
+        for rows in run_chunks(generate_performance, tasks, workers):
+            performance_count += self._load(
+                Performance, ['employee_id', 'rating', 'review_date', 'comments'], rows, loader
+            )
+
+        # The chunk loads bypass VersionedQuerySet: announce each table once,
+        # after its last chunk, rather than one reload per chunk
+        for model, count in ((Attendance, attendance_count), (Performance, performance_count)):
+            if count:
+                bulk_change.send(sender=model)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {len(employees)} employees, {attendance_count} attendance and '
+            f'{performance_count} performance records in {elapsed:.1f}s '
+            f'({attendance_count / elapsed * 60:,.0f} attendance rows/min)'
+        ))
+
+    def _load(self, model, columns, rows, loader):
+        """
+        Insert rows of `columns` values plus timestamps; return the row count.
+        Sends no bulk_change: the caller announces the table once it is loaded.
+        """
+        if not rows:
+            return 0
+        if loader == 'bulk_create':
+            # A plain QuerySet: VersionedQuerySet would log a reload for every chunk
+            models.QuerySet(model).bulk_create(
+                [model(**dict(zip(columns, row))) for row in rows],
+                batch_size=2000, ignore_conflicts=True,
+            )
+            return len(rows)
+
+        connection = connections[DEFAULT_DB_ALIAS]
+        now = timezone.now()
+        columns = columns + ['created_at', 'updated_at']
+        if loader == 'copy':
+            self._copy(connection, model, columns, (row + (now, now) for row in rows))
+        else:
+            self._insert(connection, model, columns, rows, now)
+        return len(rows)
+
+    def _insert(self, connection, model, columns, rows, now):
+        quote = connection.ops.quote_name
+        sql = (
+            f'INSERT INTO {quote(model._meta.db_table)} ({", ".join(quote(c) for c in columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})'
+        )
+        ops = connection.ops
+        stamp = ops.adapt_datetimefield_value(now)
+        adapted = [
+            tuple(ops.adapt_datefield_value(v) if isinstance(v, date) else v for v in row) + (stamp, stamp)
+            for row in rows
+        ]
+        # One transaction per chunk; in autocommit every row would be committed alone
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.executemany(sql, adapted)
+
+    def _copy(self, connection, model, columns, rows):
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        quote = connection.ops.quote_name
+        sql = (
+            f'COPY {quote(model._meta.db_table)} ({", ".join(quote(c) for c in columns)}) '
+            f'FROM STDIN WITH (FORMAT csv)'
+        )
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
@@ -0,0 +1,73 @@
+from django.core.management.base import BaseCommand, CommandError
+from collections import defaultdict
+from pathlib import Path
+import json
+
+from employee_project.slow_queries import get_slow_query_settings
+
+
+class Command(BaseCommand):
+    help = 'Summarize the slow-query log: the queries costing the most total time, with a sample plan'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            help='Log file to read, rotated backups included (default: SLOW_QUERY_LOG PATH)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='Number of queries to show (default: 10)'
+        )
+        parser.add_argument(
+            '--view',
+            help='Only include queries issued by this URL name (e.g. attendance-statistics)'
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Print the slowest sample plan for each query'
+        )
+
+    def handle(self, *args, **options):
+        path = Path(options['path'] or get_slow_query_settings()['PATH'])
+        files = sorted(path.parent.glob(path.name + '*'))
+        if not files:
+            raise CommandError(f'No slow-query log at {path}')
+
+        groups = defaultdict(list)
+        for file in files:
+            with open(file, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        sample = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by rotation
+                    if options['view'] and sample.get('view') != options['view']:
+                        continue
+                    groups[sample['fingerprint']].append(sample)
+
+        if not groups:
+            self.stdout.write('No slow queries recorded')
+            return
+
+        ranked = sorted(groups.values(), key=lambda samples: -sum(s['duration_ms'] for s in samples))
+        self.stdout.write(
+            f"{'fingerprint':12} {'count':>6} {'total ms':>10} {'mean ms':>9} {'max ms':>9}  views"
+        )
+        for samples in ranked[:options['top']]:
+            durations = [s['duration_ms'] for s in samples]
+            views = sorted({s.get('view') or '-' for s in samples})
+            slowest = max(samples, key=lambda s: s['duration_ms'])
+            self.stdout.write(
+                f"{slowest['fingerprint']:12} {len(samples):6d} {sum(durations):10.1f} "
+                f"{sum(durations) / len(durations):9.1f} {max(durations):9.1f}  {', '.join(views)}"
+            )
+            self.stdout.write(f"    {' '.join(slowest['sql'].split())[:200]}")
+            if slowest.get('origin'):
+                self.stdout.write(f"    at {slowest['origin']}")
+            if options['plans']:
+                plan = slowest.get('plan') or slowest.get('plan_error') or 'no plan'
+                for plan_line in plan.splitlines():
+                    self.stdout.write(f'      {plan_line}')
@@ -0,0 +1,103 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employees.snapshots import (
+    SnapshotError, build_snapshot, create_snapshot, list_snapshots, read_manifest, snapshot_key,
+    snapshot_path,
+)
+
+
+class Command(BaseCommand):
+    help = 'Seed a dataset in bulk and save the four tables as a compressed snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--employees',
+            type=int,
+            default=40,
+            help='Number of employees to seed (default: 40)'
+        )
+        parser.add_argument(
+            '--departments',
+            type=int,
+            default=8,
+            help='Number of departments to seed (default: 8)'
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=90,
+            help='Number of days of attendance data to seed (default: 90)'
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed of the dataset (default: 42)')
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Processes generating rows in parallel (default: 1)'
+        )
+        parser.add_argument(
+            '--name',
+            help='Snapshot name or .snap path (default: derived from the seed parameters, e.g. e40-d90-dep8-s42)'
+        )
+        parser.add_argument(
+            '--current',
+            action='store_true',
+            help='Snapshot the data already in the database instead of seeding (requires --name)'
+        )
+        parser.add_argument('--force', action='store_true', help='Overwrite an existing snapshot')
+        parser.add_argument('--list', action='store_true', help='List the saved snapshots and exit')
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help='Do not ask before clearing the tables for seeding'
+        )
+
+    def handle(self, *args, **options):
+        if options['list']:
+            return self._list()
+        if options['current'] and not options['name']:
+            raise CommandError('--current needs --name: the seed parameters do not describe existing data')
+        name = options['name'] or snapshot_key(
+            options['employees'], options['days'], options['departments'], options['seed']
+        )
+        path = snapshot_path(name)
+        if path.exists() and not options['force']:
+            raise CommandError(f'{path} already exists (use --force to overwrite)')
+
+        if options['current']:
+            manifest = create_snapshot(path)
+        else:
+            if options['interactive']:
+                answer = input(
+                    'Seeding clears the Department, Employee, Attendance and Performance tables '
+                    "of the configured database.\nType 'yes' to continue, or 'no' to cancel: "
+                )
+                if answer != 'yes':
+                    raise CommandError('Snapshot cancelled.')
+            manifest = build_snapshot(
+                path, options['employees'], options['days'], options['departments'],
+                options['seed'], workers=max(1, options['workers']), stdout=self.stdout,
+            )
+
+        rows = ', '.join(f"{t['rows']} {t['model'].split('.')[1]}" for t in manifest['tables'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot written to {path} ({manifest['file_bytes'] / 1024:.0f} KiB, "
+            f"{manifest['encoding']}, {manifest['seconds']}s): {rows}"
+        ))
+
+    def _list(self):
+        paths = list_snapshots()
+        if not paths:
+            self.stdout.write('No snapshots saved.')
+        for path in paths:
+            try:
+                manifest = read_manifest(path)
+            except (SnapshotError, OSError, ValueError) as e:
+                self.stdout.write(f'{path.stem:32} unreadable: {e}')
+                continue
+            rows = sum(t['rows'] for t in manifest['tables'])
+            self.stdout.write(
+                f"{path.stem:32} {manifest['vendor']:10} {rows:>12,} rows {path.stat().st_size / 1024:>10.0f} KiB "
+                f"{manifest['created_at']}"
+            )
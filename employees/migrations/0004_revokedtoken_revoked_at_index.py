@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employees', '0003_revokedtoken'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='revokedtoken',
+            name='revoked_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
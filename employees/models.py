@@ -1,12 +1,70 @@
-from django.db import models
+from django.db import models, router, transaction
+from django.utils import timezone
 from django.core.validators import EmailValidator
 from django.core.validators import RegexValidator
 
+from .signals import bulk_change
+
+
+class VersionedQuerySet(models.QuerySet):
+    """
+    QuerySet that announces bulk writes, which send no per-row signals.
+    bulk_change is sent inside the write's transaction, so what its receivers
+    write (change log, outbox) commits or rolls back with the rows.
+    """
+
+    def _write_db(self):
+        return self._db or router.db_for_write(self.model, **self._hints)
+
+    def _changed(self, pks=None, created=False):
+        bulk_change.send(sender=self.model, pks=pks, created=created)
+
+    def _auto_now_fields(self):
+        # Bulk updates skip pre_save(), so auto_now (the table version stamp in
+        # employees/conditional.py) has to be set explicitly
+        return [field.name for field in self.model._meta.concrete_fields if getattr(field, 'auto_now', False)]
+
+    def bulk_create(self, *args, **kwargs):
+        with transaction.atomic(using=self._write_db()):
+            objs = super().bulk_create(*args, **kwargs)
+            pks = [obj.pk for obj in objs]
+            # ignore_conflicts (and some backends) leave the new primary keys unset
+            self._changed(pks if None not in pks else None, created=True)
+        return objs
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        stamped = [name for name in self._auto_now_fields() if name not in fields]
+        if stamped:
+            now = timezone.now()
+            for obj in objs:
+                for name in stamped:
+                    setattr(obj, name, now)
+            fields = [*fields, *stamped]
+        with transaction.atomic(using=self._write_db()):
+            rows = super().bulk_update(objs, fields, *args, **kwargs)
+            self._changed([obj.pk for obj in objs])
+        return rows
+
+    def update(self, **kwargs):
+        now = timezone.now()
+        for name in self._auto_now_fields():
+            kwargs.setdefault(name, now)
+        db = self._write_db()
+        with transaction.atomic(using=db):
+            # The rows to report must be read before the update may move them out of the filter
+            pks = list(self.using(db).values_list('pk', flat=True))
+            rows = super().update(**kwargs)
+            self._changed(pks)
+        return rows
+
 class Department(models.Model):
     """Department model for organizing employees"""
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = VersionedQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
@@ -37,7 +95,9 @@ class Employee(models.Model):
         related_name='employees'
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = VersionedQuerySet.as_manager()
 
     class Meta:
         ordering = ['name']
@@ -55,3 +115,20 @@ class Employee(models.Model):
         return today.year - self.date_of_joining.year - (
             (today.month, today.day) < (self.date_of_joining.month, self.date_of_joining.day)
         )
+
+class RevokedToken(models.Model):
+    """A revoked JWT, identified by its jti claim"""
+    jti = models.CharField(max_length=255, unique=True)
+    token_type = models.CharField(max_length=20, blank=True)
+    user_id = models.BigIntegerField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Workers re-read the rows revoked since shortly before the newest they have seen
+    revoked_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ['-revoked_at']
+        verbose_name = 'Revoked Token'
+        verbose_name_plural = 'Revoked Tokens'
+
+    def __str__(self):
+        return f"{self.token_type or 'token'} {self.jti}"
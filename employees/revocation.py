@@ -0,0 +1,209 @@
+"""
+JWT revocation list served from memory.
+
+Revoked jtis are persisted in the RevokedToken table. Every worker keeps a
+Bloom filter plus an exact set of the unexpired ones. A check first asks the
+Bloom filter; a jti that was never revoked is rejected there in microseconds
+without touching the database. The rare positives are confirmed against the
+exact set.
+
+Workers pick up new revocations when a version value in the shared cache
+changes, checked at most once per CHECK_INTERVAL. Every revocation stores a
+fresh random version once its row has committed, so a version never repeats,
+even after the cache evicts the key. On a change, a worker re-reads every row
+revoked since RESCAN_MARGIN seconds before the newest one it has seen. Rows
+whose insert committed late, or were stamped by a worker with a slightly slow
+clock, still fall inside that window. Rows seen twice are ignored. A full
+reload every RELOAD_INTERVAL drops expired entries.
+
+The Bloom filter and the exact set are replaced together as one tuple, so a
+concurrent check never sees a partly rebuilt filter.
+"""
+import hashlib
+import math
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.utils import timezone
+
+REVOCATION_DEFAULTS = {
+    'ALIAS': 'default',
+    'CHECK_INTERVAL': 1.0,
+    'RELOAD_INTERVAL': 3600.0,
+    'RESCAN_MARGIN': 60.0,
+    'CAPACITY': 10000,
+    'ERROR_RATE': 0.001,
+}
+
+VERSION_KEY = 'jwt-revocation:version'
+
+
+def get_revocation_settings():
+    return {**REVOCATION_DEFAULTS, **getattr(settings, 'JWT_REVOCATION', {})}
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter using double hashing over one blake2b digest"""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """Per-process view of the revoked-token table"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        config = get_revocation_settings()
+        # (Bloom filter, exact set), always swapped as a whole
+        self._state = (BloomFilter(config['CAPACITY'], config['ERROR_RATE']), set())
+        self._last_seen = None
+        self._version = None
+        self._checked_at = 0.0
+        self._loaded_at = None
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        self._maybe_refresh()
+        bloom, exact = self._state
+        if jti not in bloom:
+            return False
+        return jti in exact
+
+    def revoke(self, jti, expires_at, token_type='', user_id=None):
+        """Persist a revocation and make every worker pick it up"""
+        from .models import RevokedToken
+
+        try:
+            RevokedToken.objects.get_or_create(
+                jti=jti,
+                defaults={'expires_at': expires_at, 'token_type': token_type, 'user_id': user_id},
+            )
+        except IntegrityError:
+            pass  # revoked concurrently by another request
+        cache = caches[get_revocation_settings()['ALIAS']]
+        # After commit: a worker refreshing earlier would not see the row yet
+        transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None))
+        with self._lock:
+            self._add([jti])
+
+    def clear(self):
+        """Forget the in-memory state (the next check reloads from the table)"""
+        with self._lock:
+            self._reset()
+
+    def _add(self, jtis):
+        bloom, exact = self._state
+        new = [jti for jti in jtis if jti not in exact]
+        if not new:
+            return
+        if bloom.count + len(new) > bloom.capacity:
+            exact = exact | set(new)
+            self._state = (self._build(exact, capacity=len(exact) * 2), exact)
+            return
+        # Adding in place is safe: bits are only ever set, and a jti is in the
+        # filter before it is in the set
+        for jti in new:
+            bloom.add(jti)
+            exact.add(jti)
+
+    def _build(self, jtis, capacity):
+        config = get_revocation_settings()
+        bloom = BloomFilter(max(capacity, config['CAPACITY']), config['ERROR_RATE'])
+        for jti in jtis:
+            bloom.add(jti)
+        return bloom
+
+    def _maybe_refresh(self):
+        config = get_revocation_settings()
+        now = time.monotonic()
+        if now - self._checked_at < config['CHECK_INTERVAL']:
+            return
+        with self._lock:
+            if now - self._checked_at < config['CHECK_INTERVAL']:
+                return
+            self._checked_at = now
+            if self._loaded_at is None or now - self._loaded_at >= config['RELOAD_INTERVAL']:
+                self._full_reload()
+                return
+            version = caches[config['ALIAS']].get(VERSION_KEY)
+            if version != self._version:
+                self._version = version
+                self._load_recent(config)
+
+    def _full_reload(self):
+        from .models import RevokedToken
+
+        config = get_revocation_settings()
+        self._version = caches[config['ALIAS']].get(VERSION_KEY)
+        # Always read the primary: rows missed on a lagging replica would be
+        # skipped until the next reload
+        revoked = RevokedToken.objects.using(DEFAULT_DB_ALIAS)
+        self._last_seen = revoked.order_by('-revoked_at').values_list('revoked_at', flat=True).first()
+        exact = set(
+            revoked.filter(expires_at__gt=timezone.now())
+            .order_by().values_list('jti', flat=True)
+        )
+        self._state = (self._build(exact, capacity=len(exact) * 2), exact)
+        self._loaded_at = time.monotonic()
+
+    def _load_recent(self, config):
+        from .models import RevokedToken
+
+        rows = RevokedToken.objects.using(DEFAULT_DB_ALIAS)
+        if self._last_seen is not None:
+            rows = rows.filter(revoked_at__gte=self._last_seen - timedelta(seconds=config['RESCAN_MARGIN']))
+        rows = list(rows.order_by('revoked_at').values_list('revoked_at', 'jti'))
+        self._add([jti for _, jti in rows])
+        if rows:
+            self._last_seen = max(self._last_seen or rows[-1][0], rows[-1][0])
+
+
+revocation_list = RevocationList()
+
+
+def revoke_token(token):
+    """Revoke a validated simplejwt token (access or refresh)"""
+    from rest_framework_simplejwt.settings import api_settings
+
+    expires_at = datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+    revocation_list.revoke(
+        token[api_settings.JTI_CLAIM],
+        expires_at,
+        token_type=token.get(api_settings.TOKEN_TYPE_CLAIM, ''),
+        user_id=token.get(api_settings.USER_ID_CLAIM),
+    )
+
+
+def is_token_revoked(token):
+    from rest_framework_simplejwt.settings import api_settings
+
+    return revocation_list.is_revoked(token.get(api_settings.JTI_CLAIM))
@@ -0,0 +1,40 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import Signal
+
+# Sent by VersionedQuerySet after bulk writes that bypass post_save/post_delete.
+# Receivers get `sender` (the model class), `pks` (the primary keys written, or
+# None when unknown, e.g. after raw SQL loads) and `created` (True for inserts).
+bulk_change = Signal()
+
+
+def _invalidate(sender, **kwargs):
+    from employee_project.routers import mark_write
+    from .caching import invalidate_models
+
+    def on_commit():
+        invalidate_models(sender)
+        mark_write()
+
+    # Bump now so the writing transaction never reads its own stale payloads,
+    # and again on commit so nothing cached from pre-commit data survives.
+    invalidate_models(sender)
+    transaction.on_commit(on_commit)
+
+
+def connect_signals():
+    """Connect cache invalidation for cached statistics and cached JWT users"""
+    from django.contrib.auth import get_user_model
+    from .authentication import invalidate_cached_user
+    from .models import Department, Employee
+    from attendance.models import Attendance, Performance
+
+    user_model = get_user_model()
+    post_save.connect(invalidate_cached_user, sender=user_model, dispatch_uid='jwt-auth-user-save')
+    post_delete.connect(invalidate_cached_user, sender=user_model, dispatch_uid='jwt-auth-user-delete')
+
+    for model in (Department, Employee, Attendance, Performance):
+        uid = f'stats-cache-{model._meta.label_lower}'
+        post_save.connect(_invalidate, sender=model, dispatch_uid=f'{uid}-save')
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=f'{uid}-delete')
+        bulk_change.connect(_invalidate, sender=model, dispatch_uid=f'{uid}-bulk')
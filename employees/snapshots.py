@@ -0,0 +1,413 @@
+"""
+Binary snapshots of the seeded tables (Department, Employee, Attendance,
+Performance).
+
+Seeding a large dataset with Faker takes minutes. A snapshot stores the
+seeded rows, so a fresh database can be filled in seconds instead. A snapshot
+is keyed by the seed parameters (see snapshot_key) and stored as
+SNAPSHOTS['DIRECTORY']/<name>.snap. Each file is one compressed stream, zstd
+when the optional `zstandard` package is installed and gzip otherwise:
+
+    b'EMPSNAP1' | manifest length (4 bytes) | manifest JSON
+    per table:  frames of [length (4 bytes) | payload], ended by a 0 length
+
+On PostgreSQL the payload is `COPY ... (FORMAT binary)` output and is loaded
+back with `COPY ... FROM STDIN`. Other databases get CSV rows with NULL written
+as \\N, restored with batched INSERTs. A snapshot can only be restored into the
+kind of database it was taken from, with the same migrations applied.
+
+    SNAPSHOTS = {
+        'DIRECTORY': 'var/snapshots',
+        'COMPRESSION_LEVEL': 3,
+    }
+"""
+import csv
+import gzip
+import hashlib
+import io
+import json
+import os
+import struct
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from employees.signals import bulk_change
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+SNAPSHOT_DEFAULTS = {
+    'DIRECTORY': None,
+    'COMPRESSION_LEVEL': 3,
+}
+
+MAGIC = b'EMPSNAP1'
+FORMAT_VERSION = 1
+EXTENSION = '.snap'
+NULL = '\\N'
+CSV_BATCH_ROWS = 5000
+_LENGTH = struct.Struct('>I')
+_GZIP_MAGIC = b'\x1f\x8b'
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def get_snapshot_settings():
+    config = {**SNAPSHOT_DEFAULTS, **getattr(settings, 'SNAPSHOTS', {})}
+    if config['DIRECTORY'] is None:
+        config['DIRECTORY'] = str(Path(settings.BASE_DIR) / 'var' / 'snapshots')
+    return config
+
+
+def snapshot_models():
+    """The snapshot tables, parents first"""
+    from attendance.models import Attendance, Performance
+    from employees.models import Department, Employee
+    return [Department, Employee, Attendance, Performance]
+
+
+def snapshot_key(employees, days, departments=8, seed=42):
+    """Snapshot name for a `seed_data --bulk` parameter set"""
+    return f'e{employees}-d{days}-dep{departments}-s{seed}'
+
+
+def snapshot_path(name):
+    """A snapshot name resolves inside SNAPSHOTS['DIRECTORY']; a file path is kept as is"""
+    if name.endswith(EXTENSION) or os.sep in name:
+        return Path(name)
+    return Path(get_snapshot_settings()['DIRECTORY']) / f'{name}{EXTENSION}'
+
+
+def list_snapshots():
+    directory = Path(get_snapshot_settings()['DIRECTORY'])
+    return sorted(directory.glob(f'*{EXTENSION}')) if directory.is_dir() else []
+
+
+@lru_cache(maxsize=None)
+def migration_state():
+    """Latest migration of each snapshot app, as on disk"""
+    from django.db.migrations.loader import MigrationLoader
+    labels = {model._meta.app_label for model in snapshot_models()}
+    leaves = MigrationLoader(None, ignore_no_migrations=True).graph.leaf_nodes()
+    return {app: name for app, name in sorted(leaves) if app in labels}
+
+
+def compatibility_key(using=DEFAULT_DB_ALIAS):
+    """
+    Short tag of what a snapshot must match to be restored into `using`: the
+    database vendor and the migration state. Caches of snapshots put it in
+    their file names, so a stale file is never picked up.
+    """
+    digest = hashlib.sha256(json.dumps(migration_state(), sort_keys=True).encode()).hexdigest()[:10]
+    return f'{connections[using].vendor}-{digest}'
+
+
+def _columns(model):
+    return [field.column for field in model._meta.concrete_fields]
+
+
+def _encoding(connection):
+    return 'pgbinary' if connection.vendor == 'postgresql' else 'csv'
+
+
+def _copy_sql(connection, table, columns, direction):
+    quote = connection.ops.quote_name
+    return (
+        f'COPY {quote(table["table"])} ({", ".join(quote(c) for c in columns)}) '
+        f'{direction} WITH (FORMAT binary)'
+    )
+
+
+# Compressed stream
+
+def _open_write(path):
+    level = get_snapshot_settings()['COMPRESSION_LEVEL']
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=level).stream_writer(open(path, 'wb'), closefd=True)
+    return gzip.open(path, 'wb', compresslevel=min(level, 9))
+
+
+def _open_read(path):
+    raw = open(path, 'rb')
+    head = raw.read(4)
+    raw.seek(0)
+    if head.startswith(_GZIP_MAGIC):
+        raw.close()
+        return gzip.open(path, 'rb')
+    if head == _ZSTD_MAGIC:
+        if zstandard is None:
+            raw.close()
+            raise SnapshotError(f'{path} is zstd-compressed; install the zstandard package')
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+    raw.close()
+    raise SnapshotError(f'{path} is not a snapshot file')
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    while len(data) < size:
+        more = stream.read(size - len(data))
+        if not more:
+            raise SnapshotError('Snapshot file is truncated')
+        data += more
+    return data
+
+
+class FrameWriter:
+    """File-like sink that frames every write; COPY TO writes straight into it"""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode()
+        if data:
+            self.stream.write(_LENGTH.pack(len(data)))
+            self.stream.write(data)
+        return len(data)
+
+    def close(self):
+        self.stream.write(_LENGTH.pack(0))
+
+
+def _read_frames(stream):
+    while True:
+        (size,) = _LENGTH.unpack(_read_exact(stream, _LENGTH.size))
+        if not size:
+            return
+        yield _read_exact(stream, size)
+
+
+class FrameReader:
+    """File-like source over a table's frames, for psycopg2's copy_expert"""
+
+    def __init__(self, frames):
+        self.frames = iter(frames)
+        self.buffer = b''
+
+    def read(self, size=-1):
+        while size < 0 or len(self.buffer) < size:
+            frame = next(self.frames, None)
+            if frame is None:
+                break
+            self.buffer += frame
+        if size < 0:
+            size = len(self.buffer)
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+
+# Dump
+
+def _dump_table(connection, table, writer):
+    columns = table['columns']
+    with connection.cursor() as cursor:
+        if table['encoding'] == 'pgbinary':
+            raw = cursor.cursor
+            sql = _copy_sql(connection, table, columns, 'TO STDOUT')
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, writer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    for data in copy:
+                        writer.write(bytes(data))
+            return
+        quote = connection.ops.quote_name
+        cursor.execute(
+            f'SELECT {", ".join(quote(c) for c in columns)} FROM {quote(table["table"])} '
+            f'ORDER BY {quote(table["pk"])}'
+        )
+        while True:
+            rows = cursor.fetchmany(CSV_BATCH_ROWS)
+            if not rows:
+                break
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(
+                [NULL if value is None else value for value in row] for row in rows
+            )
+            writer.write(buffer.getvalue())
+
+
+def create_snapshot(path, params=None, using=DEFAULT_DB_ALIAS):
+    """Write the snapshot tables of `using` to path; return the manifest"""
+    connection = connections[using]
+    encoding = _encoding(connection)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    started = time.perf_counter()
+
+    # Row counts and rows are read in separate statements: snapshot a quiescent database
+    tables = [
+        {
+            'model': model._meta.label,
+            'table': model._meta.db_table,
+            'pk': model._meta.pk.column,
+            'columns': _columns(model),
+            'encoding': encoding,
+            'rows': model.objects.using(using).count(),
+        }
+        for model in snapshot_models()
+    ]
+    manifest = {
+        'format': FORMAT_VERSION,
+        'vendor': connection.vendor,
+        'encoding': encoding,
+        'params': params or {},
+        'migrations': migration_state(),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'tables': tables,
+    }
+    with _open_write(tmp) as stream:
+        header = json.dumps(manifest).encode()
+        stream.write(MAGIC + _LENGTH.pack(len(header)) + header)
+        for table in tables:
+            writer = FrameWriter(stream)
+            _dump_table(connection, table, writer)
+            writer.close()
+    os.replace(tmp, path)
+    manifest['file_bytes'] = path.stat().st_size
+    manifest['seconds'] = round(time.perf_counter() - started, 3)
+    return manifest
+
+
+# Read
+
+def _read_header(stream, path):
+    if stream.read(len(MAGIC)) != MAGIC:
+        raise SnapshotError(f'{path} is not a snapshot file')
+    (size,) = _LENGTH.unpack(_read_exact(stream, _LENGTH.size))
+    manifest = json.loads(_read_exact(stream, size))
+    if manifest.get('format') != FORMAT_VERSION:
+        raise SnapshotError(f"{path} has snapshot format {manifest.get('format')}, expected {FORMAT_VERSION}")
+    return manifest
+
+
+def read_manifest(path):
+    with _open_read(path) as stream:
+        return _read_header(stream, path)
+
+
+class Snapshot:
+    """A snapshot read fully into memory, to restore it many times (e.g. once per test)"""
+
+    def __init__(self, manifest, frames):
+        self.manifest = manifest
+        self.frames = frames  # one list of payloads per table
+
+    @classmethod
+    def load(cls, path):
+        with _open_read(path) as stream:
+            manifest = _read_header(stream, path)
+            frames = [list(_read_frames(stream)) for _ in manifest['tables']]
+        return cls(manifest, frames)
+
+
+# Restore
+
+def clear_tables(using=DEFAULT_DB_ALIAS):
+    """Delete every row of the snapshot tables, children first, without per-row signals"""
+    for model in reversed(snapshot_models()):
+        model.objects.using(using)._raw_delete(using)
+
+
+def _load_table(connection, table, frames):
+    columns = table['columns']
+    with connection.cursor() as cursor:
+        if table['encoding'] == 'pgbinary':
+            raw = cursor.cursor
+            sql = _copy_sql(connection, table, columns, 'FROM STDIN')
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, FrameReader(frames))
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    for frame in frames:
+                        copy.write(frame)
+            return
+        quote = connection.ops.quote_name
+        sql = (
+            f'INSERT INTO {quote(table["table"])} ({", ".join(quote(c) for c in columns)}) '
+            f'VALUES ({", ".join(["%s"] * len(columns))})'
+        )
+        for frame in frames:
+            rows = csv.reader(io.StringIO(frame.decode()))
+            cursor.executemany(sql, [[None if value == NULL else value for value in row] for row in rows])
+
+
+def _check_compatible(manifest, connection):
+    if manifest['encoding'] != _encoding(connection):
+        raise SnapshotError(
+            f"Snapshot was taken from {manifest['vendor']} ({manifest['encoding']}) "
+            f'and cannot be restored into {connection.vendor}'
+        )
+    if manifest['migrations'] != migration_state():
+        raise SnapshotError(
+            f"Snapshot was taken at migrations {manifest['migrations']}, the code is at "
+            f'{migration_state()}; take a new snapshot'
+        )
+    models = {model._meta.label: model for model in snapshot_models()}
+    for table in manifest['tables']:
+        model = models.get(table['model'])
+        if model is None or table['columns'] != _columns(model):
+            raise SnapshotError(f"Columns of {table['model']} no longer match the snapshot")
+
+
+def restore_snapshot(source, using=DEFAULT_DB_ALIAS, replace=False):
+    """
+    Load a snapshot (a path or a Snapshot) into the snapshot tables of `using`,
+    which must be empty unless `replace` is set. Returns the manifest.
+    """
+    connection = connections[using]
+    started = time.perf_counter()
+    models = snapshot_models()
+    stream = None
+    if isinstance(source, Snapshot):
+        manifest = source.manifest
+        tables = source.frames
+    else:
+        stream = _open_read(source)
+        manifest = _read_header(stream, source)
+        tables = None
+    try:
+        _check_compatible(manifest, connection)
+        with transaction.atomic(using=using):
+            if replace:
+                clear_tables(using)
+            elif any(model.objects.using(using).exists() for model in models):
+                raise SnapshotError('The snapshot tables are not empty; restore with replace=True (--replace)')
+            for index, table in enumerate(manifest['tables']):
+                frames = tables[index] if tables is not None else _read_frames(stream)
+                _load_table(connection, table, frames)
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+            # Inside the transaction: the change log's reload entries commit with the rows
+            for model in models:
+                bulk_change.send(sender=model)
+    finally:
+        if stream is not None:
+            stream.close()
+    return {**manifest, 'seconds': round(time.perf_counter() - started, 3)}
+
+
+def build_snapshot(path, employees, days, departments=8, seed=42, workers=1, stdout=None):
+    """Seed `default` with `seed_data --bulk --clear` and snapshot the result"""
+    from django.core.management import call_command
+    call_command(
+        'seed_data', '--bulk', '--clear', '--employees', str(employees), '--days', str(days),
+        '--departments', str(departments), '--seed', str(seed), '--workers', str(workers),
+        stdout=stdout or io.StringIO(),
+    )
+    params = {'employees': employees, 'days': days, 'departments': departments, 'seed': seed}
+    return create_snapshot(path, params)
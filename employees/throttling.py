@@ -0,0 +1,149 @@
+"""
+Throttles for the login and registration endpoints.
+
+Both endpoints hash a password (deliberately slow) and query auth_user, so
+they are the cheapest way to exhaust the workers. The rate throttles below run
+in APIView.initial(), before the view touches the database or the hasher, and
+keep their history in a process-local cache so a rejection costs no network or
+database round trip. That history is per worker process: with N workers a
+client can make up to N times each rate before every worker has throttled it.
+
+Clients are identified by DRF's get_ident(), which trusts X-Forwarded-For only
+as far as REST_FRAMEWORK['NUM_PROXIES'] allows. With the default of 0, only
+REMOTE_ADDR counts and a client cannot pick its own identity. Behind a reverse
+proxy, set NUM_PROXIES to the number of proxies in front of the app.
+
+`hashing_slot()` caps the password hashes computed at the same time by every
+worker sharing HASHING_CACHE_ALIAS (every worker on the host with the default
+SQLite cache, every host with a shared Redis). A slot is a cache key added
+with a TTL, so a slot held by a worker that died frees itself after
+HASHING_SLOT_TIMEOUT seconds.
+
+Rejections are counted per throttle scope; see `get_rejection_counts()`.
+"""
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.exceptions import Throttled
+from rest_framework.throttling import SimpleRateThrottle
+
+from employee_project.metrics import registry
+
+AUTH_THROTTLE_DEFAULTS = {
+    'CACHE_ALIAS': 'throttle',
+    # DRF rate strings ('<count>/<sec|min|hour|day>'); None disables a throttle
+    'RATES': {
+        'login_ip': '20/min',
+        'login_username': '10/min',
+        'register_ip': '5/min',
+    },
+    'MAX_CONCURRENT_HASHING': 4,
+    'HASHING_RETRY_AFTER': 1,
+    'HASHING_CACHE_ALIAS': 'default',
+    'HASHING_SLOT_TIMEOUT': 30,
+}
+
+HASHING_SLOT_KEY = 'auth-throttle:hashing-slot:{}'
+
+_rejections = Counter()
+_rejections_lock = threading.Lock()
+
+
+def get_auth_throttle_settings():
+    config = {**AUTH_THROTTLE_DEFAULTS, **getattr(settings, 'AUTH_THROTTLE', {})}
+    config['RATES'] = {**AUTH_THROTTLE_DEFAULTS['RATES'], **config['RATES']}
+    return config
+
+
+def record_rejection(scope):
+    with _rejections_lock:
+        _rejections[scope] += 1
+    registry.inc('auth_throttle_rejections_total', (('scope', scope),))
+
+
+def get_rejection_counts():
+    """Rejections per throttle scope in this process since start (or reset)"""
+    with _rejections_lock:
+        return dict(_rejections)
+
+
+def reset_rejection_counts():
+    with _rejections_lock:
+        _rejections.clear()
+
+
+class LocalCacheRateThrottle(SimpleRateThrottle):
+    """SimpleRateThrottle that keeps its history in AUTH_THROTTLE['CACHE_ALIAS']"""
+
+    @property
+    def cache(self):
+        return caches[get_auth_throttle_settings()['CACHE_ALIAS']]
+
+    def get_rate(self):
+        return get_auth_throttle_settings()['RATES'].get(self.scope)
+
+    def throttle_failure(self):
+        record_rejection(self.scope)
+        return super().throttle_failure()
+
+
+class LoginIPRateThrottle(LocalCacheRateThrottle):
+    scope = 'login_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class LoginUsernameRateThrottle(LocalCacheRateThrottle):
+    """Limits attempts against one account, whichever addresses they come from"""
+    scope = 'login_username'
+
+    def get_cache_key(self, request, view):
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if not isinstance(username, str) or not username:
+            return None  # the serializer rejects the request anyway
+        ident = hashlib.sha256(username.strip().lower().encode()).hexdigest()[:32]
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class RegisterIPRateThrottle(LoginIPRateThrottle):
+    scope = 'register_ip'
+
+
+def _acquire_hashing_slot(config):
+    """Add the first free slot key; returns (cache, key, token) or None when all are taken"""
+    cache = caches[config['HASHING_CACHE_ALIAS']]
+    token = uuid.uuid4().hex
+    for index in range(config['MAX_CONCURRENT_HASHING']):
+        key = HASHING_SLOT_KEY.format(index)
+        if cache.add(key, token, timeout=config['HASHING_SLOT_TIMEOUT']):
+            return cache, key, token
+    return None
+
+
+@contextmanager
+def hashing_slot():
+    """
+    Reserve one of MAX_CONCURRENT_HASHING password-hashing slots or raise
+    Throttled (429) immediately instead of queueing behind the hasher.
+    """
+    config = get_auth_throttle_settings()
+    if not config['MAX_CONCURRENT_HASHING']:
+        yield
+        return
+    slot = _acquire_hashing_slot(config)
+    if slot is None:
+        record_rejection('hashing_concurrency')
+        raise Throttled(wait=config['HASHING_RETRY_AFTER'])
+    cache, key, token = slot
+    try:
+        yield
+    finally:
+        # Only free our own slot: after HASHING_SLOT_TIMEOUT it may belong to another request
+        if cache.get(key) == token:
+            cache.delete(key)
@@ -16,6 +16,8 @@ urlpatterns = [
     path('auth/login/', auth.LoginAPIView.as_view(), name='auth_login'),
     path('auth/refresh/', auth.RefreshAPIView.as_view(), name='auth_refresh'),
     path('auth/register/', auth.RegisterAPIView.as_view(), name='auth_register'),
+    path('auth/logout/', auth.LogoutAPIView.as_view(), name='auth_logout'),
+    path('auth/throttle-stats/', auth.ThrottleStatsAPIView.as_view(), name='auth_throttle_stats'),
     # Backward-compatible function endpoints (optional aliases)
     # path('auth/login-fn/', auth.login_view),
     # path('auth/refresh-fn/', auth.refresh_token_view),
@@ -25,4 +27,6 @@ urlpatterns = [
     path('charts/department-stats/', charts_views.api_department_stats, name='api_department_stats'),
     path('charts/attendance-monthly/', charts_views.api_attendance_monthly, name='api_attendance_monthly'),
     path('charts/dashboard-stats/', charts_views.api_dashboard_stats, name='api_dashboard_stats'),
+    path('charts/bootstrap/', charts_views.api_dashboard_bootstrap, name='api_dashboard_bootstrap'),
+    path('charts/dashboard-stream/', charts_views.api_dashboard_stream, name='api_dashboard_stream'),
 ]
@@ -17,8 +17,11 @@ from .serializers import (
 )
 from .filters import DepartmentFilter, EmployeeFilter
 from .permissions import EmployeeListPermission, DepartmentPermission
+from .conditional import ConditionalGetMixin
+from .caching import cached_stats
+from employee_project.tracing import TracingMixin
 
-class DepartmentViewSet(viewsets.ModelViewSet):
+class DepartmentViewSet(TracingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Department model with CRUD operations"""
     queryset = Department.objects.annotate(
         employee_count=Count('employees')
@@ -30,6 +33,7 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     search_fields = ['name']
     ordering_fields = ['name', 'created_at', 'employee_count']
     ordering = ['name']
+    conditional_models = [Department, Employee]
     
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -48,6 +52,12 @@ class DepartmentViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get department statistics"""
+        data = cached_stats(
+            'department-statistics', [Department, Employee], self._statistics_data
+        )
+        return Response(data)
+    
+    def _statistics_data(self):
         departments = Department.objects.annotate(
             employee_count=Count('employees')
         ).values('name', 'employee_count')
@@ -55,26 +65,27 @@ class DepartmentViewSet(viewsets.ModelViewSet):
         total_employees = sum(dept['employee_count'] for dept in departments)
         avg_employees = total_employees / len(departments) if departments else 0
         
-        return Response({
+        return {
             'total_departments': len(departments),
             'total_employees': total_employees,
             'average_employees_per_department': round(avg_employees, 2),
             'departments': list(departments)
-        })
+        }
 
-class EmployeeViewSet(viewsets.ModelViewSet):
+class EmployeeViewSet(TracingMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for Employee model with CRUD operations"""
     queryset = Employee.objects.select_related('department').all()
     serializer_class = EmployeeSerializer
     permission_classes = [EmployeeListPermission]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    # ?search= is handled by EmployeeFilter.search_filter
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_class = EmployeeFilter
-    search_fields = ['name', 'email', 'phone_number']
     ordering_fields = [
         'name', 'email', 'date_of_joining', 'created_at', 
         'department__name', 'years_of_service'
     ]
     ordering = ['name']
+    conditional_models = [Employee, Department]
     
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -107,6 +118,13 @@ class EmployeeViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """Get employee statistics"""
+        data = cached_stats(
+            'employee-statistics', [Employee, Department], self._statistics_data,
+            params={'today': date.today().isoformat()}
+        )
+        return Response(data)
+    
+    def _statistics_data(self):
         total_employees = Employee.objects.count()
         departments = Department.objects.annotate(
             employee_count=Count('employees')
@@ -117,14 +135,14 @@ class EmployeeViewSet(viewsets.ModelViewSet):
         total_years = sum(emp.years_of_service for emp in employees_with_service)
         avg_years = total_years / total_employees if total_employees > 0 else 0
         
-        return Response({
+        return {
             'total_employees': total_employees,
             'average_years_of_service': round(avg_years, 2),
             'departments': list(departments),
-            'recent_hires': Employee.objects.order_by('-date_of_joining')[:5].values(
+            'recent_hires': list(Employee.objects.order_by('-date_of_joining')[:5].values(
                 'name', 'department__name', 'date_of_joining'
-            )
-        })
+            ))
+        }
     
     @action(detail=False, methods=['get'])
     def search(self, request):
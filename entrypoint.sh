@@ -25,6 +25,11 @@ fi
 
 python manage.py migrate --noinput
 python manage.py collectstatic --noinput || true
+python manage.py generate_openapi_schema
 
-# Start server
-exec gunicorn employee_project.wsgi:application --bind 0.0.0.0:8000 --workers 3
+# Start server (SERVER_MODE=asgi serves the live dashboard stream)
+if [ "$SERVER_MODE" = "asgi" ]; then
+  exec gunicorn employee_project.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:8000 --workers ${WEB_CONCURRENCY:-3} --threads ${WEB_THREADS:-1}
+else
+  exec gunicorn employee_project.wsgi:application --bind 0.0.0.0:8000 --workers ${WEB_CONCURRENCY:-3} --threads ${WEB_THREADS:-1}
+fi
@@ -0,0 +1,13 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'kind', 'status', 'progress', 'created_by', 'attempts', 'created_at', 'finished_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['id', 'kind', 'created_by__username']
+    ordering = ['-created_at']
+    readonly_fields = [
+        'id', 'created_at', 'started_at', 'finished_at', 'heartbeat_at', 'worker', 'attempts',
+        'result_file', 'result_content_type', 'result_size', 'result', 'error',
+    ]
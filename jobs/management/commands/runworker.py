@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.queue import job_kinds
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (exports, statistics) from the jobs table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=2,
+            help='Jobs run at the same time (default: 2)'
+        )
+        parser.add_argument(
+            '--pool',
+            choices=['thread', 'process'],
+            default='thread',
+            help='Run jobs in threads (I/O-bound work) or spawned processes (CPU-bound work) (default: thread)'
+        )
+        parser.add_argument(
+            '--kind',
+            action='append',
+            help='Only run jobs of this kind; repeatable (default: every kind)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds between polls of an empty queue (default: JOBS["POLL_INTERVAL"])'
+        )
+        parser.add_argument('--name', help='Worker name recorded on claimed jobs (default: host:pid)')
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once the queue is empty instead of waiting for new jobs'
+        )
+
+    def handle(self, *args, **options):
+        kinds = options['kind']
+        unknown = set(kinds or ()) - set(job_kinds())
+        if unknown:
+            raise CommandError(f"Unknown job kind(s): {', '.join(sorted(unknown))} (choose from {', '.join(sorted(job_kinds()))})")
+        worker = Worker(
+            concurrency=options['concurrency'],
+            pool=options['pool'],
+            kinds=kinds,
+            name=options['name'],
+            poll_interval=options['poll_interval'],
+            stdout=self.stdout,
+        )
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(f'Worker stopped after {processed} job(s)'))
@@ -0,0 +1,16 @@
+"""
+Entry points of `runworker --pool process` children.
+
+Spawned children unpickle these functions before Django is set up, so this
+module must not import models at import time.
+"""
+
+
+def setup():
+    import django
+    django.setup()
+
+
+def run(job_id):
+    from .queue import run_job
+    return run_job(job_id)
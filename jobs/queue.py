@@ -0,0 +1,253 @@
+"""
+Database-backed job queue.
+
+A job is a row in jobs_job. The API (or any code) enqueues it; a
+`manage.py runworker` process claims it and runs the function registered for
+its kind. No broker is needed.
+
+Claiming is a compare-and-set UPDATE ... WHERE status = 'queued', so any
+number of workers can poll the same table on any database. A running job
+shows progress through JobContext.progress(). Its result is written as a file
+under JOBS['RESULT_DIR']/<job id>/, and the API serves that file once the job
+has succeeded. Workers refresh heartbeat_at for their running jobs. A running
+job whose heartbeat is older than STALE_AFTER seconds (the worker died) is
+queued again, up to MAX_ATTEMPTS runs in total.
+
+    JOBS = {
+        'RESULT_DIR': 'var/jobs',
+        'POLL_INTERVAL': 1.0,
+        'HEARTBEAT_SECONDS': 10,
+        'STALE_AFTER': 120,
+        'MAX_ATTEMPTS': 3,
+        'RESULT_TTL_DAYS': 7,
+    }
+"""
+import shutil
+import time
+import traceback
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+JOBS_DEFAULTS = {
+    'RESULT_DIR': None,
+    'POLL_INTERVAL': 1.0,
+    'HEARTBEAT_SECONDS': 10,
+    'STALE_AFTER': 120,
+    'MAX_ATTEMPTS': 3,
+    'RESULT_TTL_DAYS': 7,
+    # Progress is written to the database at most this often
+    'PROGRESS_INTERVAL': 0.5,
+}
+
+
+def get_jobs_settings():
+    config = {**JOBS_DEFAULTS, **getattr(settings, 'JOBS', {})}
+    if config['RESULT_DIR'] is None:
+        config['RESULT_DIR'] = str(Path(settings.BASE_DIR) / 'var' / 'jobs')
+    return config
+
+
+class JobCancelled(Exception):
+    pass
+
+
+@dataclass
+class JobKind:
+    name: str
+    func: object
+    params_serializer: object = None
+    description: str = ''
+
+
+_kinds = {}
+
+
+def register(name, params_serializer=None):
+    """
+    Decorator registering func(context, **params) as the job kind `name`.
+    params_serializer (a DRF Serializer class) validates submitted params.
+    """
+    def decorator(func):
+        _kinds[name] = JobKind(name, func, params_serializer, (func.__doc__ or '').strip())
+        return func
+    return decorator
+
+
+def get_kind(name):
+    return _kinds.get(name)
+
+
+def job_kinds():
+    return dict(_kinds)
+
+
+def enqueue(kind, params=None, user=None):
+    """Queue a job; params must already be valid and JSON-serializable"""
+    if kind not in _kinds:
+        raise ValueError(f'Unknown job kind {kind!r}')
+    return Job.objects.create(kind=kind, params=params or {}, created_by=user)
+
+
+def claim(worker, kinds=None, candidates=10):
+    """Mark the oldest queued job as running for `worker` and return it, or None"""
+    queued = Job.objects.filter(status=Job.QUEUED)
+    if kinds:
+        queued = queued.filter(kind__in=kinds)
+    for pk in queued.order_by('created_at').values_list('pk', flat=True)[:candidates]:
+        now = timezone.now()
+        claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+            status=Job.RUNNING, worker=worker, started_at=now, heartbeat_at=now,
+            attempts=F('attempts') + 1, progress=0.0, progress_message='', error='',
+        )
+        if claimed:  # another worker may have taken it in between
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def cancel(job):
+    """Cancel a queued job now; ask a running job to stop at its next progress report"""
+    if Job.objects.filter(pk=job.pk, status=Job.QUEUED).update(
+        status=Job.CANCELLED, finished_at=timezone.now()
+    ):
+        return
+    Job.objects.filter(pk=job.pk, status=Job.RUNNING).update(cancel_requested=True)
+
+
+def result_dir(job, config=None):
+    config = config or get_jobs_settings()
+    return Path(config['RESULT_DIR']) / str(job.pk)
+
+
+def result_path(job, config=None):
+    """Absolute path of the job's result file, or None"""
+    if not job.result_file:
+        return None
+    return Path((config or get_jobs_settings())['RESULT_DIR']) / job.result_file
+
+
+class JobContext:
+    """What a job function gets: its job, progress reporting and a result file"""
+
+    def __init__(self, job, config=None):
+        self.job = job
+        self.config = config or get_jobs_settings()
+        self._last_progress = 0.0
+        self._result = None
+
+    def progress(self, done, total=None, message=''):
+        """
+        Record progress (done/total, or a 0-1 fraction without total). Raises
+        JobCancelled when the job has been cancelled in the meantime.
+        """
+        now = time.monotonic()
+        if now - self._last_progress < self.config['PROGRESS_INTERVAL']:
+            return
+        self._last_progress = now
+        fraction = min(1.0, done / total) if total else min(1.0, float(done))
+        Job.objects.filter(pk=self.job.pk).update(
+            progress=round(fraction, 4), progress_message=message[:200], heartbeat_at=timezone.now()
+        )
+        if Job.objects.filter(pk=self.job.pk, cancel_requested=True).exists():
+            raise JobCancelled()
+
+    @contextmanager
+    def open_result(self, filename, content_type, mode='wb'):
+        """Write the result file; it replaces any file from an earlier attempt"""
+        directory = result_dir(self.job, self.config)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / filename
+        with open(path, mode) as f:
+            yield f
+        self._result = (path, content_type)
+
+    def result_fields(self):
+        if self._result is None:
+            return {}
+        path, content_type = self._result
+        return {
+            'result_file': str(path.relative_to(self.config['RESULT_DIR'])),
+            'result_content_type': content_type,
+            'result_size': path.stat().st_size,
+        }
+
+
+def run_job(job_id):
+    """Run a claimed job to completion and record its outcome (worker thread or process)"""
+    try:
+        job = Job.objects.get(pk=job_id)
+        kind = get_kind(job.kind)
+        context = JobContext(job)
+        try:
+            if kind is None:
+                raise LookupError(f'No job kind {job.kind!r} is registered in this worker')
+            summary = kind.func(context, **job.params)
+        except JobCancelled:
+            Job.objects.filter(pk=job.pk).update(status=Job.CANCELLED, finished_at=timezone.now())
+            return Job.CANCELLED
+        except Exception:
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.FAILED, error=traceback.format_exc()[-10000:], finished_at=timezone.now()
+            )
+            return Job.FAILED
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.SUCCEEDED, progress=1.0, result=summary, finished_at=timezone.now(),
+            **context.result_fields()
+        )
+        return Job.SUCCEEDED
+    finally:
+        # Worker threads must not keep their own connections open
+        for connection in connections.all(initialized_only=True):
+            connection.close()
+
+
+def heartbeat(job_ids):
+    Job.objects.filter(pk__in=job_ids, status=Job.RUNNING).update(heartbeat_at=timezone.now())
+
+
+def _requeue(running, config, reason):
+    requeued = running.filter(attempts__lt=config['MAX_ATTEMPTS']).update(
+        status=Job.QUEUED, worker='', heartbeat_at=None
+    )
+    failed = running.update(
+        status=Job.FAILED, finished_at=timezone.now(),
+        error=f"{reason} {config['MAX_ATTEMPTS']} times; giving up",
+    )
+    return requeued, failed
+
+
+def requeue_stale(config=None):
+    """Requeue running jobs whose worker stopped sending heartbeats; returns (requeued, failed)"""
+    config = config or get_jobs_settings()
+    return _requeue(Job.objects.filter(
+        status=Job.RUNNING, heartbeat_at__lt=timezone.now() - timedelta(seconds=config['STALE_AFTER'])
+    ), config, 'Worker lost')
+
+
+def requeue_lost(job_ids, config=None):
+    """Requeue running jobs whose pool process died; returns (requeued, failed)"""
+    config = config or get_jobs_settings()
+    return _requeue(Job.objects.filter(status=Job.RUNNING, pk__in=job_ids), config, 'Worker process died')
+
+
+def prune_finished(config=None):
+    """Delete finished jobs older than RESULT_TTL_DAYS and their result files"""
+    config = config or get_jobs_settings()
+    old = Job.objects.filter(
+        status__in=Job.FINISHED,
+        finished_at__lt=timezone.now() - timedelta(days=config['RESULT_TTL_DAYS']),
+    )
+    pruned = 0
+    for job in old.only('pk'):
+        shutil.rmtree(result_dir(job, config), ignore_errors=True)
+        pruned += 1
+    old.delete()
+    return pruned
@@ -0,0 +1,50 @@
+from rest_framework import serializers
+from rest_framework.reverse import reverse
+
+from .models import Job
+from .queue import get_kind, job_kinds
+
+
+def validate_params(kind_name, params):
+    """Params of a job kind, validated by its params serializer"""
+    kind = get_kind(kind_name)
+    if kind.params_serializer is None:
+        if params:
+            raise serializers.ValidationError({'params': f'{kind_name} takes no parameters'})
+        return {}
+    serializer = kind.params_serializer(data=params or {})
+    if not serializer.is_valid():
+        raise serializers.ValidationError({'params': serializer.errors})
+    return dict(serializer.validated_data)
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Serializer for Job model; only kind and params are writable"""
+    kind = serializers.ChoiceField(choices=[])
+    created_by = serializers.CharField(source='created_by.username', read_only=True, default=None)
+    result_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'kind', 'params', 'status', 'progress', 'progress_message', 'created_by',
+            'attempts', 'result', 'result_url', 'result_content_type', 'result_size', 'error',
+            'created_at', 'started_at', 'finished_at',
+        ]
+        read_only_fields = [
+            'id', 'status', 'progress', 'progress_message', 'attempts', 'result',
+            'result_content_type', 'result_size', 'error', 'created_at', 'started_at', 'finished_at',
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['kind'].choices = sorted(job_kinds())
+
+    def get_result_url(self, obj):
+        if obj.status != Job.SUCCEEDED:
+            return None
+        return reverse('job-result', args=[obj.pk], request=self.context.get('request'))
+
+    def validate(self, data):
+        data['params'] = validate_params(data['kind'], data.get('params'))
+        return data
@@ -0,0 +1,122 @@
+"""
+Built-in job kinds: the heavy attendance and performance reports.
+
+Each kind takes the same parameters as the synchronous endpoint it replaces.
+It writes its output to the job's result file and returns a small JSON
+summary.
+"""
+import json
+from datetime import date
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import serializers
+
+from attendance import reports
+from attendance.views import AttendanceViewSet, PerformanceViewSet
+from employees.exports import ENCODERS, EXPORT_BLOCK_ROWS, EXPORT_CURSOR_ROWS, EXPORT_FORMATS, in_transaction
+
+from .queue import register
+
+
+class ExportParamsSerializer(serializers.Serializer):
+    export_format = serializers.ChoiceField(choices=list(EXPORT_FORMATS), default='csv')
+    filters = serializers.DictField(child=serializers.CharField(), default=dict)
+    ordering = serializers.CharField(required=False, allow_blank=True)
+
+    viewset_class = None
+
+    def validate_filters(self, value):
+        filterset_class = self.viewset_class.filterset_class
+        filterset = filterset_class(data=value, queryset=filterset_class._meta.model.objects.none())
+        if not filterset.is_valid():
+            raise serializers.ValidationError(filterset.errors)
+        return value
+
+    def validate_ordering(self, value):
+        for term in filter(None, value.split(',')):
+            if term.lstrip('-') not in self.viewset_class.ordering_fields:
+                raise serializers.ValidationError(f'Cannot order by {term}')
+        return value
+
+
+class AttendanceExportParamsSerializer(ExportParamsSerializer):
+    viewset_class = AttendanceViewSet
+
+
+class PerformanceExportParamsSerializer(ExportParamsSerializer):
+    viewset_class = PerformanceViewSet
+
+
+class StatisticsParamsSerializer(serializers.Serializer):
+    days = serializers.IntegerField(min_value=1, max_value=3660, default=30)
+
+
+class AnnualReportParamsSerializer(serializers.Serializer):
+    year = serializers.IntegerField(min_value=1970, max_value=9999, default=lambda: date.today().year)
+    shard_by = serializers.ChoiceField(choices=['employee', 'department'], default='employee')
+    workers = serializers.IntegerField(min_value=1, max_value=64, required=False)
+
+
+def write_export(context, viewset_class, export_format, filters, ordering=None):
+    filterset_class = viewset_class.filterset_class
+    model = filterset_class._meta.model
+    queryset = filterset_class(data=filters, queryset=model.objects.all()).qs
+    terms = [term for term in (ordering or '').split(',') if term]
+    queryset = queryset.order_by(*terms) if terms else queryset.order_by('pk')
+    total = queryset.count()
+    fields = viewset_class.export_fields
+    rows = queryset.values_list(*(lookup for _, lookup in fields)).iterator(chunk_size=EXPORT_CURSOR_ROWS)
+    done = 0
+    filename = f'{model._meta.model_name}-{date.today():%Y%m%d}.{export_format}'
+    with context.open_result(filename, EXPORT_FORMATS[export_format]) as f:
+        blocks = ENCODERS[export_format]([name for name, _ in fields], rows, EXPORT_BLOCK_ROWS)
+        for block in in_transaction(blocks, queryset.db):
+            f.write(block)
+            done = min(total, done + EXPORT_BLOCK_ROWS)
+            context.progress(done, total, f'{done} of {total} rows')
+    return {'rows': total, 'export_format': export_format}
+
+
+def write_json(context, filename, data):
+    with context.open_result(filename, 'application/json', mode='w') as f:
+        json.dump(data, f, cls=DjangoJSONEncoder)
+
+
+@register('attendance-export', AttendanceExportParamsSerializer)
+def attendance_export(context, export_format='csv', filters=None, ordering=None):
+    """Every attendance record matching the list filters, as CSV or NDJSON"""
+    return write_export(context, AttendanceViewSet, export_format, filters or {}, ordering)
+
+
+@register('performance-export', PerformanceExportParamsSerializer)
+def performance_export(context, export_format='csv', filters=None, ordering=None):
+    """Every performance review matching the list filters, as CSV or NDJSON"""
+    return write_export(context, PerformanceViewSet, export_format, filters or {}, ordering)
+
+
+@register('attendance-statistics', StatisticsParamsSerializer)
+def attendance_statistics(context, days=30):
+    """GET /api/attendance/statistics/?days=N, computed in the background"""
+    context.progress(0, message=f'Aggregating {days} days')
+    data = AttendanceViewSet()._statistics_data(days, date.today())
+    write_json(context, 'attendance-statistics.json', data)
+    return {'days': days, 'total_records': data['total_records']}
+
+
+@register('performance-statistics')
+def performance_statistics(context):
+    """GET /api/performance/statistics/, computed in the background"""
+    data = PerformanceViewSet()._statistics_data()
+    write_json(context, 'performance-statistics.json', data)
+    return {'total_reviews': data['overall_statistics']['total_reviews']}
+
+
+@register('annual-report', AnnualReportParamsSerializer)
+def annual_report(context, year=None, shard_by='employee', workers=None):
+    """The company-wide annual attendance report (manage.py annual_report), as JSON"""
+    year = year or date.today().year
+    context.progress(0, message=f'Computing {year}')
+    start, end = reports.year_range(year)
+    report = reports.build_report(start, end, workers=workers, shard_by=shard_by)
+    write_json(context, f'annual-report-{year}.json', report)
+    return {'year': year, 'records': report['company']['records'], 'shards': report['shards']}
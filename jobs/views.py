@@ -0,0 +1,102 @@
+from django.http import FileResponse
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.filters import OrderingFilter
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.reverse import reverse
+
+from employee_project.routers import use_primary
+from employee_project.tracing import TracingMixin
+
+from .models import Job
+from .queue import cancel, enqueue, result_path
+from .serializers import JobSerializer, validate_params
+
+ASYNC_PARAM = 'async'
+
+
+def wants_async(request):
+    """True when the client asked for a background job (?async=1)"""
+    return request.query_params.get(ASYNC_PARAM, '').lower() in ('1', 'true', 'yes')
+
+
+def accepted(request, job):
+    """202 Accepted pointing at the job to poll"""
+    url = reverse('job-detail', args=[job.pk], request=request)
+    data = JobSerializer(job, context={'request': request}).data
+    return Response(data, status=status.HTTP_202_ACCEPTED, headers={'Location': url})
+
+
+def submit_job(request, kind, params):
+    """Validate params for `kind`, queue the job for the requesting user and answer 202"""
+    job = enqueue(kind, validate_params(kind, params), user=request.user)
+    return accepted(request, job)
+
+
+class JobViewSet(TracingMixin, mixins.CreateModelMixin, mixins.ListModelMixin,
+                 mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Background jobs: submit with POST {"kind": ..., "params": {...}}, poll the
+    job until it has succeeded, then download its result.
+    Users see their own jobs; staff see every job.
+    """
+    queryset = Job.objects.select_related('created_by').all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ['status', 'kind']
+    ordering_fields = ['created_at', 'started_at', 'finished_at']
+    ordering = ['-created_at']
+
+    def dispatch(self, request, *args, **kwargs):
+        # Workers update jobs on the primary; a lagging replica would show stale progress
+        with use_primary():
+            return super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'swagger_fake_view', False):  # schema generation has no user
+            return queryset.none()
+        if not self.request.user.is_staff:
+            queryset = queryset.filter(created_by=self.request.user)
+        return queryset
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        job = enqueue(serializer.validated_data['kind'], serializer.validated_data['params'], user=request.user)
+        return accepted(request, job)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a queued job, or ask a running job to stop"""
+        job = self.get_object()
+        if job.is_finished:
+            return Response(
+                {'error': f'Job has already {job.status}'},
+                status=status.HTTP_409_CONFLICT
+            )
+        cancel(job)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
+
+    @action(detail=True, methods=['get'])
+    def result(self, request, pk=None):
+        """Download the result file of a succeeded job"""
+        job = self.get_object()
+        if job.status != Job.SUCCEEDED:
+            return Response(
+                {'error': 'Job has not succeeded', 'status': job.status},
+                status=status.HTTP_409_CONFLICT
+            )
+        path = result_path(job)
+        if path is None:
+            return Response(job.result)
+        if not path.exists():
+            return Response({'error': 'Result file has been removed'}, status=status.HTTP_410_GONE)
+        return FileResponse(
+            open(path, 'rb'), as_attachment=True, filename=path.name,
+            content_type=job.result_content_type or 'application/octet-stream',
+        )
@@ -0,0 +1,127 @@
+"""
+The `runworker` loop: claim queued jobs and run them in a thread or process pool.
+
+Threads suit jobs that mostly wait on the database (exports). Processes
+(spawned, each with its own Django setup and connections) suit CPU-heavy
+reports. On SIGINT/SIGTERM the worker stops claiming and lets running jobs
+finish.
+"""
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from django.db import connections
+
+from . import processes
+from .queue import (
+    claim, get_jobs_settings, heartbeat, prune_finished, requeue_lost, requeue_stale, run_job,
+)
+
+MAINTENANCE_SECONDS = 60
+
+
+class Worker:
+    def __init__(self, concurrency=2, pool='thread', kinds=None, name=None, poll_interval=None, stdout=None):
+        self.config = get_jobs_settings()
+        self.concurrency = max(1, concurrency)
+        self.pool = pool
+        self.kinds = kinds or None
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval if poll_interval is not None else self.config['POLL_INTERVAL']
+        self.stdout = stdout
+        self.stopping = threading.Event()
+        self.processed = 0
+
+    def _log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def _executor(self):
+        if self.pool == 'process':
+            # spawn, not fork: children must not share the parent's DB connections
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=processes.setup,
+            )
+        return ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='job')
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+    def _maintenance(self):
+        requeued, failed = requeue_stale(self.config)
+        if requeued or failed:
+            self._log(f'Requeued {requeued} stale job(s), failed {failed}')
+        pruned = prune_finished(self.config)
+        if pruned:
+            self._log(f'Pruned {pruned} old job(s)')
+
+    def run(self, burst=False):
+        """Process jobs until stopped, or with burst=True until the queue is empty"""
+        self._install_signal_handlers()
+        self._log(f'Worker {self.name}: {self.concurrency} {self.pool}(s)')
+        running = {}  # future -> job id
+        last_heartbeat = last_maintenance = 0.0
+        announced_stop = broken = False
+        executor = self._executor()
+        target = processes.run if self.pool == 'process' else run_job
+        try:
+            while True:
+                stopping = self.stopping.is_set()
+                now = time.monotonic()
+                if not stopping and now - last_maintenance >= MAINTENANCE_SECONDS:
+                    self._maintenance()
+                    last_maintenance = now
+                if running and now - last_heartbeat >= self.config['HEARTBEAT_SECONDS']:
+                    heartbeat(list(running.values()))
+                    last_heartbeat = now
+
+                if broken and not running:
+                    # A pool process died, which breaks the whole pool
+                    executor.shutdown(wait=True)
+                    executor = self._executor()
+                    broken = False
+                while not stopping and not broken and len(running) < self.concurrency:
+                    job = claim(self.name, self.kinds)
+                    if job is None:
+                        break
+                    self._log(f'Started {job.kind} {job.pk}')
+                    running[executor.submit(target, job.pk)] = job.pk
+
+                if not running and not broken:
+                    if burst or stopping:
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    continue
+                if stopping and not announced_stop:
+                    self._log(f'Stopping: waiting for {len(running)} running job(s)')
+                    announced_stop = True
+                done, _ = wait(running, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = running.pop(future)
+                    try:
+                        outcome = future.result()
+                    except BrokenProcessPool:
+                        broken = True
+                        requeue_lost([job_id], self.config)
+                        outcome = 'worker process died; requeued'
+                    except Exception as e:  # e.g. the database was unreachable to record the outcome
+                        requeue_lost([job_id], self.config)
+                        outcome = f'{type(e).__name__}: {e}; requeued'
+                    self.processed += 1
+                    self._log(f'Finished {job_id}: {outcome}')
+        finally:
+            executor.shutdown(wait=True)
+        connections.close_all()
+        return self.processed
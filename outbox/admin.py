@@ -0,0 +1,22 @@
+from django.contrib import admin
+from .models import Delivery, EndpointLease, OutboxEvent
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event_type', 'object_id', 'created_at', 'dispatched_at']
+    list_filter = ['event_type', 'created_at']
+    search_fields = ['object_id', 'traceparent']
+    ordering = ['-id']
+    readonly_fields = ['id', 'event_type', 'model', 'object_id', 'payload', 'traceparent', 'created_at', 'dispatched_at']
+
+@admin.register(Delivery)
+class DeliveryAdmin(admin.ModelAdmin):
+    list_display = ['id', 'event', 'endpoint', 'status', 'attempts', 'next_attempt_at', 'delivered_at']
+    list_filter = ['status', 'endpoint']
+    ordering = ['-id']
+    readonly_fields = ['event', 'endpoint', 'attempts', 'next_attempt_at', 'last_error', 'delivered_at']
+
+@admin.register(EndpointLease)
+class EndpointLeaseAdmin(admin.ModelAdmin):
+    list_display = ['endpoint', 'holder', 'expires_at']
+    readonly_fields = ['endpoint', 'holder', 'expires_at']
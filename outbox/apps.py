@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class OutboxConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'outbox'
+
+    def ready(self):
+        from .signals import connect_signals
+        connect_signals()
@@ -0,0 +1,305 @@
+"""
+Transactional outbox: deliver outbox events to HTTP endpoints in batches.
+
+Model signals write an OutboxEvent in the same transaction as each change
+(see signals.py). `manage.py dispatch_outbox` runs the Dispatcher, which
+repeats two steps:
+
+1. Fan out. Claim the oldest undispatched events and create one Delivery
+   per endpoint whose `events` patterns match the event type.
+2. Deliver. For each endpoint, take its oldest pending deliveries, up to
+   BATCH_SIZE. Several events for the same row collapse into the newest one,
+   whose `coalesced` field counts the events it stands for. The batch is sent
+   as one POST {"events": [...]}.
+
+Each endpoint is leased (EndpointLease) by one dispatcher at a time, taken
+with a compare-and-set and renewed before every batch. Several dispatch_outbox
+processes can run for availability; an endpoint whose holder stops is taken
+over LEASE_SECONDS later. LEASE_SECONDS must be well above TIMEOUT, so a lease
+cannot lapse while its holder is still posting a batch.
+
+A 2xx response marks the batch delivered. A network error, a timeout, or a
+408, 425, 429 or 5xx response schedules a retry of the whole batch. The wait
+is BACKOFF_BASE * 2**(attempt - 1) seconds, capped at BACKOFF_MAX, with
+jitter. While a batch waits, later events for the endpoint wait too, so each
+endpoint receives the events in order. A batch is marked failed after
+MAX_ATTEMPTS, or at once on any other response. The endpoint then moves on.
+`dispatch_outbox --retry-failed` queues failed deliveries again.
+
+Delivery is at least once: a consumer should skip event ids it has already
+applied. When the endpoint has a secret, each request is signed:
+X-Outbox-Signature: sha256=<hex HMAC-SHA256 of the body>. A batch whose events
+all come from one traced request carries that request's traceparent header.
+
+    OUTBOX = {
+        'ENDPOINTS': [{'url': 'https://payroll.internal/hooks/employees', 'secret': '...',
+                       'events': ['employee.*', 'attendance.*']}],
+        'BATCH_SIZE': 100,
+        'MAX_ATTEMPTS': 10,
+    }
+"""
+import fnmatch
+import hashlib
+import hmac
+import json
+import os
+import random
+import signal
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from employee_project.routers import use_primary
+
+from .models import Delivery, EndpointLease, OutboxEvent
+
+OUTBOX_DEFAULTS = {
+    # [{'url': ..., 'name': ..., 'secret': ..., 'events': ['employee.*', ...]}]
+    'ENDPOINTS': [],
+    'BATCH_SIZE': 100,
+    'POLL_INTERVAL': 1.0,
+    'TIMEOUT': 10,
+    'MAX_ATTEMPTS': 10,
+    'BACKOFF_BASE': 2.0,
+    'BACKOFF_MAX': 600,
+    'RETENTION_DAYS': 7,
+    'LEASE_SECONDS': 60,
+}
+
+ENDPOINT_DEFAULTS = {
+    'name': None,
+    'secret': '',
+    'events': ['*'],
+}
+
+RETRYABLE_STATUSES = {408, 425, 429}
+MAINTENANCE_SECONDS = 300
+
+
+def get_outbox_settings():
+    return {**OUTBOX_DEFAULTS, **getattr(settings, 'OUTBOX', {})}
+
+
+def get_endpoints(config=None):
+    """The configured endpoints with defaults filled in; an endpoint without a name is named by its URL"""
+    endpoints = []
+    for endpoint in (config or get_outbox_settings())['ENDPOINTS']:
+        endpoint = {**ENDPOINT_DEFAULTS, **endpoint}
+        endpoint['name'] = endpoint['name'] or endpoint['url']
+        endpoints.append(endpoint)
+    return endpoints
+
+
+class DeliveryError(Exception):
+    def __init__(self, message, retryable=True):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def backoff(attempt, config):
+    """Seconds to wait before retry number `attempt` (1-based)"""
+    delay = min(config['BACKOFF_BASE'] * 2 ** (attempt - 1), config['BACKOFF_MAX'])
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def matches(endpoint, event_type):
+    return any(fnmatch.fnmatchcase(event_type, pattern) for pattern in endpoint['events'])
+
+
+def fan_out(endpoints, limit):
+    """Create the deliveries of up to `limit` undispatched events; returns how many events were claimed"""
+    with transaction.atomic():
+        events = list(
+            OutboxEvent.objects.filter(dispatched_at__isnull=True).order_by('id')
+            .values_list('id', 'event_type')[:limit]
+        )
+        if not events:
+            return 0
+        claimed = OutboxEvent.objects.filter(
+            pk__in=[pk for pk, _ in events], dispatched_at__isnull=True
+        ).update(dispatched_at=timezone.now())
+        if claimed != len(events):  # another dispatcher took some of them; try again next pass
+            transaction.set_rollback(True)
+            return 0
+        Delivery.objects.bulk_create([
+            Delivery(event_id=pk, endpoint=endpoint['name'])
+            for pk, event_type in events for endpoint in endpoints if matches(endpoint, event_type)
+        ], batch_size=1000)
+    return len(events)
+
+
+def acquire_lease(endpoint, holder, seconds):
+    """Take or renew the endpoint's lease for `holder`; False while another dispatcher holds it"""
+    now = timezone.now()
+    EndpointLease.objects.get_or_create(endpoint=endpoint, defaults={'expires_at': now})
+    return EndpointLease.objects.filter(endpoint=endpoint).filter(
+        Q(holder=holder) | Q(expires_at__lte=now)
+    ).update(holder=holder, expires_at=now + timedelta(seconds=seconds)) == 1
+
+
+def release_leases(holder):
+    EndpointLease.objects.filter(holder=holder).update(holder='', expires_at=timezone.now())
+
+
+def coalesce(events):
+    """The newest event of each row, oldest first, each with the number of events it replaces"""
+    latest = {}
+    counts = Counter()
+    for event in events:
+        key = (event.model, event.object_id) if event.object_id is not None else (event.model, -event.id)
+        latest[key] = event
+        counts[key] += 1
+    return sorted(((event, counts[key]) for key, event in latest.items()), key=lambda item: item[0].id)
+
+
+def event_document(event, coalesced=1):
+    return {
+        'id': event.id,
+        'type': event.event_type,
+        'model': event.model,
+        'object_id': event.object_id,
+        'occurred_at': event.created_at,
+        'data': event.payload,
+        'traceparent': event.traceparent or None,
+        'coalesced': coalesced,
+    }
+
+
+def post(endpoint, events, timeout):
+    """POST one batch; raises DeliveryError unless the endpoint answers 2xx"""
+    body = json.dumps({'events': events}, cls=DjangoJSONEncoder).encode()
+    headers = {'Content-Type': 'application/json', 'User-Agent': 'employee-project-outbox'}
+    if endpoint['secret']:
+        digest = hmac.new(endpoint['secret'].encode(), body, hashlib.sha256).hexdigest()
+        headers['X-Outbox-Signature'] = f'sha256={digest}'
+    traceparents = {event['traceparent'] for event in events}
+    if len(traceparents) == 1 and None not in traceparents:
+        headers['traceparent'] = traceparents.pop()
+    request = urllib.request.Request(endpoint['url'], data=body, headers=headers, method='POST')
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+    except urllib.error.HTTPError as e:
+        raise DeliveryError(f'HTTP {e.code}', retryable=e.code >= 500 or e.code in RETRYABLE_STATUSES)
+    except OSError as e:  # refused, unreachable, DNS, timeout
+        raise DeliveryError(f'{type(e).__name__}: {e}')
+
+
+def retry_failed(endpoint=None):
+    """Queue failed deliveries again; returns how many"""
+    failed = Delivery.objects.filter(status=Delivery.FAILED)
+    if endpoint:
+        failed = failed.filter(endpoint=endpoint)
+    return failed.update(status=Delivery.PENDING, attempts=0, next_attempt_at=None)
+
+
+def prune(config=None):
+    """Delete settled events older than RETENTION_DAYS with their deliveries; returns how many events"""
+    config = config or get_outbox_settings()
+    old = OutboxEvent.objects.filter(
+        created_at__lt=timezone.now() - timedelta(days=config['RETENTION_DAYS']), dispatched_at__isnull=False,
+    ).exclude(deliveries__status=Delivery.PENDING)
+    _, deleted = old.delete()
+    return deleted.get(OutboxEvent._meta.label, 0)
+
+
+class Dispatcher:
+    def __init__(self, batch_size=None, poll_interval=None, stdout=None):
+        self.config = get_outbox_settings()
+        self.endpoints = get_endpoints(self.config)
+        self.batch_size = batch_size or self.config['BATCH_SIZE']
+        self.poll_interval = poll_interval if poll_interval is not None else self.config['POLL_INTERVAL']
+        self.stdout = stdout
+        self.stopping = threading.Event()
+        self.holder = f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        self.delivered = 0
+        self.failed = 0
+
+    def _log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def stop(self, *args):
+        self.stopping.set()
+
+    def _install_signal_handlers(self):
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+    def deliver(self, endpoint):
+        """Send the endpoint's next batch; returns how many deliveries it settled"""
+        if not acquire_lease(endpoint['name'], self.holder, self.config['LEASE_SECONDS']):
+            return 0  # another dispatcher is sending to this endpoint
+        pending = list(
+            Delivery.objects.filter(endpoint=endpoint['name'], status=Delivery.PENDING)
+            .select_related('event').order_by('event_id')[:self.batch_size]
+        )
+        now = timezone.now()
+        if not pending or (pending[0].next_attempt_at and pending[0].next_attempt_at > now):
+            return 0  # nothing to send, or waiting to retry: later events must not overtake
+        attempt = pending[0].attempts + 1
+        events = [event_document(event, count) for event, count in coalesce([d.event for d in pending])]
+        batch = Delivery.objects.filter(pk__in=[d.pk for d in pending])
+        started = time.perf_counter()
+        try:
+            post(endpoint, events, self.config['TIMEOUT'])
+        except DeliveryError as e:
+            if e.retryable and attempt < self.config['MAX_ATTEMPTS']:
+                delay = backoff(attempt, self.config)
+                batch.update(
+                    attempts=attempt, last_error=str(e)[:1000], next_attempt_at=now + timedelta(seconds=delay)
+                )
+                self._log(f"{endpoint['name']}: {e}; retry {attempt} of {len(pending)} event(s) in {delay:.1f}s")
+                return 0
+            batch.update(status=Delivery.FAILED, attempts=attempt, last_error=str(e)[:1000])
+            self.failed += len(pending)
+            self._log(f"{endpoint['name']}: {e}; gave up on {len(pending)} event(s)")
+            return len(pending)
+        batch.update(status=Delivery.DELIVERED, attempts=attempt, last_error='', delivered_at=timezone.now())
+        self.delivered += len(pending)
+        self._log(
+            f"{endpoint['name']}: delivered {len(pending)} event(s) as {len(events)} "
+            f"in {(time.perf_counter() - started) * 1000:.0f}ms"
+        )
+        return len(pending)
+
+    def run(self, burst=False):
+        """Dispatch until stopped, or with burst=True until nothing is due"""
+        self._install_signal_handlers()
+        self._log(f'Dispatching to {len(self.endpoints)} endpoint(s)')
+        # Events are read right after they are written: never from a lagging replica
+        with use_primary():
+            try:
+                self._loop(burst)
+            finally:
+                release_leases(self.holder)
+        return self.delivered
+
+    def _loop(self, burst):
+        last_maintenance = 0.0
+        while not self.stopping.is_set():
+            if time.monotonic() - last_maintenance >= MAINTENANCE_SECONDS:
+                pruned = prune(self.config)
+                if pruned:
+                    self._log(f'Pruned {pruned} old event(s)')
+                last_maintenance = time.monotonic()
+            claimed = fan_out(self.endpoints, self.batch_size * 10)
+            settled = sum(self.deliver(endpoint) for endpoint in self.endpoints)
+            if claimed or settled:
+                continue
+            if burst:
+                break
+            close_old_connections()
+            self.stopping.wait(self.poll_interval)
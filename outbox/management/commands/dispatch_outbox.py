@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from outbox.dispatcher import Dispatcher, get_endpoints, retry_failed
+
+
+class Command(BaseCommand):
+    help = 'Deliver outbox events to the configured webhook endpoints in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Events per request to an endpoint (default: OUTBOX["BATCH_SIZE"], 100)'
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            help='Seconds between polls when nothing is due (default: OUTBOX["POLL_INTERVAL"])'
+        )
+        parser.add_argument(
+            '--retry-failed',
+            action='store_true',
+            help='Queue the deliveries that have failed for good again before dispatching'
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit once nothing is due instead of waiting for new events'
+        )
+
+    def handle(self, *args, **options):
+        if not get_endpoints():
+            raise CommandError('No endpoints configured; set OUTBOX_WEBHOOK_URLS')
+        if options['retry_failed']:
+            self.stdout.write(f'Queued {retry_failed()} failed deliveries again')
+        dispatcher = Dispatcher(
+            batch_size=options['batch_size'],
+            poll_interval=options['poll_interval'],
+            stdout=self.stdout,
+        )
+        delivered = dispatcher.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Dispatcher stopped after delivering {delivered} event(s) ({dispatcher.failed} failed)'
+        ))
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-19 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('outbox', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EndpointLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=200, unique=True)),
+                ('holder', models.CharField(blank=True, max_length=100)),
+                ('expires_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'Endpoint Lease',
+                'verbose_name_plural': 'Endpoint Leases',
+            },
+        ),
+    ]
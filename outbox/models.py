@@ -0,0 +1,78 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+
+
+class OutboxEvent(models.Model):
+    """A change to publish, written in the same transaction as the change itself"""
+    id = models.BigAutoField(primary_key=True)
+    event_type = models.CharField(max_length=50)
+    model = models.CharField(max_length=100)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    payload = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    traceparent = models.CharField(max_length=55, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Set once the dispatcher has created a Delivery per matching endpoint
+    dispatched_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Outbox Event'
+        verbose_name_plural = 'Outbox Events'
+        indexes = [
+            models.Index(
+                fields=['id'], condition=Q(dispatched_at__isnull=True), name='outbox_event_undispatched',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.id} {self.event_type} {self.object_id}'
+
+
+class Delivery(models.Model):
+    """One event on its way to one endpoint"""
+    PENDING = 'pending'
+    DELIVERED = 'delivered'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (DELIVERED, 'Delivered'),
+        (FAILED, 'Failed'),
+    ]
+
+    event = models.ForeignKey(OutboxEvent, on_delete=models.CASCADE, related_name='deliveries')
+    endpoint = models.CharField(max_length=200)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['event_id']
+        verbose_name = 'Delivery'
+        verbose_name_plural = 'Deliveries'
+        indexes = [
+            # The next batch of an endpoint: its oldest pending deliveries
+            models.Index(fields=['endpoint', 'status', 'event'], name='outbox_delivery_next'),
+        ]
+
+    def __str__(self):
+        return f'{self.event_id} -> {self.endpoint} ({self.status})'
+
+
+class EndpointLease(models.Model):
+    """
+    Which dispatcher may send to an endpoint, until when. One holder at a time
+    keeps each endpoint's batches in order and stops them being sent twice.
+    """
+    endpoint = models.CharField(max_length=200, unique=True)
+    holder = models.CharField(max_length=100, blank=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = 'Endpoint Lease'
+        verbose_name_plural = 'Endpoint Leases'
+
+    def __str__(self):
+        return f'{self.endpoint} -> {self.holder} until {self.expires_at}'
@@ -0,0 +1,77 @@
+"""
+Outbox events written by model signals.
+
+Every save and delete of an Employee, Attendance or Performance row appends
+one OutboxEvent on the writing connection. The insert runs inside the
+caller's transaction, so an event exists exactly when its change was
+committed. Nothing is sent from the request: the write path only pays for
+one small INSERT. Events are only written while OUTBOX['ENDPOINTS'] is set.
+
+Event types are `<model>.created`, `<model>.updated` and `<model>.deleted`.
+The payload is the row's field values at the time of the write. A raw SQL
+load (seed_data --bulk, restore_snapshot) reports no rows and appends one
+`<model>.reloaded` event without a payload.
+"""
+from django.db import router
+from django.db.models.signals import post_delete, post_save
+
+from employee_project.tracing import current_span
+from employees.signals import bulk_change
+
+from .models import OutboxEvent
+from .dispatcher import get_outbox_settings
+
+BULK_BATCH_SIZE = 1000
+
+
+def published_models():
+    from attendance.models import Attendance, Performance
+    from employees.models import Employee
+    return (Employee, Attendance, Performance)
+
+
+def _payload(instance):
+    return {field.attname: field.value_from_object(instance) for field in instance._meta.concrete_fields}
+
+
+def _event(model, verb, pk=None, payload=None):
+    span = current_span()
+    return OutboxEvent(
+        event_type=f'{model._meta.model_name}.{verb}', model=model._meta.label_lower,
+        object_id=pk, payload=payload, traceparent=span.traceparent if span is not None else '',
+    )
+
+
+def _enabled():
+    return bool(get_outbox_settings()['ENDPOINTS'])
+
+
+def _publish_save(sender, instance, created, using=None, **kwargs):
+    if _enabled():
+        _event(sender, 'created' if created else 'updated', instance.pk, _payload(instance)).save(using=using)
+
+
+def _publish_delete(sender, instance, using=None, **kwargs):
+    if _enabled():
+        _event(sender, 'deleted', instance.pk, _payload(instance)).save(using=using)
+
+
+def _publish_bulk(sender, pks=None, created=False, **kwargs):
+    if not _enabled():
+        return
+    if pks is None:
+        _event(sender, 'reloaded').save()
+        return
+    verb = 'created' if created else 'updated'
+    # From the primary: the rows may not be committed yet
+    rows = sender._base_manager.using(router.db_for_write(sender)).filter(pk__in=pks).order_by('pk')
+    events = [_event(sender, verb, instance.pk, _payload(instance)) for instance in rows]
+    OutboxEvent.objects.bulk_create(events, batch_size=BULK_BATCH_SIZE)
+
+
+def connect_signals():
+    for model in published_models():
+        uid = f'outbox-{model._meta.label_lower}'
+        post_save.connect(_publish_save, sender=model, dispatch_uid=f'{uid}-save')
+        post_delete.connect(_publish_delete, sender=model, dispatch_uid=f'{uid}-delete')
+        bulk_change.connect(_publish_bulk, sender=model, dispatch_uid=f'{uid}-bulk')
@@ -1,8 +1,42 @@
+import os
+from datetime import date
 import pytest
+from django.conf import settings
+from django.core.cache import caches
+from django.test import override_settings
 from django.contrib.auth.models import User
 from rest_framework.test import APIClient
 from rest_framework_simplejwt.tokens import RefreshToken
 from faker import Faker
+from outbox.models import OutboxEvent
+from changefeed.models import ChangeLog
+from employees.revocation import revocation_list
+from employees.snapshots import (
+    Snapshot, build_snapshot, clear_tables, compatibility_key, restore_snapshot, snapshot_key,
+    snapshot_path,
+)
+
+# Dataset behind the seeded_dataset fixture; TEST_SNAPSHOT=<name> loads another snapshot
+TEST_DATASET = {'employees': 200, 'days': 30, 'departments': 8, 'seed': 42}
+
+@pytest.fixture(scope='session', autouse=True)
+def isolated_cache(tmp_path_factory):
+    # The shared SQLite cache must not be the developer's var/cache.sqlite3
+    config = settings.CACHES['default']
+    if config['BACKEND'] != 'employee_project.cache.SQLiteCache':
+        yield
+        return
+    location = str(tmp_path_factory.mktemp('cache') / 'cache.sqlite3')
+    with override_settings(CACHES={**settings.CACHES, 'default': {**config, 'LOCATION': location}}):
+        yield
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    # Cached payloads must not leak between tests whose writes were rolled back
+    for cache in caches.all():
+        cache.clear()
+    revocation_list.clear()
+    yield
 
 @pytest.fixture(scope='session')
 def faker_seeded():
@@ -24,3 +58,36 @@ def auth_client(api_client, user_db):
     refresh = RefreshToken.for_user(user_db)
     api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {str(refresh.access_token)}')
     return api_client
+
+@pytest.fixture(scope='session')
+def dataset_snapshot(request, django_db_setup, django_db_blocker):
+    """
+    The test snapshot, read into memory once per session. It is built with the
+    bulk seeder on first use and kept in the pytest cache directory. The name
+    includes the database vendor, the migration state and the build date: the
+    seeded dates are relative to the day they were built.
+    """
+    if os.environ.get('TEST_SNAPSHOT'):
+        path = snapshot_path(os.environ['TEST_SNAPSHOT'])
+        if not path.exists():
+            pytest.fail(f'TEST_SNAPSHOT={os.environ["TEST_SNAPSHOT"]}: no snapshot at {path}')
+        return Snapshot.load(path)
+
+    directory = request.config.cache.mkdir('snapshots')
+    prefix = snapshot_key(**TEST_DATASET)
+    path = directory / f'{prefix}-{compatibility_key()}-{date.today():%Y%m%d}.snap'
+    if not path.exists():
+        for stale in directory.glob(f'{prefix}-*.snap'):
+            stale.unlink()
+        with django_db_blocker.unblock():
+            build_snapshot(path, **TEST_DATASET)
+            clear_tables()
+            # The build's change log and outbox rows were committed too
+            ChangeLog.objects.all().delete()
+            OutboxEvent.objects.all().delete()
+    return Snapshot.load(path)
+
+@pytest.fixture
+def seeded_dataset(db, dataset_snapshot):
+    """The snapshot restored into the test database; rolled back after the test"""
+    return restore_snapshot(dataset_snapshot)
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from io import StringIO
+import json
+import pytest
+from django.core.management import call_command
+from attendance.models import Attendance
+from attendance.reports import build_report, comparable, reference_report, shard_metrics, year_range
+from employees.models import Department, Employee
+
+np = pytest.importorskip('numpy')
+
+
+def test_shard_metrics_counts_absence_runs():
+    # Employee 1: present Jan 29, absent Jan 30-Feb 1 (one run, starting in January), absent Feb 3.
+    # Employee 2: absent Jan 31-Feb 1, late Feb 2.
+    days = {d: (date(2025, 1, 1) + timedelta(days=d)) for d in range(40)}
+    epoch = date(1970, 1, 1).toordinal()
+    rows = [
+        (1, days[28], 0), (1, days[29], 2), (1, days[30], 2), (1, days[31], 2), (1, days[33], 2),
+        (2, days[30], 2), (2, days[31], 2), (2, days[32], 1),
+    ]
+    employee = np.array([r[0] for r in rows], dtype=np.int64)
+    day = np.array([r[1].toordinal() - epoch for r in rows], dtype=np.int32)
+    status = np.array([r[2] for r in rows], dtype=np.int8)
+    ids, per_employee, per_month = shard_metrics(employee, day, status)
+    assert ids.tolist() == [1, 2]
+    assert per_employee.tolist() == [[1, 0, 4, 2, 3], [0, 1, 2, 1, 2]]
+    assert per_month[0].tolist() == [1, 0, 3, 2, 3]  # January: both long runs start there
+    assert per_month[1].tolist() == [0, 1, 3, 1, 1]  # February: only the Feb 3 run starts there
+
+
+def test_parallel_report_matches_reference(seeded_dataset):
+    # Employees without a department-mate or any attendance still appear
+    lonely = Employee.objects.create(
+        name='No Records', email='none@example.com', phone_number='+12345678901', address='Addr',
+        date_of_joining=date(2022, 1, 1), department=Department.objects.create(name='Empty'),
+    )
+    start, end = year_range(date.today().year)
+    start = min(start, date.today() - timedelta(days=60))
+    reference = reference_report(start, end)
+    for shard_by, shards in (('employee', 7), ('department', None)):
+        report = build_report(start, end, workers=1, shard_by=shard_by, shards=shards)
+        assert comparable(report) == comparable(reference)
+    assert reference['company']['records'] == Attendance.objects.filter(date__range=(start, end)).count()
+    assert reference['company']['absence_runs'] > 0
+    empty = next(row for row in reference['employees'] if row['id'] == lonely.pk)
+    assert empty['records'] == 0 and empty['attendance_rate'] == 0.0
+    assert [row['rank'] for row in reference['departments']] == list(range(1, 10))
+
+
+def test_annual_report_command_writes_json_and_csv(seeded_dataset, tmp_path):
+    out = StringIO()
+    call_command(
+        'annual_report', '--workers', '1', '--verify', '--json', str(tmp_path / 'report.json'),
+        '--csv-dir', str(tmp_path), stdout=out,
+    )
+    assert 'Parallel and reference reports match' in out.getvalue()
+    report = json.loads((tmp_path / 'report.json').read_text())
+    assert len(report['months']) == 12 and len(report['employees']) == 200
+    assert (tmp_path / 'departments.csv').read_text().startswith('id,name,employees,records')
+    assert len((tmp_path / 'employees.csv').read_text().splitlines()) == 201
@@ -0,0 +1,111 @@
+import threading
+import pytest
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.exceptions import Throttled
+from employees import throttling
+from employees.throttling import get_rejection_counts, hashing_slot, reset_rejection_counts
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_counts():
+    reset_rejection_counts()
+
+
+def login(client, username, addr='10.0.0.1'):
+    return client.post(
+        reverse('auth_login'), {'username': username, 'password': 'wrong'},
+        format='json', REMOTE_ADDR=addr,
+    )
+
+
+@override_settings(AUTH_THROTTLE={'RATES': {'login_ip': '3/min', 'login_username': None}})
+def test_login_throttled_per_ip_before_any_query(api_client, django_assert_num_queries):
+    for _ in range(3):
+        assert login(api_client, 'nobody').status_code == 401
+    with django_assert_num_queries(0):
+        resp = login(api_client, 'nobody')
+    assert resp.status_code == 429
+    assert 'Retry-After' in resp
+    assert login(api_client, 'nobody', addr='10.0.0.2').status_code == 401
+    assert get_rejection_counts() == {'login_ip': 1}
+
+
+@override_settings(AUTH_THROTTLE={'RATES': {'login_ip': '2/min', 'login_username': None}})
+def test_rotating_forwarded_for_does_not_escape_the_ip_throttle(api_client):
+    statuses = [
+        api_client.post(
+            reverse('auth_login'), {'username': 'nobody', 'password': 'wrong'}, format='json',
+            REMOTE_ADDR='10.0.0.9', HTTP_X_FORWARDED_FOR=f'198.51.100.{i}',
+        ).status_code
+        for i in range(3)
+    ]
+    assert statuses == [401, 401, 429]
+
+
+@override_settings(AUTH_THROTTLE={'RATES': {'login_ip': None, 'login_username': '2/min'}})
+def test_login_throttled_per_username_across_addresses(api_client):
+    assert login(api_client, 'Victim', addr='10.0.0.1').status_code == 401
+    assert login(api_client, 'victim', addr='10.0.0.2').status_code == 401
+    assert login(api_client, 'victim', addr='10.0.0.3').status_code == 429
+    assert login(api_client, 'someone-else', addr='10.0.0.3').status_code == 401
+    assert get_rejection_counts() == {'login_username': 1}
+
+
+@override_settings(AUTH_THROTTLE={'RATES': {'register_ip': '1/min'}})
+def test_register_throttled_per_ip(api_client):
+    url = reverse('auth_register')
+    assert api_client.post(url, {'username': 'a1', 'password': 'pw123456'}, format='json').status_code == 201
+    assert api_client.post(url, {'username': 'a2', 'password': 'pw123456'}, format='json').status_code == 429
+
+
+@override_settings(AUTH_THROTTLE={'MAX_CONCURRENT_HASHING': 1})
+def test_hashing_concurrency_cap():
+    entered, release = threading.Event(), threading.Event()
+
+    def hold_slot():
+        with hashing_slot():
+            entered.set()
+            release.wait(5)
+
+    holder = threading.Thread(target=hold_slot)
+    holder.start()
+    entered.wait(5)
+    try:
+        with pytest.raises(Throttled):
+            with hashing_slot():
+                pass
+    finally:
+        release.set()
+        holder.join()
+    with hashing_slot():
+        pass
+    assert get_rejection_counts() == {'hashing_concurrency': 1}
+
+
+@override_settings(AUTH_THROTTLE={'MAX_CONCURRENT_HASHING': 2})
+def test_hashing_slots_are_shared_across_workers():
+    # Slots taken by other worker processes are keys in the shared cache
+    cache = caches['default']
+    cache.add(throttling.HASHING_SLOT_KEY.format(0), 'other-worker', timeout=30)
+    with hashing_slot():
+        with pytest.raises(Throttled):
+            with hashing_slot():
+                pass
+    cache.delete(throttling.HASHING_SLOT_KEY.format(0))
+    with hashing_slot():
+        with hashing_slot():
+            pass
+
+
+def test_throttle_stats_admin_only(api_client, user_db):
+    api_client.force_authenticate(user_db)
+    assert api_client.get(reverse('auth_throttle_stats')).status_code == 403
+    user_db.is_staff = True
+    user_db.save()
+    throttling.record_rejection('login_ip')
+    data = api_client.get(reverse('auth_throttle_stats')).json()
+    assert data['rejections'] == {'login_ip': 1}
@@ -0,0 +1,39 @@
+import pytest
+from employee_project.benchmark import (
+    SCALES, compare_to_baseline, endpoint_paths, run_suite, seed_dataset,
+)
+from employees.models import Department, Employee
+
+pytestmark = pytest.mark.django_db
+
+
+def test_seed_is_deterministic():
+    seed_dataset(SCALES['tiny'], seed=7)
+    first = list(Employee.objects.order_by('email').values_list('name', 'phone_number', 'department__name'))
+    Department.objects.all().delete()
+    seed_dataset(SCALES['tiny'], seed=7)
+    assert list(Employee.objects.order_by('email').values_list('name', 'phone_number', 'department__name')) == first
+    assert len(first) == SCALES['tiny'].employees
+
+
+def test_suite_measures_every_endpoint():
+    seed_dataset(SCALES['tiny'])
+    results = run_suite(repeat=2)
+    assert set(results) == {name for name, _ in endpoint_paths()}
+    for name, result in results.items():
+        assert result['status'] == 200, name
+        assert result['queries'] >= 1 and result['median_ms'] > 0 and result['bytes'] > 0
+
+
+def test_regressions_beyond_threshold_are_reported():
+    base = {'median_ms': 10.0, 'p95_ms': 12.0, 'cold_ms': 20.0, 'queries': 3, 'peak_kb': 100.0, 'status': 200}
+    baseline = {'results': {'employees-list': base}}
+
+    assert compare_to_baseline({'employees-list': {**base, 'median_ms': 12.0}}, baseline, 0.25) == []
+    regressions = compare_to_baseline(
+        {'employees-list': {**base, 'median_ms': 14.0, 'queries': 4}}, baseline, 0.25
+    )
+    assert len(regressions) == 2
+    assert compare_to_baseline({'employees-list': {'status': 500}}, baseline) == [
+        'employees-list: HTTP 500 (baseline 200)'
+    ]
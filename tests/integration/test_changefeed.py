@@ -0,0 +1,201 @@
+from datetime import date, timedelta
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from attendance.models import Attendance
+from changefeed import feed as feed_module
+from changefeed.models import ChangeLog
+from employees.models import Department, Employee
+from employees.signals import bulk_change
+
+URL = reverse('change-list')
+
+
+@pytest.fixture(autouse=True)
+def changefeed_settings(settings):
+    settings.CHANGEFEED = {'SETTLE_SECONDS': 0}
+
+
+def make_employee(dept, i):
+    return Employee.objects.create(
+        name=f'Worker {i}', email=f'w{i}@example.com', phone_number='+12345678901',
+        address='Addr', date_of_joining=date(2022, 1, 1), department=dept,
+    )
+
+
+def feed(client, **params):
+    resp = client.get(URL, params)
+    assert resp.status_code == 200
+    return resp.json()
+
+
+def test_feed_pages_through_creates_updates_and_cascaded_deletes(auth_client, db):
+    start = auth_client.get(reverse('change-head')).json()['cursor']
+    dept = Department.objects.create(name='Ops')
+    employee = make_employee(dept, 1)
+    record = Attendance.objects.create(employee=employee, date=date.today(), status='present')
+    employee.name = 'Renamed'
+    employee.save()
+
+    page = feed(auth_client, cursor=start, limit=3)
+    assert page['has_more'] is True
+    assert [(e['model'], e['action']) for e in page['results']] == [
+        ('employees.department', 'create'), ('employees.employee', 'create'), ('attendance.attendance', 'create'),
+    ]
+    # Every entry carries the row as it is now
+    assert page['results'][1]['data']['name'] == 'Renamed'
+    assert page['results'][2]['data'] == {
+        'id': record.pk, 'employee_id': employee.pk, 'date': date.today().isoformat(), 'status': 'present',
+        'created_at': page['results'][2]['data']['created_at'], 'updated_at': page['results'][2]['data']['updated_at'],
+    }
+
+    dept_pk, employee_pk = dept.pk, employee.pk
+    dept.delete()  # cascades to the employee and the attendance record
+    page = feed(auth_client, cursor=page['cursor'])
+    assert page['has_more'] is False
+    assert [(e['model'], e['action'], e['object_id']) for e in page['results']] == [
+        ('employees.employee', 'update', employee_pk),
+        ('attendance.attendance', 'delete', record.pk),
+        ('employees.employee', 'delete', employee_pk),
+        ('employees.department', 'delete', dept_pk),
+    ]
+    assert all(e['data'] is None for e in page['results'])
+
+    # Nothing new: the cursor stays put
+    assert feed(auth_client, cursor=page['cursor']) == {'cursor': page['cursor'], 'has_more': False, 'results': []}
+
+
+def test_bulk_writes_are_logged_per_row_or_as_reload(db):
+    dept = Department.objects.create(name='Ops')
+    employees = [make_employee(dept, i) for i in range(3)]
+    cursor = ChangeLog.objects.order_by('-id').first().id
+
+    records = Attendance.objects.bulk_create(
+        [Attendance(employee=e, date=date.today(), status='present') for e in employees]
+    )
+    Attendance.objects.filter(pk=records[0].pk).update(status='late')
+    bulk_change.send(sender=Employee)  # e.g. a raw SQL load
+
+    logged = list(ChangeLog.objects.filter(id__gt=cursor).values_list('model', 'object_id', 'action'))
+    assert logged == [
+        *[('attendance.attendance', r.pk, 'create') for r in records],
+        ('attendance.attendance', records[0].pk, 'update'),
+        ('employees.employee', None, 'reload'),
+    ]
+
+
+def test_entries_roll_back_with_the_change(db):
+    before = ChangeLog.objects.count()
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            Department.objects.create(name='Gone')
+            raise RuntimeError()
+    assert ChangeLog.objects.count() == before
+
+
+def test_bulk_writes_roll_back_when_a_receiver_fails(db):
+    dept = Department.objects.create(name='Ops')
+    employee = make_employee(dept, 1)
+    record = Attendance.objects.create(employee=employee, date=date.today(), status='present')
+    before = ChangeLog.objects.count()
+
+    def fail(sender, **kwargs):
+        raise RuntimeError('receiver failed')
+
+    bulk_change.connect(fail, sender=Attendance, dispatch_uid='test-fail')
+    try:
+        with pytest.raises(RuntimeError):
+            Attendance.objects.filter(pk=record.pk).update(status='late')
+        record.status = 'absent'
+        with pytest.raises(RuntimeError):
+            Attendance.objects.bulk_update([record], ['status'])
+        with pytest.raises(RuntimeError):
+            Attendance.objects.bulk_create([Attendance(employee=employee, date=date(2020, 1, 1), status='late')])
+    finally:
+        bulk_change.disconnect(sender=Attendance, dispatch_uid='test-fail')
+
+    assert list(Attendance.objects.values_list('status', flat=True)) == ['present']
+    assert ChangeLog.objects.count() == before
+
+
+def test_filtering_validation_and_settle_window(auth_client, db, settings):
+    start = auth_client.get(reverse('change-head')).json()['cursor']
+    dept = Department.objects.create(name='Ops')
+    make_employee(dept, 1)
+    page = feed(auth_client, cursor=start, models='employees.employee')
+    assert [e['model'] for e in page['results']] == ['employees.employee']
+    assert auth_client.get(URL, {'models': 'auth.user'}).status_code == 400
+    assert auth_client.get(URL, {'cursor': '-1'}).status_code == 400
+    assert APIClient().get(URL).status_code == 401
+
+    # SQLite serializes writers: nothing is held back, whatever SETTLE_SECONDS says
+    settings.CHANGEFEED = {'SETTLE_SECONDS': 60}
+    assert len(feed(auth_client, cursor=start)['results']) == 2
+
+
+def test_settle_window_is_the_fallback_for_other_databases(db, settings, monkeypatch):
+    start = feed_module.head()
+    Department.objects.create(name='Ops')
+    monkeypatch.setattr(connection, 'vendor', 'mysql')
+    settings.CHANGEFEED = {'SETTLE_SECONDS': 60}
+    assert feed_module.read_changes(start)[0] == []
+    assert feed_module.head() <= start
+
+
+def test_postgresql_feed_holds_back_transactions_still_in_flight(db, monkeypatch):
+    dept = Department.objects.create(name='Ops')
+    first, second, third = [make_employee(dept, i) for i in range(3)]
+    start = ChangeLog.objects.get(model='employees.department', object_id=dept.pk).id
+    ChangeLog.objects.filter(id=start).update(txid=5)
+    # The second entry's transaction began after the third's and is still running
+    for employee, txid in ((first, 10), (second, 12), (third, 11)):
+        ChangeLog.objects.filter(model='employees.employee', object_id=employee.pk).update(txid=txid)
+
+    monkeypatch.setattr(connection, 'vendor', 'postgresql')
+    monkeypatch.setattr(feed_module, '_snapshot_xmin', lambda using: 12)
+    entries, cursor, _ = feed_module.read_changes(start)
+    assert [e['object_id'] for e in entries] == [first.pk, third.pk]
+    assert feed_module.head() == cursor
+
+    # Once it has committed, it comes after everything already served
+    monkeypatch.setattr(feed_module, '_snapshot_xmin', lambda using: 13)
+    entries, cursor, _ = feed_module.read_changes(cursor)
+    assert [e['object_id'] for e in entries] == [second.pk]
+    with pytest.raises(feed_module.CursorExpired):
+        feed_module.read_changes(cursor + 1000)
+
+
+def test_page_cost_does_not_grow_with_the_table(auth_client, db):
+    dept = Department.objects.create(name='Ops')
+    employees = [make_employee(dept, i) for i in range(20)]
+    Attendance.objects.bulk_create([
+        Attendance(employee=e, date=date.today() - timedelta(days=d), status='present')
+        for e in employees for d in range(10)
+    ])
+    cursor = ChangeLog.objects.order_by('-id').values_list('id', flat=True)[5]
+    with CaptureQueriesContext(connection) as queries:
+        page = feed(auth_client, cursor=cursor)
+    feed_queries = [q['sql'] for q in queries.captured_queries if 'changefeed_changelog' in q['sql']]
+    assert len(page['results']) == 5 and len(feed_queries) == 2  # pruning check + one indexed page
+
+
+def test_pruned_cursor_is_gone(auth_client, db):
+    dept = Department.objects.create(name='Ops')
+    for i in range(3):
+        make_employee(dept, i)
+    first = ChangeLog.objects.order_by('id').first()
+    ChangeLog.objects.filter(id__lt=first.id + 3).update(changed_at=timezone.now() - timedelta(days=40))
+
+    out = StringIO()
+    call_command('prune_changelog', '--days', '30', stdout=out)
+    assert 'Deleted 3 change log entries' in out.getvalue()
+    resp = auth_client.get(URL, {'cursor': first.id})
+    assert resp.status_code == 410
+    assert resp.json()['head'] == ChangeLog.objects.order_by('-id').first().id
+    assert feed(auth_client, cursor=first.id + 2)['results']
+
@@ -0,0 +1,63 @@
+import gzip
+import pytest
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+from employees.models import Department, Employee
+from employee_project.middleware import CompressionMiddleware, negotiate_encoding
+from datetime import date
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def many_employees():
+    dept = Department.objects.create(name='Support')
+    Employee.objects.bulk_create([
+        Employee(
+            name=f'Employee {i:02d}',
+            email=f'employee{i}@example.com',
+            phone_number='+12345678901',
+            address='1 Long Street, Springfield',
+            date_of_joining=date(2021, 5, 1),
+            department=dept,
+        )
+        for i in range(20)
+    ])
+
+
+def test_list_is_gzipped_when_accepted(api_client, many_employees, settings):
+    settings.RESPONSE_COMPRESSION = {'ENCODINGS': ['gzip'], 'MIN_SIZE': 200}
+    resp = api_client.get(reverse('employee-list'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+    assert resp.status_code == 200
+    assert resp['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in resp['Vary']
+    assert b'"results"' in gzip.decompress(resp.content)
+
+
+def test_no_compression_without_accept_encoding(api_client, many_employees):
+    resp = api_client.get(reverse('employee-list'))
+    assert resp.status_code == 200
+    assert not resp.has_header('Content-Encoding')
+
+
+def test_small_responses_below_threshold_are_not_compressed(api_client, settings):
+    settings.RESPONSE_COMPRESSION = {'MIN_SIZE': 10_000}
+    resp = api_client.get('/health', HTTP_ACCEPT_ENCODING='gzip')
+    assert not resp.has_header('Content-Encoding')
+    assert resp.json() == {'status': 'ok'}
+
+
+def test_negotiation_honours_qvalues():
+    assert negotiate_encoding('gzip;q=0.5, zstd', ['zstd', 'gzip']) == 'zstd'
+    assert negotiate_encoding('zstd;q=0, gzip', ['zstd', 'gzip']) == 'gzip'
+    assert negotiate_encoding('*', ['gzip']) == 'gzip'
+    assert negotiate_encoding('br', ['zstd', 'gzip']) is None
+
+
+def test_streaming_responses_are_compressed_per_chunk(rf, settings):
+    settings.RESPONSE_COMPRESSION = {'ENCODINGS': ['gzip']}
+    chunks = [f'row {i}\n'.encode() for i in range(100)]
+    middleware = CompressionMiddleware(lambda request: StreamingHttpResponse(iter(chunks)))
+    resp = middleware(rf.get('/', HTTP_ACCEPT_ENCODING='gzip'))
+    assert resp['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(b''.join(resp.streaming_content)) == b''.join(chunks)
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from django.urls import reverse
+from django.utils.http import http_date
+from employees.models import Department
+
+pytestmark = pytest.mark.django_db
+
+
+def test_department_list_revalidates_with_304(auth_client, django_assert_max_num_queries):
+    Department.objects.create(name='Finance')
+    url = reverse('department-list')
+    resp = auth_client.get(url)
+    assert resp.status_code == 200
+    etag = resp['ETag']
+    assert not resp.has_header('Last-Modified')
+
+    # Only the auth lookup and the two version stamps run, not the list query
+    with django_assert_max_num_queries(3):
+        resp = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304
+    assert resp.content == b''
+
+
+def test_etag_changes_after_write(auth_client):
+    dept = Department.objects.create(name='Legal')
+    url = reverse('department-detail', args=[dept.id])
+    etag = auth_client.get(url)['ETag']
+
+    auth_client.patch(url, {'name': 'Legal & Compliance'}, format='json')
+    resp = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp['ETag'] != etag
+    assert resp.json()['name'] == 'Legal & Compliance'
+
+
+def test_etag_changes_after_delete(auth_client):
+    Department.objects.create(name='A')
+    doomed = Department.objects.create(name='B')
+    url = reverse('department-list')
+    etag = auth_client.get(url)['ETag']
+    doomed.delete()
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_etag_changes_after_queryset_update(auth_client):
+    dept = Department.objects.create(name='Legal')
+    url = reverse('department-list')
+    etag = auth_client.get(url)['ETag']
+
+    Department.objects.filter(pk=dept.pk).update(name='Legal & Compliance')
+    resp = auth_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200
+    assert resp.json()['results'][0]['name'] == 'Legal & Compliance'
+
+    etag = resp['ETag']
+    dept.refresh_from_db()
+    dept.name = 'Legal'
+    Department.objects.bulk_update([dept], ['name'])
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+def test_if_modified_since_alone_never_hides_a_delete(auth_client):
+    Department.objects.create(name='A')
+    doomed = Department.objects.create(name='B')
+    url = reverse('department-list')
+    auth_client.get(url)
+    doomed.delete()
+    resp = auth_client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60))
+    assert resp.status_code == 200
+    assert [d['name'] for d in resp.json()['results']] == ['A']
+
+
+def test_if_none_match_star_on_missing_object_is_404(auth_client):
+    url = reverse('department-detail', args=[999999])
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH='*').status_code == 404
+
+    dept = Department.objects.create(name='Ops')
+    url = reverse('department-detail', args=[dept.id])
+    assert auth_client.get(url, HTTP_IF_NONE_MATCH='*').status_code == 304
+
+
+def test_chart_endpoint_conditional_get(api_client):
+    Department.objects.create(name='Ops')
+    url = reverse('api_department_stats')
+    etag = api_client.get(url)['ETag']
+    assert api_client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
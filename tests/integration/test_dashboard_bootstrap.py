@@ -0,0 +1,48 @@
+import json
+import pytest
+from django.urls import reverse
+from employees.models import Department, Employee
+from attendance.models import Attendance, Performance
+from datetime import date, timedelta
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def dashboard_data():
+    today = date.today()
+    for d, dept_name in enumerate(['Eng', 'Ops', 'Sales']):
+        dept = Department.objects.create(name=dept_name)
+        for i in range(d + 1):
+            emp = Employee.objects.create(
+                name=f'{dept_name} {i}', email=f'{dept_name.lower()}{i}@example.com',
+                phone_number='+12345678901', address='Addr',
+                date_of_joining=date(2022, 1, 1), department=dept,
+            )
+            for offset in range(0, 150, 7):
+                status = ('present', 'late', 'absent')[(offset + i) % 3]
+                Attendance.objects.create(employee=emp, date=today - timedelta(days=offset), status=status)
+            Performance.objects.create(employee=emp, rating=3 + i % 3, review_date=today)
+
+
+def test_bootstrap_matches_individual_endpoints(api_client, dashboard_data):
+    data = api_client.get(reverse('api_dashboard_bootstrap')).json()
+    assert data['stats'] == api_client.get(reverse('api_dashboard_stats')).json()
+    assert data['department_stats'] == api_client.get(reverse('api_department_stats')).json()
+    assert data['attendance_monthly'] == api_client.get(reverse('api_attendance_monthly')).json()
+
+
+def test_bootstrap_uses_fixed_number_of_queries(api_client, dashboard_data, django_assert_max_num_queries):
+    # 4 version stamps for the ETag + 3 payload queries, independent of data size
+    with django_assert_max_num_queries(7):
+        assert api_client.get(reverse('api_dashboard_bootstrap')).status_code == 200
+
+
+def test_dashboard_page_embeds_payload(api_client, dashboard_data):
+    resp = api_client.get('/charts/')
+    assert resp.status_code == 200
+    html = resp.content.decode()
+    start = html.index('<script id="dashboard-data" type="application/json">')
+    embedded = json.loads(html[html.index('>', start) + 1:html.index('</script>', start)])
+    assert embedded['stats']['total_employees'] == 6
+    assert embedded['stats']['total_departments'] == 3
@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from django.urls import reverse
+from attendance.models import Attendance
+from employees.caching import invalidate_models
+from employees.live import DashboardBroadcaster, sse_event
+
+
+def test_one_computation_fans_out_to_all_subscribers():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'attendance_rate': 80.0 + len(calls), 'total_employees': 10}
+
+    async def scenario():
+        broadcaster = DashboardBroadcaster(compute, [Attendance], interval=0.01)
+        queues = [broadcaster.subscribe() for _ in range(3)]
+        await asyncio.sleep(0.1)  # the first poll computes the baseline snapshot
+        baseline_calls = len(calls)
+
+        invalidate_models(Attendance)
+        events = [await asyncio.wait_for(queue.get(), timeout=2) for queue in queues]
+        await asyncio.sleep(0.1)  # later polls see no change and recompute nothing
+        for queue in queues:
+            broadcaster.unsubscribe(queue)
+        return baseline_calls, events
+
+    baseline_calls, events = asyncio.run(scenario())
+    assert len(calls) == baseline_calls + 1
+    assert events == [('delta', {'attendance_rate': 80.0 + len(calls)})] * 3
+
+
+def test_sse_event_encoding():
+    assert sse_event('delta', {'a': 1}) == b'event: delta\ndata: {"a": 1}\n\n'
+
+
+@pytest.mark.django_db
+def test_stream_refused_under_wsgi(api_client):
+    resp = api_client.get(reverse('api_dashboard_stream'))
+    assert resp.status_code == 503
@@ -0,0 +1,25 @@
+import pytest
+from employee_project.db import pool_max_size, psycopg_pool_options
+
+
+def test_pool_size_splits_budget_across_workers():
+    assert pool_max_size(30, workers=3) == 10
+    assert pool_max_size(30, workers=4) == 7
+    # Never below the number of threads that may query concurrently
+    assert pool_max_size(4, workers=4, threads=8) == 8
+
+
+def test_psycopg_pool_min_size_capped_by_max():
+    options = psycopg_pool_options(min_size=5, max_size=3, timeout=10)
+    assert options['min_size'] == 3
+    assert options['max_size'] == 3
+
+
+@pytest.mark.django_db
+def test_db_health_reports_stats(api_client):
+    resp = api_client.get('/health/db/')
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data['status'] == 'ok'
+    assert data['stats']['alias'] == 'default'
+    assert data['stats']['connections_opened'] >= 1
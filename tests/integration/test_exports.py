@@ -0,0 +1,84 @@
+import asyncio
+import csv
+import io
+import json
+import pytest
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from rest_framework.test import APIClient
+from attendance.models import Attendance, Performance
+from employees import exports
+
+
+def body(response):
+    assert response.streaming
+    return b''.join(response.streaming_content).decode()
+
+
+def test_attendance_export_csv_streams_every_filtered_row(auth_client, seeded_dataset, monkeypatch):
+    monkeypatch.setattr(exports, 'EXPORT_BLOCK_ROWS', 100)
+    expected = Attendance.objects.filter(status='late', date__gte='2000-01-01')
+    resp = auth_client.get(reverse('attendance-export'), {'status': 'late', 'date_after': '2000-01-01'})
+    assert resp.status_code == 200
+    assert resp['Content-Type'].startswith('text/csv')
+    assert resp['Content-Disposition'].startswith('attachment; filename="attendance-')
+    chunks = list(resp.streaming_content)
+    assert len(chunks) > 1
+    rows = list(csv.DictReader(io.StringIO(b''.join(chunks).decode())))
+    assert len(rows) == expected.count() > 100
+    assert [int(row['id']) for row in rows] == sorted(expected.values_list('pk', flat=True))
+    first = expected.select_related('employee__department').get(pk=rows[0]['id'])
+    assert rows[0]['employee_name'] == first.employee.name
+    assert rows[0]['department_name'] == first.employee.department.name
+    assert rows[0]['status'] == 'late' and rows[0]['date'] == first.date.isoformat()
+
+
+def test_export_reads_its_cursor_inside_a_transaction(auth_client, seeded_dataset, monkeypatch):
+    # In autocommit PostgreSQL holds (materializes) the cursor before the first fetch
+    opened = []
+    atomic = exports.transaction.atomic
+    monkeypatch.setattr(exports.transaction, 'atomic', lambda using=None: opened.append(using) or atomic(using=using))
+    resp = auth_client.get(reverse('attendance-export'))
+    assert opened == []
+    assert body(resp).count('\n') == Attendance.objects.count() + 1
+    assert opened == ['default']
+
+
+def test_performance_export_ndjson_honours_ordering(auth_client, seeded_dataset):
+    with CaptureQueriesContext(connection) as queries:
+        resp = auth_client.get(reverse('performance-export'), {
+            'export_format': 'ndjson', 'min_rating': 4, 'ordering': '-rating',
+        })
+        records = [json.loads(line) for line in body(resp).splitlines()]
+        row_queries = [q['sql'] for q in queries if 'attendance_performance' in q['sql']]
+    assert resp['Content-Type'] == 'application/x-ndjson'
+    assert len(records) == Performance.objects.filter(rating__gte=4).count()
+    assert [r['rating'] for r in records] == sorted((r['rating'] for r in records), reverse=True)
+    assert set(records[0]) == {
+        'id', 'employee', 'employee_name', 'department_name', 'rating', 'review_date',
+        'comments', 'created_at', 'updated_at',
+    }
+    # One joined query for the rows; no per-row lookups
+    assert len(row_queries) == 1
+
+
+def test_export_rejects_unknown_format_and_anonymous(auth_client):
+    assert auth_client.get(reverse('attendance-export'), {'export_format': 'xlsx'}).status_code == 400
+    assert APIClient().get(reverse('attendance-export')).status_code == 401
+    empty = body(auth_client.get(reverse('performance-export')))
+    assert empty.splitlines() == ['id,employee,employee_name,department_name,rating,review_date,comments,created_at,updated_at']
+
+
+@pytest.mark.django_db(transaction=True)
+def test_export_streams_under_asgi(auth_client, seeded_dataset):
+    from django.test import AsyncClient
+    headers = {'Authorization': auth_client._credentials['HTTP_AUTHORIZATION']}
+
+    async def scenario():
+        response = await AsyncClient().get(reverse('attendance-export'), {'export_format': 'ndjson'}, headers=headers)
+        return response, [chunk async for chunk in response.streaming_content]
+
+    response, chunks = asyncio.run(scenario())
+    assert response.status_code == 200 and response.is_async
+    assert sum(chunk.count(b'\n') for chunk in chunks) == Attendance.objects.count()
@@ -0,0 +1,134 @@
+import csv
+import io
+from datetime import date, timedelta
+from io import StringIO
+import pytest
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from attendance.models import Attendance
+from employees.models import Department, Employee
+from jobs.models import Job
+from jobs.queue import claim, enqueue, requeue_stale
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture(autouse=True)
+def job_settings(tmp_path, settings):
+    settings.JOBS = {'RESULT_DIR': str(tmp_path), 'POLL_INTERVAL': 0.05, 'PROGRESS_INTERVAL': 0}
+
+
+@pytest.fixture
+def attendance():
+    dept = Department.objects.create(name='Ops')
+    employees = [
+        Employee.objects.create(
+            name=f'Worker {i}', email=f'w{i}@example.com', phone_number='+12345678901',
+            address='Addr', date_of_joining=date(2022, 1, 1), department=dept,
+        )
+        for i in range(5)
+    ]
+    today = date.today()
+    Attendance.objects.bulk_create([
+        Attendance(employee=e, date=today - timedelta(days=d), status='late' if d % 3 else 'present')
+        for e in employees for d in range(1, 13)
+    ])
+    return employees
+
+
+def run_worker(*args):
+    out = StringIO()
+    call_command('runworker', '--burst', '--concurrency', '2', *args, stdout=out)
+    return out.getvalue()
+
+
+def test_async_export_job_lifecycle(auth_client, attendance):
+    resp = auth_client.get(reverse('attendance-export'), {'async': '1', 'status': 'late', 'export_format': 'csv'})
+    assert resp.status_code == 202
+    job_url = resp['Location']
+    assert resp.json()['status'] == 'queued' and resp.json()['kind'] == 'attendance-export'
+    assert auth_client.get(job_url + 'result/').status_code == 409
+
+    assert 'Worker stopped after 1 job(s)' in run_worker()
+
+    job = auth_client.get(job_url).json()
+    assert job['status'] == 'succeeded' and job['progress'] == 1.0
+    assert job['result'] == {'rows': Attendance.objects.filter(status='late').count(), 'export_format': 'csv'}
+    download = auth_client.get(job['result_url'])
+    assert download.status_code == 200
+    assert download['Content-Disposition'].startswith('attachment')
+    rows = list(csv.DictReader(io.StringIO(b''.join(download.streaming_content).decode())))
+    assert len(rows) == job['result']['rows'] and {r['status'] for r in rows} == {'late'}
+
+    # Jobs are private to their owner
+    other = APIClient()
+    other.force_authenticate(User.objects.create_user('other', password='x'))
+    assert other.get(job_url).status_code == 404
+    assert other.get(reverse('job-list')).json()['results'] == []
+
+
+def test_async_statistics_match_the_synchronous_response(auth_client, attendance):
+    sync = auth_client.get(reverse('attendance-statistics'), {'days': 10}).json()
+    resp = auth_client.get(reverse('attendance-statistics'), {'days': 10, 'async': 'true'})
+    assert resp.status_code == 202
+    run_worker('--kind', 'attendance-statistics')
+    job = auth_client.get(resp['Location']).json()
+    assert job['result']['total_records'] == sync['total_records']
+    result = auth_client.get(job['result_url'])
+    assert b''.join(result.streaming_content).decode().startswith('{"period": "10 days"')
+
+
+def test_annual_report_job(auth_client, attendance):
+    year = (date.today() - timedelta(days=1)).year
+    resp = auth_client.post(
+        reverse('job-list'), {'kind': 'annual-report', 'params': {'year': year, 'workers': 1}}, format='json'
+    )
+    assert resp.status_code == 202
+    run_worker('--kind', 'annual-report')
+    job = auth_client.get(resp['Location']).json()
+    assert job['status'] == 'succeeded'
+    assert job['result']['records'] == Attendance.objects.filter(date__year=year).count()
+    report = b''.join(auth_client.get(job['result_url']).streaming_content).decode()
+    assert report.startswith(f'{{"start": "{year}-01-01"')
+
+
+def test_submit_validates_kind_and_params(auth_client, db):
+    url = reverse('job-list')
+    assert auth_client.post(url, {'kind': 'nope'}, format='json').status_code == 400
+    resp = auth_client.post(url, {'kind': 'attendance-statistics', 'params': {'days': 0}}, format='json')
+    assert resp.status_code == 400 and 'params' in resp.json()
+    resp = auth_client.post(url, {'kind': 'attendance-export', 'params': {'ordering': 'employee__email'}}, format='json')
+    assert resp.status_code == 400
+    resp = auth_client.post(url, {'kind': 'performance-statistics'}, format='json')
+    assert resp.status_code == 202 and resp.json()['params'] == {}
+
+
+def test_failing_job_records_the_traceback(db):
+    job = enqueue('attendance-statistics', {'days': 5})
+    Job.objects.filter(pk=job.pk).update(params={'days': 5, 'unexpected': 1})
+    run_worker()
+    job.refresh_from_db()
+    assert job.status == Job.FAILED and 'unexpected' in job.error and job.finished_at
+
+
+def test_cancel_queued_job_via_api(auth_client, db):
+    resp = auth_client.post(reverse('job-list'), {'kind': 'performance-statistics'}, format='json')
+    cancel_url = resp['Location'] + 'cancel/'
+    assert auth_client.post(cancel_url).json()['status'] == 'cancelled'
+    assert auth_client.post(cancel_url).status_code == 409
+    assert 'Worker stopped after 0 job(s)' in run_worker()
+
+
+def test_stale_running_jobs_are_requeued_then_failed(db, settings):
+    settings.JOBS = {**settings.JOBS, 'MAX_ATTEMPTS': 2}
+    job = enqueue('performance-statistics')
+    assert claim('w1').pk == job.pk and claim('w2') is None
+    Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+    assert requeue_stale() == (1, 0)
+    assert claim('w2').attempts == 2
+    Job.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+    assert requeue_stale() == (0, 1)
+    assert Job.objects.get(pk=job.pk).status == Job.FAILED
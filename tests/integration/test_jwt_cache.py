@@ -0,0 +1,37 @@
+import pytest
+from django.urls import reverse
+
+pytestmark = pytest.mark.django_db
+
+
+def test_cached_user_needs_no_auth_query(auth_client, django_assert_num_queries):
+    url = reverse('department-statistics')
+    assert auth_client.get(url).status_code == 200
+    with django_assert_num_queries(0):
+        assert auth_client.get(url).status_code == 200
+
+
+def test_deactivation_invalidates_cached_user(auth_client, user_db):
+    url = reverse('department-statistics')
+    assert auth_client.get(url).status_code == 200
+    user_db.is_active = False
+    user_db.save()
+    assert auth_client.get(url).status_code == 401
+
+
+def test_cached_user_is_complete(auth_client, user_db):
+    auth_client.get(reverse('department-statistics'))
+    resp = auth_client.get(reverse('department-statistics'))
+    user = resp.wsgi_request.user
+    assert user.pk == user_db.pk
+    assert user.username == 'tester'
+    assert user.check_password('password123')  # deferred hash is loaded on demand
+
+
+def test_stateless_mode_trusts_claims(auth_client, user_db, settings, django_assert_num_queries):
+    settings.JWT_AUTH_CACHE = {'STATELESS': True}
+    url = reverse('department-statistics')
+    auth_client.get(url)
+    user_db.delete()
+    with django_assert_num_queries(0):
+        assert auth_client.get(url).status_code == 200
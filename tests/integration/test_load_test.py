@@ -0,0 +1,52 @@
+import csv
+from datetime import date
+import pytest
+from django.contrib.auth.models import User
+from employee_project.loadtest import LoadConfig, percentile, run, summarize, write_csv
+from employees.models import Department, Employee
+from attendance.models import Attendance
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def server(live_server, settings):
+    settings.AUTH_THROTTLE = {'RATES': {'login_ip': '10000/min', 'login_username': '10000/min'}}
+    # Keep the repeated logins of the checkin scenario cheap
+    settings.PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    User.objects.create_user(username='loader', password='load-pass-123')
+    dept = Department.objects.create(name='Eng')
+    for i in range(5):
+        Employee.objects.create(
+            name=f'Ann Smith {i}', email=f'ann{i}@example.com', phone_number='+12025550100',
+            address='1 Main St', date_of_joining=date(2020, 1, 1), department=dept,
+        )
+    return live_server
+
+
+def test_weighted_scenarios_report_percentiles(server, tmp_path):
+    config = LoadConfig(base_url=server.url, username='loader', password='load-pass-123',
+                        users=3, duration=1.5,
+                        weights={'checkin': 1, 'dashboard': 1, 'search': 1, 'paging': 1})
+    summary = summarize(run(config))
+
+    steps = summary['steps']
+    assert {'session/login', 'checkin/login', 'checkin/checkin', 'dashboard/bootstrap', 'search/search',
+            'paging/attendance-page'} <= set(steps)
+    assert summary['total']['error_rate'] == 0
+    assert summary['total']['p50_ms'] <= summary['total']['p95_ms'] <= summary['total']['p99_ms']
+    # Each employee checks in exactly once, then the scenario stops
+    assert Attendance.objects.filter(date=date.today()).count() == 5
+    assert steps['checkin/checkin']['requests'] == 5
+
+    write_csv(tmp_path / 'load.csv', summary)
+    rows = list(csv.DictReader(open(tmp_path / 'load.csv')))
+    assert rows[-1]['step'] == 'TOTAL'
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 0.50) == 50
+    assert percentile(values, 0.99) == 99
+    assert percentile([7.0], 0.95) == 7.0
+    assert percentile([], 0.5) == 0.0
@@ -0,0 +1,90 @@
+import re
+import pytest
+from django.urls import reverse
+from employee_project.metrics import MetricsRegistry, registry
+from attendance.models import Attendance
+from employees.models import Department, Employee
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def metrics_file(settings, tmp_path):
+    settings.METRICS = {'ENABLED': True, 'PATH': str(tmp_path / 'metrics.sqlite3'), 'FLUSH_INTERVAL': 60}
+    registry.reset()
+    yield
+    registry.reset()
+
+
+def sample(text, series):
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_records_per_endpoint_metrics(auth_client, api_client):
+    Department.objects.create(name='Eng')
+    auth_client.get(reverse('department-statistics'))
+    auth_client.get(reverse('department-statistics'))
+
+    text = api_client.get('/metrics').content.decode()
+    labels = 'view="department-statistics",method="GET"'
+    assert sample(text, f'http_requests_total{{{labels},status="200"}}') == 2
+    assert sample(text, f'http_request_duration_seconds_count{{{labels}}}') == 2
+    assert sample(text, f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+    assert sample(text, f'http_db_queries_total{{{labels}}}') >= 1
+    assert sample(text, f'http_serialize_seconds_total{{{labels}}}') is not None
+    assert sample(text, f'http_render_seconds_total{{{labels}}}') > 0
+    assert sample(text, f'http_response_bytes_total{{{labels}}}') > 0
+    assert '# TYPE http_request_duration_seconds histogram' in text
+
+    # Buckets are cumulative and listed in increasing order
+    buckets = re.findall(rf'^http_request_duration_seconds_bucket{{{re.escape(labels)},le="([^"]+)"}} (\S+)$', text, re.M)
+    bounds = [float('inf') if le == '+Inf' else float(le) for le, _ in buckets]
+    assert bounds == sorted(bounds)
+    counts = [float(value) for _, value in buckets]
+    assert counts == sorted(counts)
+
+
+def test_serialization_is_timed_for_serializers_and_json_views(auth_client, api_client):
+    Department.objects.create(name='Eng')
+    auth_client.get(reverse('department-list'))
+    api_client.get(reverse('api_department_stats'))
+
+    text = api_client.get('/metrics').content.decode()
+    assert sample(text, 'http_serialize_seconds_total{view="department-list",method="GET"}') > 0
+    assert sample(text, 'http_serialize_seconds_total{view="api_department_stats",method="GET"}') > 0
+
+
+def test_streamed_bytes_and_queries_are_counted(auth_client, api_client):
+    dept = Department.objects.create(name='Eng')
+    employee = Employee.objects.create(
+        name='Ann', email='ann@example.com', phone_number='+12345678901', address='1 Main St',
+        date_of_joining='2024-01-01', department=dept,
+    )
+    Attendance.objects.create(employee=employee, date='2024-02-01', status='present')
+
+    resp = auth_client.get(reverse('attendance-export'), HTTP_ACCEPT_ENCODING='identity')
+    body = b''.join(resp.streaming_content)
+    resp.close()
+
+    text = api_client.get('/metrics').content.decode()
+    labels = 'view="attendance-export",method="GET"'
+    assert sample(text, f'http_response_bytes_total{{{labels}}}') == len(body)
+    # The rows are read while the body streams, after the view has returned
+    assert sample(text, f'http_db_queries_total{{{labels}}}') >= 2
+
+
+def test_workers_are_summed_through_shared_file(api_client):
+    other_worker = MetricsRegistry()
+    other_worker.inc('http_requests_total', (('view', 'x'), ('method', 'GET'), ('status', 200)), 3)
+    other_worker.flush()
+    registry.inc('http_requests_total', (('view', 'x'), ('method', 'GET'), ('status', 200)), 2)
+
+    text = api_client.get('/metrics').content.decode()
+    assert sample(text, 'http_requests_total{view="x",method="GET",status="200"}') == 5
+
+
+def test_metrics_token(api_client, settings):
+    settings.METRICS = {**settings.METRICS, 'TOKEN': 's3cret'}
+    assert api_client.get('/metrics').status_code == 401
+    assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer s3cret').status_code == 200
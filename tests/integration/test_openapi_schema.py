@@ -0,0 +1,71 @@
+import pytest
+from employee_project import schema
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path, monkeypatch):
+    settings.OPENAPI_SCHEMA_CACHE = {'DIRECTORY': str(tmp_path), 'CODE_VERSION': 'v1'}
+    monkeypatch.setattr(schema, '_code_version', None)
+    monkeypatch.setattr(schema, '_schema', None)
+    calls = []
+    generate = schema.generate_documents
+
+    def counting_generate():
+        calls.append(1)
+        return generate()
+
+    monkeypatch.setattr(schema, 'generate_documents', counting_generate)
+    return tmp_path, calls
+
+
+def test_schema_generated_once_and_served_with_etag(api_client, schema_dir):
+    directory, calls = schema_dir
+    first = api_client.get('/swagger.json')
+    assert first.status_code == 200
+    assert first['Content-Type'].startswith('application/json')
+    assert b'"/employees/"' in first.content
+    etag = first['ETag']
+
+    second = api_client.get('/swagger.json')
+    assert second.content == first.content
+    assert api_client.get('/swagger.json', HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert api_client.get('/swagger/?format=openapi').status_code == 200
+    assert len(calls) == 1
+    assert (directory / 'openapi-v1.json').exists()
+
+
+def test_new_worker_reads_stored_schema(api_client, schema_dir, monkeypatch):
+    _, calls = schema_dir
+    api_client.get('/swagger.json')
+    monkeypatch.setattr(schema, '_schema', None)
+    assert api_client.get('/swagger.json').status_code == 200
+    assert len(calls) == 1
+
+
+def test_code_version_change_regenerates(api_client, schema_dir, settings, monkeypatch):
+    directory, calls = schema_dir
+    api_client.get('/swagger.json')
+    settings.OPENAPI_SCHEMA_CACHE = {'DIRECTORY': str(directory), 'CODE_VERSION': 'v2'}
+    monkeypatch.setattr(schema, '_code_version', None)
+    assert api_client.get('/swagger.json').status_code == 200
+    assert len(calls) == 2
+    assert not (directory / 'openapi-v1.json').exists()
+
+
+def test_code_version_tracks_sources(tmp_path):
+    (tmp_path / 'app.py').write_text('x = 1\n')
+    before = schema.compute_code_version(tmp_path)
+    assert schema.compute_code_version(tmp_path) == before
+    (tmp_path / 'app.py').write_text('x = 2\n')
+    assert schema.compute_code_version(tmp_path) != before
+
+    # Installed packages are not project code, whatever the virtualenv is called
+    current = schema.compute_code_version(tmp_path)
+    for venv in ('venv', 'py311'):
+        packages = tmp_path / venv / 'lib' / 'site-packages'
+        packages.mkdir(parents=True)
+        (tmp_path / venv / 'pyvenv.cfg').write_text('home = /usr/bin\n')
+        (packages / 'dependency.py').write_text('y = 1\n')
+    assert schema.compute_code_version(tmp_path) == current
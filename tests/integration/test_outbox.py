@@ -0,0 +1,201 @@
+import hashlib
+import hmac
+import json
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.db import transaction
+from django.utils import timezone
+from attendance.models import Attendance
+from employee_project.tracing import activate, start_trace
+from employees.models import Department, Employee
+from outbox.dispatcher import Dispatcher, acquire_lease
+from outbox.models import Delivery, EndpointLease, OutboxEvent
+
+
+class StubServer:
+    """A local webhook endpoint answering with the queued statuses, then 200"""
+
+    def __init__(self):
+        self.requests = []
+        self.statuses = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                stub.requests.append({'headers': dict(self.headers), 'body': body, 'json': json.loads(body)})
+                self.send_response(stub.statuses.pop(0) if stub.statuses else 200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_port}/hook'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def events(self, index=-1):
+        return self.requests[index]['json']['events']
+
+
+@pytest.fixture
+def stub(settings):
+    server = StubServer()
+    settings.OUTBOX = {
+        'ENDPOINTS': [{'url': server.url, 'name': 'stub', 'secret': 's3cret'}],
+        'BACKOFF_BASE': 1.0, 'MAX_ATTEMPTS': 3, 'TIMEOUT': 5,
+    }
+    yield server
+    server.server.shutdown()
+    server.server.server_close()
+
+
+def make_employee(dept, i, name=None):
+    return Employee.objects.create(
+        name=name or f'Worker {i}', email=f'w{i}@example.com', phone_number='+12345678901',
+        address='Addr', date_of_joining=date(2022, 1, 1), department=dept,
+    )
+
+
+def dispatch(**kwargs):
+    return Dispatcher(**kwargs).run(burst=True)
+
+
+def test_events_are_written_only_with_the_committed_change(stub, db):
+    dept = Department.objects.create(name='Ops')
+    with pytest.raises(RuntimeError):
+        with transaction.atomic():
+            make_employee(dept, 1)
+            raise RuntimeError()
+    assert not OutboxEvent.objects.exists()
+
+    root = start_trace('test', traceparent='00-' + 'a' * 32 + '-' + 'b' * 16 + '-01')
+    with activate(root):
+        employee = make_employee(dept, 1)
+    event = OutboxEvent.objects.get()
+    assert (event.event_type, event.object_id) == ('employee.created', employee.pk)
+    assert event.payload['email'] == 'w1@example.com' and event.payload['department_id'] == dept.pk
+    assert event.traceparent == root.traceparent
+
+
+def test_bulk_events_are_written_only_with_the_committed_change(stub, db, monkeypatch):
+    employee = make_employee(Department.objects.create(name='Ops'), 1)
+    record = Attendance.objects.create(employee=employee, date=date.today(), status='present')
+    before = OutboxEvent.objects.count()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError('outbox unavailable')
+
+    monkeypatch.setattr(OutboxEvent.objects, 'bulk_create', fail)
+    with pytest.raises(RuntimeError):
+        Attendance.objects.filter(pk=record.pk).update(status='late')
+    monkeypatch.undo()
+
+    record.refresh_from_db()
+    assert record.status == 'present'
+    assert OutboxEvent.objects.count() == before
+
+    Attendance.objects.filter(pk=record.pk).update(status='late')
+    assert OutboxEvent.objects.order_by('-id').values_list('event_type', 'payload__status').first() == (
+        'attendance.updated', 'late'
+    )
+
+
+def test_no_events_without_endpoints(db):
+    make_employee(Department.objects.create(name='Ops'), 1)
+    assert not OutboxEvent.objects.exists()
+
+
+def test_dispatch_batches_coalesces_and_signs(stub, db):
+    dept = Department.objects.create(name='Ops')
+    employee = make_employee(dept, 1)
+    for name in ('Second', 'Third'):
+        employee.name = name
+        employee.save()
+    record = Attendance.objects.create(employee=employee, date=date.today(), status='late')
+    Attendance.objects.filter(pk=record.pk).update(status='present')  # bulk path
+
+    assert dispatch() == 5
+    assert len(stub.requests) == 1
+    request = stub.requests[0]
+    expected = hmac.new(b's3cret', request['body'], hashlib.sha256).hexdigest()
+    assert request['headers']['X-Outbox-Signature'] == f'sha256={expected}'
+    events = stub.events()
+    assert [(e['type'], e['coalesced']) for e in events] == [('employee.updated', 3), ('attendance.updated', 2)]
+    assert events[0]['data']['name'] == 'Third' and events[1]['data']['status'] == 'present'
+    assert set(Delivery.objects.values_list('status', flat=True)) == {Delivery.DELIVERED}
+
+    # Nothing left to send
+    assert dispatch() == 0 and len(stub.requests) == 1
+
+
+def test_failed_batches_are_retried_in_order_with_backoff(stub, db):
+    dept = Department.objects.create(name='Ops')
+    first = make_employee(dept, 1)
+    stub.statuses = [503]
+    assert dispatch() == 0
+    delivery = Delivery.objects.get()
+    assert delivery.status == Delivery.PENDING and delivery.attempts == 1 and delivery.last_error == 'HTTP 503'
+    assert timezone.now() + timedelta(seconds=0.4) < delivery.next_attempt_at < timezone.now() + timedelta(seconds=1.1)
+
+    # A newer event must not overtake the batch waiting for its retry
+    second = make_employee(dept, 2)
+    assert dispatch() == 0 and len(stub.requests) == 1
+
+    Delivery.objects.update(next_attempt_at=timezone.now())
+    assert dispatch() == 2
+    assert [e['object_id'] for e in stub.events()] == [first.pk, second.pk]
+    assert set(Delivery.objects.values_list('attempts', flat=True)) == {2}
+
+
+def test_batches_give_up_and_can_be_retried(stub, db):
+    dept = Department.objects.create(name='Ops')
+    make_employee(dept, 1)
+    stub.statuses = [400]
+    dispatch()
+    assert Delivery.objects.get().status == Delivery.FAILED  # not retryable
+
+    out = StringIO()
+    call_command('dispatch_outbox', '--burst', '--retry-failed', stdout=out)
+    assert 'Queued 1 failed deliveries again' in out.getvalue()
+    assert 'delivering 1 event(s) (0 failed)' in out.getvalue()
+    assert Delivery.objects.get().status == Delivery.DELIVERED
+
+
+def test_only_the_lease_holder_sends_to_an_endpoint(stub, db):
+    make_employee(Department.objects.create(name='Ops'), 1)
+    assert acquire_lease('stub', 'other-dispatcher', 60)
+
+    # Another dispatcher holds the endpoint: nothing is sent twice or out of order
+    assert dispatch() == 0 and stub.requests == []
+    assert not acquire_lease('stub', 'third-dispatcher', 60)
+
+    # A lease whose holder stopped renewing it is taken over
+    EndpointLease.objects.update(expires_at=timezone.now())
+    assert dispatch() == 1 and len(stub.requests) == 1
+    # ...and released when the dispatcher exits
+    assert EndpointLease.objects.get().holder == ''
+
+
+def test_batch_size_and_endpoint_event_filters(stub, db, settings):
+    other = StubServer()
+    try:
+        settings.OUTBOX = {**settings.OUTBOX, 'ENDPOINTS': [
+            {'url': stub.url, 'name': 'stub'},
+            {'url': other.url, 'name': 'attendance-only', 'events': ['attendance.*']},
+        ]}
+        dept = Department.objects.create(name='Ops')
+        employees = [make_employee(dept, i) for i in range(5)]
+        Attendance.objects.create(employee=employees[0], date=date.today(), status='present')
+        assert dispatch(batch_size=2) == 7
+        assert [len(r['json']['events']) for r in stub.requests] == [2, 2, 2]
+        assert [e['type'] for e in other.events()] == ['attendance.created']
+        assert 'X-Outbox-Signature' not in other.requests[0]['headers']
+    finally:
+        other.server.shutdown()
+        other.server.server_close()
@@ -0,0 +1,87 @@
+from datetime import date
+import pytest
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from employees.models import Department, Employee
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def profile_dir(settings, tmp_path):
+    settings.PROFILING = {'ENABLED': True, 'DIRECTORY': str(tmp_path)}
+    return tmp_path
+
+
+@pytest.fixture
+def staff_client():
+    staff = User.objects.create_user(username='ops', password='password123', is_staff=True)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(staff).access_token}')
+    return client
+
+
+@pytest.fixture
+def employees():
+    dept = Department.objects.create(name='Eng')
+    for i in range(3):
+        Employee.objects.create(
+            name=f'Emp {i}', email=f'e{i}@example.com', phone_number='+12025550100',
+            address='1 Main St', date_of_joining=date(2020, 1, 1), department=dept,
+        )
+
+
+def test_cprofile_report_with_sql_breakdown(staff_client, profile_dir, employees):
+    resp = staff_client.get(reverse('employee-list'), {'profile': '1'})
+    assert resp.status_code == 200
+    report = resp.json()
+    assert report['view'] == 'employee-list'
+    assert report['status'] == 200
+    assert 'cumulative' in report['functions']
+    assert report['sql']['count'] >= 1
+    query = next(q for q in report['sql']['queries'] if 'employees_employee' in q['sql'])
+    assert query['origin'] and not query['origin'].startswith('employee_project/')
+    assert (profile_dir / f"{resp['X-Profile-Id']}.prof").exists()
+    assert (profile_dir / f"{resp['X-Profile-Id']}.json").exists()
+
+
+def test_sampling_profile_via_header(staff_client, profile_dir, employees):
+    resp = staff_client.get(reverse('api_department_stats'), HTTP_X_PROFILE='sample')
+    report = resp.json()
+    assert report['profiler'] == 'sample'
+    collapsed = (profile_dir / f"{resp['X-Profile-Id']}.collapsed").read_text()
+    assert collapsed == report['collapsed']
+    for line in collapsed.splitlines():
+        stack, count = line.rsplit(' ', 1)
+        assert int(count) >= 1 and ';' in stack
+
+
+def test_concurrent_cprofile_request_gets_409(staff_client, profile_dir, employees):
+    from employee_project import profiling
+    busy = profiling.CProfileProfiler(profiling.get_profiling_settings())
+    busy.start()
+    try:
+        resp = staff_client.get(reverse('employee-list'), {'profile': '1'})
+        assert resp.status_code == 409
+        # Sampling only watches its own thread and is still available
+        assert staff_client.get(reverse('employee-list'), {'profile': 'sample'}).status_code == 200
+    finally:
+        busy.stop()
+    assert staff_client.get(reverse('employee-list'), {'profile': '1'}).status_code == 200
+
+
+def test_non_staff_gets_the_normal_response(auth_client, profile_dir, employees):
+    resp = auth_client.get(reverse('employee-list'), {'profile': '1'})
+    assert resp.status_code == 200
+    assert 'results' in resp.json()
+    assert not resp.has_header('X-Profile-Id')
+    assert not list(profile_dir.iterdir())
+
+
+def test_disabled_by_default(staff_client, settings, tmp_path, employees):
+    settings.PROFILING = {'DIRECTORY': str(tmp_path)}
+    resp = staff_client.get(reverse('employee-list'), {'profile': '1'})
+    assert 'results' in resp.json()
+    assert not resp.has_header('X-Profile-Id')
@@ -0,0 +1,83 @@
+import time
+import pytest
+from django.db import router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from employee_project.middleware import ReplicaRoutingMiddleware
+from employee_project.routers import mark_write, recently_written, use_primary
+from employees.models import Employee
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica1']
+
+
+def run(request, write=False):
+    """Pass a request through the middleware, recording where reads would go"""
+    seen = {}
+
+    def view(request):
+        seen['before_write'] = router.db_for_read(Employee)
+        if write:
+            router.db_for_write(Employee)
+            seen['after_write'] = router.db_for_read(Employee)
+        return HttpResponse()
+
+    response = ReplicaRoutingMiddleware(view)(request)
+    return seen, response
+
+
+def test_safe_reads_go_to_replica():
+    seen, response = run(RequestFactory().get('/api/employees/'))
+    assert seen['before_write'] == 'replica1'
+    assert 'db_pin' not in response.cookies
+
+
+def test_unsafe_request_reads_primary_and_pins_client():
+    seen, response = run(RequestFactory().post('/api/attendance/'), write=True)
+    assert seen['before_write'] == 'default'
+    pin = response.cookies['db_pin'].value
+
+    factory = RequestFactory()
+    factory.cookies['db_pin'] = pin
+    seen, _ = run(factory.get('/api/attendance/'))
+    assert seen['before_write'] == 'default'
+
+    factory.cookies['db_pin'] = str(time.time() - 1)
+    seen, _ = run(factory.get('/api/attendance/'))
+    assert seen['before_write'] == 'replica1'
+
+
+def test_write_during_get_sticks_rest_of_request_to_primary():
+    seen, response = run(RequestFactory().get('/api/employees/'), write=True)
+    assert seen['before_write'] == 'replica1'
+    assert seen['after_write'] == 'default'
+    assert 'db_pin' in response.cookies
+
+
+def test_outside_requests_and_forced_primary_use_primary():
+    assert router.db_for_read(Employee) == 'default'
+
+    def view(request):
+        with use_primary():
+            return HttpResponse(router.db_for_read(Employee))
+
+    response = ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
+    assert response.content == b'default'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_reads_inside_transaction_use_primary():
+    def view(request):
+        with transaction.atomic():
+            return HttpResponse(router.db_for_read(Employee))
+
+    response = ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
+    assert response.content == b'default'
+
+
+def test_recent_write_window():
+    assert not recently_written()
+    mark_write()
+    assert recently_written()
@@ -0,0 +1,59 @@
+from collections import Counter
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from attendance.models import Attendance, Performance
+from changefeed.models import ChangeLog
+from employees.caching import get_generations
+from employees.models import Department, Employee
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+def seed(*args):
+    call_command('seed_data', '--bulk', '--clear', '--employees', '40', '--days', '30',
+                 '--chunk-size', '15', *args, stdout=StringIO())
+
+
+def snapshot():
+    return (
+        list(Employee.objects.order_by('email').values_list('email', 'phone_number', 'department__name')),
+        sorted(Attendance.objects.values_list('employee__email', 'date', 'status')),
+        sorted(Performance.objects.values_list('employee__email', 'review_date', 'rating')),
+    )
+
+
+def test_bulk_seed_matches_across_worker_counts():
+    seed('--workers', '1')
+    single = snapshot()
+    seed('--workers', '2')
+    assert snapshot() == single
+
+    employees, attendance, performance = single
+    assert len(employees) == 40 and Department.objects.count() == 8
+    assert 30 * 40 * 0.6 < len(attendance) <= 30 * 40
+    assert {status for _, _, status in attendance} == {'present', 'late', 'absent'}
+    assert 40 <= len(performance) <= 120
+
+
+def test_bulk_seed_invalidates_cached_statistics():
+    before = get_generations([Employee, Attendance, Performance])
+    seed('--loader', 'insert')
+    after = get_generations([Employee, Attendance, Performance])
+    assert all(b != a for b, a in zip(before, after))
+
+
+def test_bulk_seed_announces_each_table_once():
+    seed('--loader', 'insert')  # 40 employees in chunks of 15: three chunks per table
+    reloads = Counter(ChangeLog.objects.filter(action=ChangeLog.RELOAD).values_list('model', flat=True))
+    # One for --clear emptying the table, one for loading it
+    assert reloads == {
+        'attendance.attendance': 2, 'attendance.performance': 2,
+        'employees.employee': 1, 'employees.department': 1,
+    }
+
+
+def test_bulk_seed_appends_without_clear():
+    seed()
+    call_command('seed_data', '--bulk', '--employees', '10', '--days', '1', stdout=StringIO())
+    assert Employee.objects.count() == 50
@@ -0,0 +1,85 @@
+import multiprocessing
+import time
+import pytest
+from employee_project.cache import SQLiteCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return SQLiteCache(str(tmp_path / 'cache.sqlite3'), {
+        'TIMEOUT': 60,
+        'OPTIONS': {'MAX_ENTRIES': 5, 'MAX_SIZE': 1024 * 1024, 'TOUCH_INTERVAL': 0},
+    })
+
+
+def test_set_get_add_delete(cache):
+    cache.set('a', {'x': 1})
+    assert cache.get('a') == {'x': 1}
+    assert cache.add('a', 'other') is False
+    assert cache.add('b', 'new') is True
+    assert cache.get_many(['a', 'b', 'missing']) == {'a': {'x': 1}, 'b': 'new'}
+    assert cache.delete('a') is True
+    assert cache.get('a', 'default') == 'default'
+
+
+def test_expired_entries_are_misses(cache):
+    cache.set('short', 1, timeout=0.05)
+    time.sleep(0.1)
+    assert cache.get('short') is None
+    assert cache.add('short', 2) is True
+
+
+def test_least_recently_used_entries_are_evicted(cache):
+    for i in range(5):
+        cache.set(f'k{i}', i)
+        time.sleep(0.01)
+    cache.get('k0')  # k0 is now the most recently used
+    cache.set('k5', 5)
+    assert cache.stats()['entries'] <= 5
+    assert cache.get('k0') == 0
+    assert cache.get('k1') is None
+
+
+def test_persistent_keys_are_never_evicted(cache):
+    cache.set('version', 'v1', timeout=None)
+    for i in range(10):
+        cache.set(f'k{i}', i)
+        time.sleep(0.01)
+    assert cache.get('version') == 'v1'
+    assert cache.stats()['entries'] <= 5
+
+    # Only persistent keys left over the limit: the cull gives up rather than spin
+    for i in range(6):
+        cache.set(f'counter{i}', i, timeout=None)
+    assert [cache.get(f'counter{i}') for i in range(6)] == list(range(6))
+
+
+def test_size_limit_evicts(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'c.sqlite3'), {'OPTIONS': {'MAX_SIZE': 4096}})
+    for i in range(10):
+        cache.set(f'blob{i}', b'x' * 1000)
+    assert cache.stats()['bytes'] <= 4096
+
+
+def _increment(location, times):
+    cache = SQLiteCache(location, {})
+    for _ in range(times):
+        cache.incr('counter')
+
+
+def test_incr_is_atomic_across_processes(cache):
+    cache.set('counter', 0)
+    context = multiprocessing.get_context('spawn')
+    workers = [
+        context.Process(target=_increment, args=(str(cache._path), 50)) for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert cache.get('counter') == 200
+
+
+def test_incr_missing_key_raises(cache):
+    with pytest.raises(ValueError):
+        cache.incr('nope')
@@ -0,0 +1,55 @@
+import json
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from employee_project.slow_queries import slow_query_log
+from employees.models import Department
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+
+@pytest.fixture
+def slow_log(settings, tmp_path):
+    path = tmp_path / 'slow.jsonl'
+    settings.SLOW_QUERY_LOG = {'ENABLED': True, 'THRESHOLD_MS': 0, 'PATH': str(path)}
+    return path
+
+
+def read_samples(path):
+    assert slow_query_log.drain()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_slow_queries_logged_with_plan_and_origin(auth_client, slow_log):
+    Department.objects.create(name='Eng')
+    assert auth_client.get(reverse('department-statistics')).status_code == 200
+
+    samples = read_samples(slow_log)
+    assert samples
+    assert all(s['view'] == 'department-statistics' and s['method'] == 'GET' for s in samples)
+    select = next(s for s in samples if 'employees_department' in s['sql'])
+    assert select['plan']  # EXPLAIN QUERY PLAN on SQLite
+    assert select['origin'].startswith('employees/')
+    assert '_params' not in select
+
+
+def test_disabled_by_default(auth_client, settings, tmp_path):
+    settings.SLOW_QUERY_LOG = {'THRESHOLD_MS': 0, 'PATH': str(tmp_path / 'slow.jsonl')}
+    auth_client.get(reverse('department-list'))
+    assert slow_query_log.drain()
+    assert not (tmp_path / 'slow.jsonl').exists()
+
+
+def test_report_ranks_queries(auth_client, slow_log):
+    Department.objects.create(name='Eng')
+    auth_client.get(reverse('department-statistics'))
+    auth_client.get(reverse('department-list'))
+    read_samples(slow_log)
+
+    out = StringIO()
+    call_command('slow_queries_report', '--path', str(slow_log), '--view', 'department-list', '--plans', stdout=out)
+    report = out.getvalue()
+    assert 'fingerprint' in report
+    assert 'department-list' in report
+    assert 'department-statistics' not in report
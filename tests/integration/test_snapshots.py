@@ -0,0 +1,60 @@
+from io import StringIO
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from attendance.models import Attendance, Performance
+from employees.caching import get_generations
+from employees.models import Department, Employee
+from employees.snapshots import SnapshotError, read_manifest, restore_snapshot
+
+
+def contents():
+    return (
+        list(Department.objects.order_by('pk').values_list('pk', 'name', 'created_at')),
+        list(Employee.objects.order_by('pk').values_list('pk', 'email', 'address', 'department_id', 'date_of_joining')),
+        list(Attendance.objects.order_by('pk').values_list('pk', 'employee_id', 'date', 'status')),
+        list(Performance.objects.order_by('pk').values_list('pk', 'employee_id', 'rating', 'comments')),
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_snapshot_round_trip(tmp_path, settings):
+    settings.SNAPSHOTS = {'DIRECTORY': str(tmp_path)}
+    call_command('snapshot_data', '--employees', '25', '--days', '10', '--noinput', stdout=StringIO())
+    path = tmp_path / 'e25-d10-dep8-s42.snap'
+    manifest = read_manifest(path)
+    assert manifest['params'] == {'employees': 25, 'days': 10, 'departments': 8, 'seed': 42}
+    assert [t['rows'] for t in manifest['tables']][:2] == [8, 25]
+
+    Performance.objects.filter(pk=Performance.objects.first().pk).update(comments=None)
+    call_command('snapshot_data', '--current', '--name', 'edited', stdout=StringIO())
+    before = contents()
+
+    with pytest.raises(CommandError, match='not empty'):
+        call_command('restore_snapshot', 'edited', stdout=StringIO())
+    generations = get_generations([Employee, Attendance, Performance])
+    call_command('restore_snapshot', 'edited', '--replace', stdout=StringIO())
+    assert contents() == before
+    assert get_generations([Employee, Attendance, Performance]) != generations
+    # Primary key sequences continue after the restored rows
+    assert Department.objects.create(name='Restored').pk > max(pk for pk, *_ in before[0])
+
+    out = StringIO()
+    call_command('snapshot_data', '--list', stdout=out)
+    assert 'e25-d10-dep8-s42' in out.getvalue() and 'edited' in out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_snapshot_from_other_migrations_is_refused(tmp_path, settings, monkeypatch):
+    settings.SNAPSHOTS = {'DIRECTORY': str(tmp_path)}
+    call_command('snapshot_data', '--current', '--name', 'empty', stdout=StringIO())
+    monkeypatch.setattr('employees.snapshots.migration_state', lambda: {'employees': '9999_future'})
+    with pytest.raises(SnapshotError, match='migrations'):
+        restore_snapshot(tmp_path / 'empty.snap')
+
+
+def test_seeded_dataset_fixture(seeded_dataset):
+    rows = {t['model']: t['rows'] for t in seeded_dataset['tables']}
+    assert Employee.objects.count() == rows['employees.Employee'] == 200
+    assert Attendance.objects.count() == rows['attendance.Attendance'] > 0
+    assert Employee.objects.filter(department__isnull=True).count() == 0
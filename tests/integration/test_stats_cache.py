@@ -0,0 +1,58 @@
+import threading
+import time
+import pytest
+from django.urls import reverse
+from employees.caching import cached_stats
+from employees.models import Department, Employee
+from datetime import date
+
+pytestmark = pytest.mark.django_db
+
+
+def test_statistics_served_from_cache_until_write(auth_client, django_assert_num_queries):
+    Department.objects.create(name='Eng')
+    url = reverse('department-statistics')
+    assert auth_client.get(url).json()['total_departments'] == 1
+
+    # Neither the statistics queries nor the (cached) auth lookup are repeated
+    with django_assert_num_queries(0):
+        assert auth_client.get(url).json()['total_departments'] == 1
+
+    Department.objects.create(name='HR')
+    assert auth_client.get(url).json()['total_departments'] == 2
+
+
+def test_bulk_create_invalidates_chart_payload(api_client):
+    dept = Department.objects.create(name='Ops')
+    url = reverse('api_department_stats')
+    assert api_client.get(url).json()['results'][0]['employee_count'] == 0
+
+    Employee.objects.bulk_create([
+        Employee(
+            name='Bulk Person', email='bulk@example.com', phone_number='+12345678901',
+            address='Addr', date_of_joining=date(2022, 1, 1), department=dept,
+        )
+    ])
+    assert api_client.get(url).json()['results'][0]['employee_count'] == 1
+
+
+def test_concurrent_misses_compute_once():
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return {'value': 42}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cached_stats('stampede', [Department], compute)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * 8
@@ -0,0 +1,119 @@
+import threading
+import uuid
+from datetime import timedelta
+import pytest
+from django.core.cache import caches
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+from employees.models import RevokedToken
+from employees.revocation import VERSION_KEY, BloomFilter, RevocationList, revocation_list
+
+pytestmark = pytest.mark.django_db
+
+
+def test_logout_revokes_access_and_refresh(api_client, user_db):
+    refresh = RefreshToken.for_user(user_db)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+    url = reverse('department-list')
+    assert api_client.get(url).status_code == 200
+
+    resp = api_client.post(reverse('auth_logout'), {'refresh_token': str(refresh)}, format='json')
+    assert resp.status_code == 200
+
+    assert api_client.get(url).status_code == 401
+    api_client.credentials()
+    resp = api_client.post(reverse('auth_refresh'), {'refresh_token': str(refresh)}, format='json')
+    assert resp.status_code == 401
+    resp = api_client.post(reverse('token_refresh'), {'refresh': str(refresh)}, format='json')
+    assert resp.status_code == 401
+
+
+def test_other_tokens_stay_valid(api_client, user_db):
+    revoked = RefreshToken.for_user(user_db)
+    kept = RefreshToken.for_user(user_db)
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {revoked.access_token}')
+    assert api_client.post(reverse('auth_logout'), format='json').status_code == 200
+
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {kept.access_token}')
+    assert api_client.get(reverse('department-list')).status_code == 200
+
+
+def test_unrevoked_check_skips_database(auth_client, django_assert_num_queries):
+    url = reverse('department-list')
+    assert auth_client.get(url).status_code == 200
+    token = RefreshToken()
+    with django_assert_num_queries(0):
+        assert not revocation_list.is_revoked(token['jti'])
+
+
+def test_new_worker_loads_revocations_from_table(user_db):
+    token = RefreshToken.for_user(user_db)
+    revocation_list.revoke(token['jti'], token.current_time + token.lifetime)
+    revocation_list.clear()
+    assert revocation_list.is_revoked(token['jti'])
+
+
+def revoke_row(jti, revoked_at=None):
+    row = RevokedToken.objects.create(jti=jti, expires_at=timezone.now() + timedelta(hours=1))
+    if revoked_at is not None:
+        RevokedToken.objects.filter(pk=row.pk).update(revoked_at=revoked_at)
+    caches['default'].set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def test_rows_committed_late_are_still_picked_up(settings, db):
+    settings.JWT_REVOCATION = {'CHECK_INTERVAL': 0, 'RESCAN_MARGIN': 60}
+    worker = RevocationList()
+    assert not worker.is_revoked('first')  # full load
+    revoke_row('first')
+    assert worker.is_revoked('first')
+    # Inserted earlier, committed only now: older than the newest row seen
+    revoke_row('late', revoked_at=timezone.now() - timedelta(seconds=30))
+    assert worker.is_revoked('late')
+
+
+def test_evicted_version_cannot_repeat(settings, user_db, django_capture_on_commit_callbacks):
+    settings.JWT_REVOCATION = {'CHECK_INTERVAL': 0}
+    other_worker = RevocationList()
+    with django_capture_on_commit_callbacks(execute=True):
+        revocation_list.revoke('one', timezone.now() + timedelta(hours=1))
+    assert other_worker.is_revoked('one')
+    caches['default'].delete(VERSION_KEY)  # evicted
+    assert not other_worker.is_revoked('two')
+    with django_capture_on_commit_callbacks(execute=True):
+        revocation_list.revoke('two', timezone.now() + timedelta(hours=1))
+    assert other_worker.is_revoked('two')
+
+
+def test_growing_filter_never_hides_a_revoked_token(settings, db):
+    settings.JWT_REVOCATION = {'CHECK_INTERVAL': 3600, 'CAPACITY': 8}
+    worker = RevocationList()
+    worker.is_revoked('warm-up')  # full load now, none during the test
+    worker._add(['known'])
+    misses = []
+    done = threading.Event()
+
+    def check():
+        while not done.is_set():
+            if not worker.is_revoked('known'):
+                misses.append(1)
+
+    reader = threading.Thread(target=check)
+    reader.start()
+    try:
+        for i in range(3000):
+            worker._add([f'jti-{i}'])
+    finally:
+        done.set()
+        reader.join()
+    assert misses == []
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    added = [uuid.uuid4().hex for _ in range(1000)]
+    for item in added:
+        bloom.add(item)
+    assert all(item in bloom for item in added)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10000))
+    assert false_positives < 300
@@ -0,0 +1,88 @@
+import json
+from datetime import date
+import pytest
+from django.urls import reverse
+from employees.models import Department, Employee
+
+pytestmark = pytest.mark.django_db
+
+CALLER_TRACE = '4bf92f3577b34da6a3ce929d0e0e4736'
+
+
+@pytest.fixture
+def trace_file(settings, tmp_path):
+    path = tmp_path / 'traces.jsonl'
+    settings.TRACING = {'ENABLED': True, 'SAMPLE_RATE': 1.0, 'PATH': str(path)}
+    return path
+
+
+@pytest.fixture
+def employee():
+    dept = Department.objects.create(name='Eng')
+    return Employee.objects.create(
+        name='Ada', email='ada@example.com', phone_number='+12025550100',
+        address='1 Main St', date_of_joining=date(2020, 1, 1), department=dept,
+    )
+
+
+def read_spans(path):
+    traces = [json.loads(line) for line in path.read_text().splitlines()]
+    return [
+        span
+        for trace in traces
+        for resource in trace['resourceSpans']
+        for scope in resource['scopeSpans']
+        for span in scope['spans']
+    ]
+
+
+def attributes(span):
+    return {a['key']: next(iter(a['value'].values())) for a in span['attributes']}
+
+
+def test_retrieve_exports_phase_and_query_spans(auth_client, trace_file, employee):
+    resp = auth_client.get(reverse('employee-detail', args=[employee.id]))
+    assert resp.status_code == 200
+
+    spans = read_spans(trace_file)
+    root = next(s for s in spans if 'parentSpanId' not in s)
+    assert root['name'] == 'GET employee-detail'
+    assert attributes(root)['http.route'] == 'employee-detail'
+    assert attributes(root)['http.status_code'] == '200'
+    assert resp['traceparent'] == f"00-{root['traceId']}-{root['spanId']}-01"
+
+    names = {s['name'] for s in spans}
+    assert {'drf.authenticate', 'drf.permissions', 'drf.throttles', 'drf.filter',
+            'drf.serialize', 'render', 'db.query'} <= names
+    ids = {s['spanId'] for s in spans}
+    assert all(s['parentSpanId'] in ids for s in spans if s is not root)
+    query = next(s for s in spans if s['name'] == 'db.query')
+    assert attributes(query)['db.operation'] == 'SELECT'
+
+
+def test_incoming_traceparent_is_continued(auth_client, settings, trace_file):
+    settings.TRACING = {**settings.TRACING, 'SAMPLE_RATE': 0.0}
+    resp = auth_client.get(
+        reverse('department-list'), HTTP_TRACEPARENT=f'00-{CALLER_TRACE}-00f067aa0ba902b7-01'
+    )
+    spans = read_spans(trace_file)
+    assert {s['traceId'] for s in spans} == {CALLER_TRACE}
+    root = next(s for s in spans if s['parentSpanId'] == '00f067aa0ba902b7')
+    assert resp['traceparent'].split('-')[1] == CALLER_TRACE
+    assert root['kind'] == 2
+
+
+def test_unsampled_requests_export_nothing(auth_client, settings, trace_file):
+    settings.TRACING = {**settings.TRACING, 'SAMPLE_RATE': 0.0}
+    resp = auth_client.get(reverse('department-list'))
+    auth_client.get(reverse('department-list'), HTTP_TRACEPARENT=f'00-{CALLER_TRACE}-00f067aa0ba902b7-00')
+    assert not trace_file.exists()
+    assert not resp.has_header('traceparent')
+
+
+def test_disabled_by_default(auth_client, settings, tmp_path):
+    settings.TRACING = {'SAMPLE_RATE': 1.0, 'PATH': str(tmp_path / 'traces.jsonl')}
+    resp = auth_client.get(reverse('department-list'))
+    assert resp.status_code == 200
+    assert not resp.has_header('traceparent')
+    assert not (tmp_path / 'traces.jsonl').exists()